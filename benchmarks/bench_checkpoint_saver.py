@@ -0,0 +1,145 @@
+"""Benchmark OpenSearchSaver against the in-process fake Agentic Memory server.
+
+Drives put, put_writes, get_tuple and list with synthetic conversations of varying
+message counts and channel sizes, and reports ops/s, p50/p99 latency and bytes on
+the wire per operation. The fake server adds a configurable latency to every
+response to stand in for the network round trip to a cluster.
+
+Usage:
+    python benchmarks/bench_checkpoint_saver.py --latency-ms 2 --messages 4 32 128 --channel-bytes 256 4096
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Any, Callable, Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [os.path.join(ROOT, "langgraph"), os.path.join(ROOT, "tests")]
+
+from langchain_core.messages import AIMessage, HumanMessage  # noqa: E402
+from langgraph.checkpoint.base import empty_checkpoint  # noqa: E402
+from langgraph.checkpoint.base.id import uuid6  # noqa: E402
+
+from bench_utils import percentile  # noqa: E402
+from fake_agentic_memory_server import FakeAgenticMemoryServer  # noqa: E402
+from opensearch_checkpoint_saver import OpenSearchSaver  # noqa: E402
+
+OPERATIONS = ("put", "put_writes", "get_tuple", "list")
+
+
+def synthetic_messages(count: int, channel_bytes: int) -> List[Any]:
+    """Alternate human and AI messages, each padded to channel_bytes of content."""
+    messages = []
+    for i in range(count):
+        content = f"message {i} ".ljust(channel_bytes, "x")
+        messages.append(HumanMessage(content=content) if i % 2 == 0 else AIMessage(content=content))
+    return messages
+
+
+class Recorder:
+    """Collects latencies and wire bytes per operation."""
+
+    def __init__(self, server: FakeAgenticMemoryServer):
+        self.server = server
+        self.latencies: Dict[str, List[float]] = {op: [] for op in OPERATIONS}
+        self.bytes: Dict[str, int] = {op: 0 for op in OPERATIONS}
+        self.elapsed: Dict[str, float] = {op: 0.0 for op in OPERATIONS}
+
+    def measure(self, op: str, func: Callable[[], Any]) -> Any:
+        before = self.server.traffic()
+        start = time.perf_counter()
+        result = func()
+        duration = time.perf_counter() - start
+        after = self.server.traffic()
+        self.latencies[op].append(duration)
+        self.elapsed[op] += duration
+        self.bytes[op] += (after["bytes_in"] - before["bytes_in"]) + (after["bytes_out"] - before["bytes_out"])
+        return result
+
+    def summary(self) -> List[Dict[str, Any]]:
+        rows = []
+        for op in OPERATIONS:
+            samples = sorted(self.latencies[op])
+            if not samples:
+                continue
+            rows.append({
+                "operation": op,
+                "ops": len(samples),
+                "ops_per_s": len(samples) / self.elapsed[op] if self.elapsed[op] else 0.0,
+                "p50_ms": percentile(samples, 50) * 1000,
+                "p99_ms": percentile(samples, 99) * 1000,
+                "bytes_per_op": self.bytes[op] / len(samples),
+            })
+        return rows
+
+
+def run_scenario(server: FakeAgenticMemoryServer, container_id: str, messages: int, channel_bytes: int,
+                 iterations: int, writes_per_step: int) -> List[Dict[str, Any]]:
+    saver = OpenSearchSaver(server.url, container_id)
+    recorder = Recorder(server)
+    thread_id = f"bench-{messages}-{channel_bytes}-{time.time_ns()}"
+    history = synthetic_messages(messages, channel_bytes)
+    config = {"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}}
+
+    for step in range(iterations):
+        checkpoint = empty_checkpoint()
+        checkpoint["id"] = str(uuid6(clock_seq=step))
+        checkpoint["channel_values"] = {"messages": history}
+        metadata = {"source": "loop", "step": step, "parents": {}}
+        config = recorder.measure("put", lambda: saver.put(config, checkpoint, metadata, {}))
+
+        writes = [(f"channel_{i}", "w" * channel_bytes) for i in range(writes_per_step)]
+        recorder.measure("put_writes", lambda: saver.put_writes(config, writes, task_id=f"task-{step}"))
+
+        recorder.measure("get_tuple", lambda: saver.get_tuple(
+            {"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}}
+        ))
+        recorder.measure("list", lambda: list(saver.list(
+            {"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}}, limit=10
+        )))
+
+    rows = recorder.summary()
+    for row in rows:
+        row.update({"messages": messages, "channel_bytes": channel_bytes})
+    return rows
+
+
+def print_table(rows: List[Dict[str, Any]]) -> None:
+    header = f"{'operation':<11} {'messages':>8} {'chan_B':>7} {'ops':>5} {'ops/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'bytes/op':>10}"
+    print(header)
+    print("-" * len(header))
+    for row in rows:
+        print(f"{row['operation']:<11} {row['messages']:>8} {row['channel_bytes']:>7} {row['ops']:>5} "
+              f"{row['ops_per_s']:>9.1f} {row['p50_ms']:>8.2f} {row['p99_ms']:>8.2f} {row['bytes_per_op']:>10.0f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency-ms", type=float, default=1.0, help="Injected latency per request")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Uniform random extra latency per request")
+    parser.add_argument("--messages", type=int, nargs="+", default=[4, 32, 128], help="Messages per checkpoint")
+    parser.add_argument("--channel-bytes", type=int, nargs="+", default=[256, 4096], help="Bytes per message and write")
+    parser.add_argument("--iterations", type=int, default=50, help="Checkpoints written per scenario")
+    parser.add_argument("--writes", type=int, default=2, help="Pending writes per checkpoint")
+    parser.add_argument("--json", help="Also write the results to this file")
+    args = parser.parse_args()
+
+    rows: List[Dict[str, Any]] = []
+    with FakeAgenticMemoryServer(latency=args.latency_ms / 1000, jitter=args.jitter_ms / 1000) as server:
+        container_id = OpenSearchSaver.create_memory_container(server.url, "bench_checkpoints")
+        for messages in args.messages:
+            for channel_bytes in args.channel_bytes:
+                rows.extend(run_scenario(server, container_id, messages, channel_bytes,
+                                         args.iterations, args.writes))
+
+    print_table(rows)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"latency_ms": args.latency_ms, "results": rows}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,11 @@
+"""Helpers shared by the benchmark scripts."""
+
+from typing import List
+
+
+def percentile(samples: List[float], q: float) -> float:
+    """Nearest-rank percentile of already sorted samples."""
+    if not samples:
+        return 0.0
+    index = min(len(samples) - 1, max(0, int(round(q / 100 * len(samples))) - 1))
+    return samples[index]
@@ -0,0 +1,331 @@
+"""Load generator running simulated Strands and LangGraph conversations against the memory layer.
+
+Starts N Strands agents (RepositorySessionManager over OpenSearchSessionRepository)
+and M LangGraph graphs (checkpointed by OpenSearchSaver) whose models are stubs
+replying from a script after a fixed think time. Every conversation runs in its own
+thread for the given duration, starting a new session after --turns-per-session
+turns. Reports sustained turns/s, turn latency, the latency distribution of every
+memory call and the error rate.
+
+Memory calls are timed through the opensearch_transport instrumentation hooks:
+"memory.*" and "checkpoint.*" are client methods, "request.<search|write|admin>"
+single HTTP requests including retries. Without --url the in-process fake server
+is used, so no cluster or model provider is needed.
+
+Usage:
+    python benchmarks/load_generator.py --strands 8 --langgraph 8 --duration 30
+    python benchmarks/load_generator.py --url https://localhost:9200 --strands 32 --langgraph 0 --duration 300
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [os.path.join(ROOT, "strands"), os.path.join(ROOT, "langgraph"), os.path.join(ROOT, "tests")]
+
+import urllib3  # noqa: E402
+from langchain_core.messages import AIMessage, HumanMessage  # noqa: E402
+from langgraph.graph import END, START, MessagesState, StateGraph  # noqa: E402
+from strands import Agent  # noqa: E402
+from strands.models import Model  # noqa: E402
+from strands.session.repository_session_manager import RepositorySessionManager  # noqa: E402
+from strands.types.exceptions import StructuredOutputException  # noqa: E402
+
+from bench_utils import percentile  # noqa: E402
+from fake_agentic_memory_server import FakeAgenticMemoryServer  # noqa: E402
+from opensearch_agentic_memory import OpenSearchAgenticMemory  # noqa: E402
+from opensearch_checkpoint_saver import OpenSearchSaver  # noqa: E402
+from opensearch_session_manager import OpenSearchSessionRepository  # noqa: E402
+from opensearch_transport import Instrumentation, set_instrumentation  # noqa: E402
+
+urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+SCRIPT = [
+    "Hi, my name is Bob and I live in Seattle.",
+    "What is a good weekend trip from here?",
+    "I prefer hiking over museums.",
+    "Can you suggest something for a rainy day instead?",
+    "Thanks! Remind me what my name is?",
+]
+REPLIES = [
+    "Nice to meet you, Bob.",
+    "Mount Rainier is a popular choice.",
+    "Then try the Enchantments or Olympic National Park.",
+    "The Seattle Aquarium or a bookstore crawl work well in the rain.",
+    "Your name is Bob.",
+]
+
+
+class LatencyRecorder(Instrumentation):
+    """Instrumentation keeping the duration and outcome of every span, keyed by span name.
+
+    A span counts as failed when it raises or ends with a 429 or 5xx status. Other
+    4xx statuses are part of normal operation, e.g. the 404 of a first session lookup.
+    """
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Counter = Counter()
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Dict[str, Any]]:
+        failed = False
+        start = time.perf_counter()
+        try:
+            yield attributes
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            duration = time.perf_counter() - start
+            if name == "opensearch.request":
+                name = f"request.{attributes.get('operation')}"
+            status = attributes.get("status") or 0
+            failed = failed or status == 429 or status >= 500
+            with self._lock:
+                self.latencies[name].append(duration)
+                if failed:
+                    self.errors[name] += 1
+
+    def summary(self) -> List[Dict[str, Any]]:
+        rows = []
+        with self._lock:
+            for name in sorted(self.latencies):
+                samples = sorted(self.latencies[name])
+                rows.append({
+                    "call": name,
+                    "calls": len(samples),
+                    "errors": self.errors[name],
+                    "p50_ms": percentile(samples, 50) * 1000,
+                    "p95_ms": percentile(samples, 95) * 1000,
+                    "p99_ms": percentile(samples, 99) * 1000,
+                    "max_ms": samples[-1] * 1000,
+                })
+        return rows
+
+
+class ScriptedModel(Model):
+    """Strands model stub streaming the next scripted reply after think seconds."""
+
+    def __init__(self, think: float = 0.0, replies: Optional[List[str]] = None):
+        self.config = {"model_id": "scripted", "think": think}
+        self._replies = itertools.cycle(replies or REPLIES)
+
+    def update_config(self, **model_config: Any) -> None:
+        self.config.update(model_config)
+
+    def get_config(self) -> Dict[str, Any]:
+        return self.config
+
+    async def structured_output(self, output_model, prompt, system_prompt=None, **kwargs):
+        # The load test only drives plain chat turns; scripted replies cannot fill an output model
+        raise StructuredOutputException(
+            f"ScriptedModel only streams scripted text replies and cannot produce {output_model.__name__} output")
+        yield  # pragma: no cover
+
+    async def stream(self, messages, tool_specs=None, system_prompt=None, **kwargs):
+        if self.config["think"]:
+            await asyncio.sleep(self.config["think"])
+        reply = next(self._replies)
+        yield {"messageStart": {"role": "assistant"}}
+        yield {"contentBlockStart": {"start": {}}}
+        yield {"contentBlockDelta": {"delta": {"text": reply}}}
+        yield {"contentBlockStop": {}}
+        yield {"messageStop": {"stopReason": "end_turn"}}
+        yield {"metadata": {"usage": {"inputTokens": 0, "outputTokens": 0, "totalTokens": 0},
+                            "metrics": {"latencyMs": int(self.config["think"] * 1000)}}}
+
+
+def scripted_chat_graph(checkpointer: OpenSearchSaver, think: float):
+    """LangGraph chat graph whose model node replies from the script after think seconds."""
+    replies = itertools.cycle(REPLIES)
+
+    def chat_node(state: MessagesState):
+        if think:
+            time.sleep(think)
+        return {"messages": [AIMessage(content=next(replies))]}
+
+    graph = StateGraph(MessagesState)
+    graph.add_node("chat", chat_node)
+    graph.add_edge(START, "chat")
+    graph.add_edge("chat", END)
+    return graph.compile(checkpointer=checkpointer)
+
+
+class LoadRun:
+    """Shared stop time and per-framework turn statistics of one run."""
+
+    def __init__(self, duration: float, turns_per_session: int):
+        self.stop_at = time.monotonic() + duration
+        self.turns_per_session = turns_per_session
+        self.turn_latencies: Dict[str, List[float]] = defaultdict(list)
+        self.failed_turns: Counter = Counter()
+        self.error_messages: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def running(self) -> bool:
+        return time.monotonic() < self.stop_at
+
+    def turn(self, framework: str, func) -> bool:
+        start = time.perf_counter()
+        try:
+            func()
+            ok = True
+        except Exception as e:
+            ok = False
+            with self._lock:
+                self.failed_turns[framework] += 1
+                self.error_messages[f"{type(e).__name__}: {str(e)[:120]}"] += 1
+        with self._lock:
+            self.turn_latencies[framework].append(time.perf_counter() - start)
+        return ok
+
+    def summary(self, elapsed: float) -> List[Dict[str, Any]]:
+        rows = []
+        for framework in sorted(self.turn_latencies):
+            samples = sorted(self.turn_latencies[framework])
+            rows.append({
+                "framework": framework,
+                "turns": len(samples),
+                "turns_per_s": len(samples) / elapsed if elapsed else 0.0,
+                "error_rate": self.failed_turns[framework] / len(samples),
+                "p50_ms": percentile(samples, 50) * 1000,
+                "p99_ms": percentile(samples, 99) * 1000,
+            })
+        return rows
+
+
+def run_strands_conversation(run: LoadRun, repo: OpenSearchSessionRepository, worker: int, think: float) -> None:
+    while run.running():
+        session_id = f"load-strands-{worker}-{uuid.uuid4().hex[:8]}"
+        agent = None
+
+        def send(prompt: str) -> None:
+            nonlocal agent
+            # The session is created or restored as part of the first turn, as in a real app
+            if agent is None:
+                agent = Agent(
+                    model=ScriptedModel(think),
+                    session_manager=RepositorySessionManager(session_id=session_id, session_repository=repo),
+                    system_prompt="You are a helpful assistant.",
+                    callback_handler=None,
+                )
+            agent(prompt)
+
+        for prompt in itertools.islice(itertools.cycle(SCRIPT), run.turns_per_session):
+            if not run.running() or not run.turn("strands", lambda: send(prompt)):
+                break
+
+
+def run_langgraph_conversation(run: LoadRun, saver: OpenSearchSaver, worker: int, think: float) -> None:
+    app = scripted_chat_graph(saver, think)
+    while run.running():
+        config = {"configurable": {"thread_id": f"load-langgraph-{worker}-{uuid.uuid4().hex[:8]}"}}
+        for prompt in itertools.islice(itertools.cycle(SCRIPT), run.turns_per_session):
+            if not run.running() or not run.turn(
+                    "langgraph", lambda: app.invoke({"messages": [HumanMessage(content=prompt)]}, config)):
+                break
+
+
+def print_report(elapsed: float, turns: List[Dict[str, Any]], calls: List[Dict[str, Any]],
+                 errors: Counter) -> None:
+    print(f"Ran for {elapsed:.1f}s\n")
+    header = f"{'framework':<10} {'turns':>7} {'turns/s':>9} {'errors':>7} {'p50 ms':>8} {'p99 ms':>8}"
+    print(header)
+    print("-" * len(header))
+    for row in turns:
+        print(f"{row['framework']:<10} {row['turns']:>7} {row['turns_per_s']:>9.1f} {row['error_rate']:>7.2%} "
+              f"{row['p50_ms']:>8.2f} {row['p99_ms']:>8.2f}")
+
+    print()
+    header = f"{'memory call':<28} {'calls':>7} {'errors':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}"
+    print(header)
+    print("-" * len(header))
+    for row in calls:
+        print(f"{row['call']:<28} {row['calls']:>7} {row['errors']:>7} {row['p50_ms']:>8.2f} "
+              f"{row['p95_ms']:>8.2f} {row['p99_ms']:>8.2f} {row['max_ms']:>8.2f}")
+
+    if errors:
+        print("\nMost common errors:")
+        for message, count in errors.most_common(5):
+            print(f"  {count:>6}  {message}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default=os.getenv("OPENSEARCH_URL"),
+                        help="Cluster URL; the in-process fake server is used when omitted")
+    parser.add_argument("--username", default=os.getenv("OPENSEARCH_USERNAME", "admin"))
+    parser.add_argument("--password", default=os.getenv("OPENSEARCH_PASSWORD", "admin"))
+    parser.add_argument("--strands", type=int, default=4, help="Concurrent Strands conversations")
+    parser.add_argument("--langgraph", type=int, default=4, help="Concurrent LangGraph conversations")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to run")
+    parser.add_argument("--turns-per-session", type=int, default=10, help="Turns before starting a new session")
+    parser.add_argument("--think-ms", type=float, default=0.0, help="Stub model time per reply")
+    parser.add_argument("--latency-ms", type=float, default=1.0, help="Fake server latency per request")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Fake server random extra latency per request")
+    parser.add_argument("--container-prefix", default="load_generator", help="Memory container name prefix")
+    parser.add_argument("--verbose", action="store_true", help="Keep the clients' own output")
+    parser.add_argument("--json", help="Also write the results to this file")
+    args = parser.parse_args()
+
+    with contextlib.ExitStack() as stack:
+        url = args.url
+        if not url:
+            server = stack.enter_context(FakeAgenticMemoryServer(latency=args.latency_ms / 1000,
+                                                                 jitter=args.jitter_ms / 1000))
+            url = server.url
+
+        # Resolve both containers up front, so bootstrap is not part of the measurement
+        memory = OpenSearchAgenticMemory(
+            url, args.username, args.password, memory_container_name=f"{args.container_prefix}_strands",
+            cache_path=None, pool_size=max(10, args.strands)
+        )
+        langgraph_container = OpenSearchSaver.get_or_create_memory_container(
+            url, f"{args.container_prefix}_langgraph", auth=(args.username, args.password), verify_ssl=False
+        )
+        # One pooled client shared by every Strands conversation, sized for the concurrency
+        repo = OpenSearchSessionRepository(url, args.username, args.password, memory=memory)
+        saver = OpenSearchSaver(url, langgraph_container, auth=(args.username, args.password), verify_ssl=False)
+
+        recorder = LatencyRecorder()
+        set_instrumentation(recorder)
+        run = LoadRun(args.duration, args.turns_per_session)
+        think = args.think_ms / 1000
+        output = io.StringIO()
+        start = time.monotonic()
+        with ThreadPoolExecutor(max_workers=max(1, args.strands + args.langgraph)) as executor, \
+                (contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(output)):
+            futures = [executor.submit(run_strands_conversation, run, repo, worker, think)
+                       for worker in range(args.strands)]
+            futures += [executor.submit(run_langgraph_conversation, run, saver, worker, think)
+                        for worker in range(args.langgraph)]
+            for future in futures:
+                future.result()
+        elapsed = time.monotonic() - start
+        set_instrumentation(None)
+
+    turns, calls = run.summary(elapsed), recorder.summary()
+    print_report(elapsed, turns, calls, run.error_messages)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"duration_s": elapsed, "strands": args.strands, "langgraph": args.langgraph,
+                       "think_ms": args.think_ms, "turns": turns, "memory_calls": calls,
+                       "errors": dict(run.error_messages)}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,7 +4,9 @@ from langchain_aws import ChatBedrock
 from langchain_core.messages import HumanMessage, SystemMessage
 from langgraph.graph import StateGraph, MessagesState, START, END
 from langgraph.prebuilt import ToolNode
+from opensearch_agentic_memory import ContainerProfile
 from opensearch_checkpoint_saver import OpenSearchSaver
+from opensearch_transport import DEFAULT_TIMEOUTS
 from opensearch_memory_tool import OpenSearchMemoryToolProvider
 
 # Suppress SSL warnings
@@ -94,7 +96,7 @@ def setup_opensearch_checkpointer(container_name: str, index_prefix: str) -> Ope
     auth = (username, password)
 
     try:
-        container_id = OpenSearchSaver.create_memory_container(
+        container_id = OpenSearchSaver.get_or_create_memory_container(
             base_url=cluster_url,
             name=container_name,
             description="Checkpoint storage for Bedrock Claude chatbot",
@@ -102,36 +104,11 @@ def setup_opensearch_checkpointer(container_name: str, index_prefix: str) -> Ope
                 "index_prefix": index_prefix,
                 "disable_history": False,
                 "disable_session": False,
-                "use_system_index": False,
-                "index_settings": {
-                    "session_index": {
-                        "index": {
-                        "number_of_shards": "1",
-                        "auto_expand_replicas": "0-all"
-                        }
-                    },
-                    "working_memory_index": {
-                        "index": {
-                        "number_of_shards": "1",
-                        "auto_expand_replicas": "0-all"
-                        }
-                    },
-                    "long_term_memory_index": {
-                        "index": {
-                        "number_of_shards": "1",
-                        "auto_expand_replicas": "0-all"
-                        }
-                    },
-                    "long_term_memory_history_index": {
-                        "index": {
-                        "number_of_shards": "1",
-                        "auto_expand_replicas": "0-all"
-                        }
-                    }
-                }
+                "use_system_index": False
             },
             auth=auth,
             verify_ssl=verify_ssl,
+            profile=ContainerProfile.from_name(),
         )
         print(f"✅ Created memory container: {container_id}")
     except Exception as e:
@@ -169,7 +146,7 @@ def find_existing_thread(container_id: str, user_prefix: str = "demo_") -> str:
     }
     
     try:
-        response = requests.post(url, json=body, auth=auth, verify=verify_ssl)
+        response = requests.post(url, json=body, auth=auth, verify=verify_ssl, timeout=DEFAULT_TIMEOUTS.for_request("POST", url))
         response.raise_for_status()
         data = response.json()
         
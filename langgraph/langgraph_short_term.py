@@ -3,7 +3,9 @@ from datetime import datetime
 from langchain_aws import ChatBedrock
 from langchain_core.messages import HumanMessage
 from langgraph.graph import StateGraph, MessagesState, START, END
+from opensearch_agentic_memory import ContainerProfile
 from opensearch_checkpoint_saver import OpenSearchSaver
+from opensearch_transport import DEFAULT_TIMEOUTS
 
 # Suppress SSL warnings
 import urllib3
@@ -75,8 +77,8 @@ def setup_opensearch_checkpointer(container_name: str, index_prefix: str) -> Ope
         print(f"✅ Find memory container with id '{container_id}' by name '{container_name}'")
     else:
         try:
-            # Create new container
-            container_id = OpenSearchSaver.create_memory_container(
+            # Create new container, or pick up the one a concurrent worker just created
+            container_id = OpenSearchSaver.get_or_create_memory_container(
                 base_url=cluster_url,
                 name=container_name,
                 description="Checkpoint storage for Bedrock Claude chatbot",
@@ -84,26 +86,13 @@ def setup_opensearch_checkpointer(container_name: str, index_prefix: str) -> Ope
                     "index_prefix": index_prefix,
                     "disable_history": False,
                     "disable_session": False,
-                    "use_system_index": False,
-                    "index_settings": {
-                        "session_index": {
-                            "index": {
-                            "number_of_shards": "1",
-                            "auto_expand_replicas": "0-all"
-                            }
-                        },
-                        "working_memory_index": {
-                            "index": {
-                            "number_of_shards": "1",
-                            "auto_expand_replicas": "0-all"
-                            }
-                        }
-                    }
+                    "use_system_index": False
                 },
                 auth=auth,
                 verify_ssl=verify_ssl,
+                profile=ContainerProfile.from_name(),
             )
-            print(f"✅ Created memory container: {container_id}")
+            print(f"✅ Use memory container: {container_id}")
         except Exception as e:
             raise e
 
@@ -119,21 +108,13 @@ def setup_opensearch_checkpointer(container_name: str, index_prefix: str) -> Ope
 
 def find_existing_container(name: str) -> str:
     """Find existing memory container by name."""
-    import requests
-    
-    url = f"{cluster_url}/_plugins/_ml/memory_containers/_search"
-    body = {
-        "query": {"bool": {"filter": [{"term": {"name.keyword": name}}]}},
-        "sort": [{"created_time": {"order": "asc"}}],
-        "size": 1
-    }
-    
     try:
-        response = requests.get(url, json=body, auth=(username, password), verify=verify_ssl)
-        response.raise_for_status()
-        data = response.json()
-        hits = data.get("hits", {}).get("hits", [])
-        return hits[0]["_id"] if hits else None
+        return OpenSearchSaver.find_memory_container(
+            base_url=cluster_url,
+            name=name,
+            auth=(username, password),
+            verify_ssl=verify_ssl,
+        )
     except Exception:
         return None
 
@@ -159,7 +140,7 @@ def find_existing_thread(container_id: str, user_prefix: str = "demo_") -> str:
     }
     
     try:
-        response = requests.post(url, json=body, auth=auth, verify=verify_ssl)
+        response = requests.post(url, json=body, auth=auth, verify=verify_ssl, timeout=DEFAULT_TIMEOUTS.for_request("POST", url))
         response.raise_for_status()
         data = response.json()
         
@@ -22,6 +22,21 @@ from langgraph.checkpoint.base import (
     get_checkpoint_metadata,
 )
 from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from opensearch_agentic_memory import (
+    ContainerProfile,
+    RecentWrites,
+    container_registry,
+    get_or_create_memory_container_id,
+)
+from opensearch_transport import (
+    DEFAULT_TIMEOUTS,
+    CircuitBreaker,
+    ResilientSession,
+    RetryPolicy,
+    Timeouts,
+    instrument,
+    traced,
+)
 
 __all__ = ["OpenSearchSaver"]
 
@@ -45,6 +60,12 @@ class OpenSearchSaver(BaseCheckpointSaver[str]):
         verify_ssl: Whether to verify SSL certificates (default: True)
         headers: Optional additional headers for requests
         serde: Optional serializer for checkpoints
+        recent_writes: Optional read-your-writes overlay, so checkpoints and
+            writes are visible to get_tuple/list before the next index refresh
+        retry: Optional retry policy for 429/5xx responses and connection errors
+        breaker: Optional circuit breaker, e.g. one shared by all savers of a cluster
+        timeouts: Optional connect/read timeouts per operation class. Wrap a
+            turn in opensearch_transport.deadline() to bound all its requests
 
     Example:
         >>> # Create container first (one-time setup)
@@ -68,6 +89,7 @@ class OpenSearchSaver(BaseCheckpointSaver[str]):
     auth: tuple[str, str] | None
     verify_ssl: bool
     headers: dict[str, str]
+    recent_writes: RecentWrites | None
 
     def __init__(
             self,
@@ -78,6 +100,10 @@ class OpenSearchSaver(BaseCheckpointSaver[str]):
             verify_ssl: bool = True,
             headers: dict[str, str] | None = None,
             serde: SerializerProtocol | None = None,
+            recent_writes: RecentWrites | None = None,
+            retry: RetryPolicy | None = None,
+            breaker: CircuitBreaker | None = None,
+            timeouts: Timeouts | None = None,
     ) -> None:
         super().__init__(serde=serde)
         self.base_url = base_url.rstrip("/")
@@ -85,10 +111,11 @@ class OpenSearchSaver(BaseCheckpointSaver[str]):
         self.auth = auth
         self.verify_ssl = verify_ssl
         self.headers = headers or {}
+        self.recent_writes = recent_writes
         self.jsonplus_serde = JsonPlusSerializer()
 
-        # Create a session for reusing connections
-        self.session = requests.Session()
+        # Create a session for reusing connections, retrying transient failures
+        self.session = ResilientSession(retry=retry, breaker=breaker, timeouts=timeouts)
         if auth:
             self.session.auth = auth
         self.session.headers.update({"Content-Type": "application/json"})
@@ -105,6 +132,7 @@ class OpenSearchSaver(BaseCheckpointSaver[str]):
             *,
             auth: tuple[str, str] | None = None,
             verify_ssl: bool = True,
+            profile: ContainerProfile | None = None,
     ) -> str:
         """Create a memory container for storing checkpoints.
 
@@ -117,24 +145,155 @@ class OpenSearchSaver(BaseCheckpointSaver[str]):
             configuration: Optional container configuration
             auth: Optional (username, password) tuple
             verify_ssl: Whether to verify SSL certificates
+            profile: Optional shard and index settings profile, replacing
+                any index_settings in configuration
 
         Returns:
             str: The memory_container_id to use with OpenSearchSaver
         """
+        configuration = dict(configuration or {})
+        if profile is not None:
+            configuration["index_settings"] = profile.index_settings(
+                long_term=bool(configuration.get("strategies"))
+            )
+
         url = urljoin(base_url, "/_plugins/_ml/memory_containers/_create")
         response = requests.post(
             url,
             json={
                 "name": name,
                 "description": description,
-                "configuration": configuration or {},
+                "configuration": configuration,
+            },
+            auth=auth,
+            verify=verify_ssl,
+            headers={"Content-Type": "application/json"},
+            timeout=DEFAULT_TIMEOUTS.for_request("POST", url),
+        )
+        response.raise_for_status()
+        container_id = response.json()["memory_container_id"]
+        container_registry.register(base_url, name, container_id)
+        return container_id
+
+    @classmethod
+    def find_memory_container(
+            cls,
+            base_url: str,
+            name: str,
+            *,
+            auth: tuple[str, str] | None = None,
+            verify_ssl: bool = True,
+    ) -> str | None:
+        """Find the oldest memory container with the given name.
+
+        Lookups go through the process-wide container registry, so each name is
+        searched for at most once per process and concurrent lookups share one request.
+
+        Args:
+            base_url: OpenSearch base URL
+            name: Name of the memory container
+            auth: Optional (username, password) tuple
+            verify_ssl: Whether to verify SSL certificates
+
+        Returns:
+            str | None: The memory_container_id, or None if no container has this name
+        """
+        return container_registry.resolve(
+            base_url,
+            name,
+            lambda: cls._search_memory_container(base_url, name, auth=auth, verify_ssl=verify_ssl),
+        )
+
+    @classmethod
+    def get_or_create_memory_container(
+            cls,
+            base_url: str,
+            name: str,
+            description: str = "",
+            configuration: dict[str, Any] | None = None,
+            *,
+            auth: tuple[str, str] | None = None,
+            verify_ssl: bool = True,
+            profile: ContainerProfile | None = None,
+    ) -> str:
+        """Find the memory container with the given name, creating it if it does not exist.
+
+        Safe to call from many workers starting at once: a lock document keyed by the
+        name ensures the container is created exactly once and every caller gets its id.
+
+        Args:
+            base_url: OpenSearch base URL
+            name: Name for the memory container
+            description: Description of the container, if created
+            configuration: Optional container configuration, if created
+            auth: Optional (username, password) tuple
+            verify_ssl: Whether to verify SSL certificates
+            profile: Optional shard and index settings profile, if created
+
+        Returns:
+            str: The memory_container_id to use with OpenSearchSaver
+        """
+        session = ResilientSession()
+        session.auth = auth
+        session.verify = verify_ssl
+        session.headers.update({"Content-Type": "application/json"})
+
+        return container_registry.resolve(
+            base_url,
+            name,
+            lambda: get_or_create_memory_container_id(
+                session,
+                base_url,
+                name,
+                find=lambda: cls._search_memory_container(base_url, name, auth=auth, verify_ssl=verify_ssl),
+                create=lambda: cls.create_memory_container(
+                    base_url, name, description, configuration, auth=auth, verify_ssl=verify_ssl, profile=profile
+                ),
+            ),
+        )
+
+    @classmethod
+    def _search_memory_container(
+            cls,
+            base_url: str,
+            name: str,
+            *,
+            auth: tuple[str, str] | None = None,
+            verify_ssl: bool = True,
+    ) -> str | None:
+        """Search for the oldest memory container with the given name."""
+        url = urljoin(base_url, "/_plugins/_ml/memory_containers/_search")
+        response = requests.post(
+            url,
+            json={
+                "query": {"bool": {"filter": [{"term": {"name.keyword": name}}]}},
+                "sort": [{"created_time": {"order": "asc"}}],
+                "size": 1,
             },
             auth=auth,
             verify=verify_ssl,
             headers={"Content-Type": "application/json"},
+            timeout=DEFAULT_TIMEOUTS.for_request("POST", url),
         )
         response.raise_for_status()
-        return response.json()["memory_container_id"]
+        hits = response.json().get("hits", {}).get("hits", [])
+        return hits[0]["_id"] if hits else None
+
+    def _overlay(self, thread_id: str, query: dict[str, Any], hits: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """Merge documents this saver wrote but the index has not refreshed yet into search hits."""
+        if self.recent_writes is None:
+            return hits
+        return self.recent_writes.overlay(thread_id, query, hits)
+
+    def _record_write(self, thread_id: str, response: requests.Response, doc: dict[str, Any]) -> None:
+        """Remember a written checkpoint or write document for the read-your-writes overlay."""
+        if self.recent_writes is None:
+            return
+        self.recent_writes.record(
+            thread_id,
+            response.json().get("working_memory_id"),
+            {**doc, "memory_container_id": self.memory_container_id},
+        )
 
     def _ensure_session(self, thread_id: str) -> None:
         """Ensure a session exists for the given thread_id."""
@@ -161,6 +320,7 @@ class OpenSearchSaver(BaseCheckpointSaver[str]):
             )
             response.raise_for_status()
 
+    @traced("checkpoint.get_tuple")
     def get_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
         """Get a checkpoint tuple from OpenSearch.
 
@@ -238,46 +398,50 @@ class OpenSearchSaver(BaseCheckpointSaver[str]):
             print(f"⚠️  Failed to retrieve checkpoint: {e}")
             return None
 
-        hits = data.get("hits", {}).get("hits", [])
+        hits = self._overlay(thread_id, query, data.get("hits", {}).get("hits", []))
         if not hits:
             print(f"⚠️  No checkpoint found for thread_id={thread_id}, checkpoint_ns={checkpoint_ns}, checkpoint_id={checkpoint_id}")
             return None
 
         doc = hits[0]["_source"]
 
-        # Extract checkpoint data from binary_data
-        binary_data = doc["binary_data"]
-        parent_checkpoint_id = doc["namespace"].get("parent_checkpoint_id")
+        with instrument("checkpoint.decode", container=self.memory_container_id,
+                        payload_size=len(doc["binary_data"])):
+            # Extract checkpoint data from binary_data
+            binary_data = doc["binary_data"]
+            parent_checkpoint_id = doc["namespace"].get("parent_checkpoint_id")
 
-        # Decode base64 and parse JSON
-        decoded_json = base64.b64decode(binary_data).decode('utf-8')
-        data = json.loads(decoded_json)
+            # Decode base64 and parse JSON
+            decoded_json = base64.b64decode(binary_data).decode('utf-8')
+            data = json.loads(decoded_json)
 
-        # Extract checkpoint and metadata
-        checkpoint_b64 = data["checkpoint"]
-        checkpoint_type = data["checkpoint_type"]
-        metadata_b64 = data["metadata"]
+            # Extract checkpoint and metadata
+            checkpoint_b64 = data["checkpoint"]
+            checkpoint_type = data["checkpoint_type"]
+            metadata_b64 = data["metadata"]
 
-        # Decode base64 and deserialize
-        checkpoint_bytes = base64.b64decode(checkpoint_b64)
-        checkpoint = self.serde.loads_typed((checkpoint_type, checkpoint_bytes))
+            # Decode base64 and deserialize
+            checkpoint_bytes = base64.b64decode(checkpoint_b64)
+            checkpoint = self.serde.loads_typed((checkpoint_type, checkpoint_bytes))
 
-        metadata_bytes = base64.b64decode(metadata_b64)
-        if metadata_bytes:
-            try:
-                # Try direct JSON decode first
-                decoded_metadata = json.loads(metadata_bytes.decode('utf-8'))
-                # Ensure required fields exist
-                if 'step' not in decoded_metadata:
-                    decoded_metadata['step'] = 0
-                if 'source' not in decoded_metadata:
-                    decoded_metadata['source'] = 'unknown'
-                metadata = cast(CheckpointMetadata, decoded_metadata)
-            except Exception:
-                # Fallback to default metadata with required fields
+            metadata_bytes = base64.b64decode(metadata_b64)
+            if metadata_bytes:
+                try:
+                    # Older checkpoints did not record the metadata type and are JSON
+                    decoded_metadata = self.jsonplus_serde.loads_typed(
+                        (data.get("metadata_type", "json"), metadata_bytes)
+                    )
+                    # Ensure required fields exist
+                    if 'step' not in decoded_metadata:
+                        decoded_metadata['step'] = 0
+                    if 'source' not in decoded_metadata:
+                        decoded_metadata['source'] = 'unknown'
+                    metadata = cast(CheckpointMetadata, decoded_metadata)
+                except Exception:
+                    # Fallback to default metadata with required fields
+                    metadata = cast(CheckpointMetadata, {'step': 0, 'source': 'unknown'})
+            else:
                 metadata = cast(CheckpointMetadata, {'step': 0, 'source': 'unknown'})
-        else:
-            metadata = cast(CheckpointMetadata, {'step': 0, 'source': 'unknown'})
 
         # Build config for this checkpoint
         checkpoint_config = {
@@ -339,23 +503,25 @@ class OpenSearchSaver(BaseCheckpointSaver[str]):
             writes_response = self.session.post(writes_url, json=writes_query)
             writes_response.raise_for_status()
             writes_data = writes_response.json()
-            writes_hits = writes_data.get("hits", {}).get("hits", [])
+            writes_hits = self._overlay(thread_id, writes_query, writes_data.get("hits", {}).get("hits", []))
             pending_writes = []
             for w in writes_hits:
-                binary_data = w["_source"]["binary_data"]
+                with instrument("write.decode", container=self.memory_container_id,
+                                payload_size=len(w["_source"]["binary_data"])):
+                    binary_data = w["_source"]["binary_data"]
 
-                # Decode base64 and parse JSON
-                decoded_json = base64.b64decode(binary_data).decode('utf-8')
-                data = json.loads(decoded_json)
+                    # Decode base64 and parse JSON
+                    decoded_json = base64.b64decode(binary_data).decode('utf-8')
+                    data = json.loads(decoded_json)
 
-                # Extract write data
-                channel = data["channel"]
-                value_b64 = data["value"]
-                value_type = data["value_type"]
+                    # Extract write data
+                    channel = data["channel"]
+                    value_b64 = data["value"]
+                    value_type = data["value_type"]
 
-                # Decode base64 and deserialize
-                value_bytes = base64.b64decode(value_b64)
-                deserialized_value = self.serde.loads_typed((value_type, value_bytes))
+                    # Decode base64 and deserialize
+                    value_bytes = base64.b64decode(value_b64)
+                    deserialized_value = self.serde.loads_typed((value_type, value_bytes))
 
                 pending_writes.append((
                     w["_source"]["namespace"]["task_id"],
@@ -451,29 +617,32 @@ class OpenSearchSaver(BaseCheckpointSaver[str]):
         except requests.exceptions.RequestException:
             return
 
-        for hit in data.get("hits", {}).get("hits", []):
+        for hit in self._overlay(thread_id, query, data.get("hits", {}).get("hits", [])):
             doc = hit["_source"]
-            binary_data = doc["binary_data"]
-            parent_checkpoint_id = doc["namespace"].get("parent_checkpoint_id")
-
-            # Decode base64 and parse JSON
-            decoded_json = base64.b64decode(binary_data).decode('utf-8')
-            checkpoint_data = json.loads(decoded_json)
-
-            # Extract checkpoint and metadata
-            checkpoint_b64 = checkpoint_data["checkpoint"]
-            checkpoint_type = checkpoint_data["checkpoint_type"]
-            metadata_b64 = checkpoint_data["metadata"]
-
-            # Decode base64 and deserialize (same as SqliteSaver)
-            checkpoint_bytes = base64.b64decode(checkpoint_b64)
-            checkpoint = self.serde.loads_typed((checkpoint_type, checkpoint_bytes))
+            with instrument("checkpoint.decode", container=self.memory_container_id,
+                            payload_size=len(doc["binary_data"])):
+                binary_data = doc["binary_data"]
+                parent_checkpoint_id = doc["namespace"].get("parent_checkpoint_id")
 
-            metadata_bytes = base64.b64decode(metadata_b64)
-            metadata = cast(
-                CheckpointMetadata,
-                self.jsonplus_serde.loads_typed(("json", metadata_bytes))[1] if metadata_bytes else {}
-            )
+                # Decode base64 and parse JSON
+                decoded_json = base64.b64decode(binary_data).decode('utf-8')
+                checkpoint_data = json.loads(decoded_json)
+
+                # Extract checkpoint and metadata
+                checkpoint_b64 = checkpoint_data["checkpoint"]
+                checkpoint_type = checkpoint_data["checkpoint_type"]
+                metadata_b64 = checkpoint_data["metadata"]
+
+                # Decode base64 and deserialize (same as SqliteSaver)
+                checkpoint_bytes = base64.b64decode(checkpoint_b64)
+                checkpoint = self.serde.loads_typed((checkpoint_type, checkpoint_bytes))
+
+                metadata_bytes = base64.b64decode(metadata_b64)
+                metadata_type = checkpoint_data.get("metadata_type", "json")
+                metadata = cast(
+                    CheckpointMetadata,
+                    self.jsonplus_serde.loads_typed((metadata_type, metadata_bytes)) if metadata_bytes else {}
+                )
 
             checkpoint_config = {
                 "configurable": {
@@ -512,23 +681,25 @@ class OpenSearchSaver(BaseCheckpointSaver[str]):
                 writes_response = self.session.post(url, json=writes_query)
                 writes_response.raise_for_status()
                 writes_data = writes_response.json()
-                writes_hits = writes_data.get("hits", {}).get("hits", [])
+                writes_hits = self._overlay(thread_id, writes_query, writes_data.get("hits", {}).get("hits", []))
                 pending_writes = []
                 for w in writes_hits:
-                    binary_data = w["_source"]["binary_data"]
+                    with instrument("write.decode", container=self.memory_container_id,
+                                    payload_size=len(w["_source"]["binary_data"])):
+                        binary_data = w["_source"]["binary_data"]
 
-                    # Decode base64 and parse JSON
-                    decoded_json = base64.b64decode(binary_data).decode('utf-8')
-                    write_data = json.loads(decoded_json)
+                        # Decode base64 and parse JSON
+                        decoded_json = base64.b64decode(binary_data).decode('utf-8')
+                        write_data = json.loads(decoded_json)
 
-                    # Extract write data
-                    channel = write_data["channel"]
-                    value_b64 = write_data["value"]
-                    value_type = write_data["value_type"]
+                        # Extract write data
+                        channel = write_data["channel"]
+                        value_b64 = write_data["value"]
+                        value_type = write_data["value_type"]
 
-                    # Decode base64 and deserialize (same as SqliteSaver)
-                    value_bytes = base64.b64decode(value_b64)
-                    deserialized_value = self.serde.loads_typed((value_type, value_bytes))
+                        # Decode base64 and deserialize (same as SqliteSaver)
+                        value_bytes = base64.b64decode(value_b64)
+                        deserialized_value = self.serde.loads_typed((value_type, value_bytes))
 
                     pending_writes.append((
                         w["_source"]["namespace"]["task_id"],
@@ -556,6 +727,7 @@ class OpenSearchSaver(BaseCheckpointSaver[str]):
                 pending_writes=pending_writes,
             )
 
+    @traced("checkpoint.put")
     def put(
             self,
             config: RunnableConfig,
@@ -581,31 +753,34 @@ class OpenSearchSaver(BaseCheckpointSaver[str]):
         # Ensure session exists
         self._ensure_session(thread_id)
 
-        # Serialize checkpoint and metadata (same as SqliteSaver approach)
-        type_, serialized_checkpoint = self.serde.dumps_typed(checkpoint)
-        metadata_type, serialized_metadata = self.jsonplus_serde.dumps_typed(
-            get_checkpoint_metadata(config, metadata)
-        )
+        with instrument("checkpoint.encode", container=self.memory_container_id) as span:
+            # Serialize checkpoint and metadata (same as SqliteSaver approach)
+            type_, serialized_checkpoint = self.serde.dumps_typed(checkpoint)
+            metadata_type, serialized_metadata = self.jsonplus_serde.dumps_typed(
+                get_checkpoint_metadata(config, metadata)
+            )
 
-        messages = []
-        # Debug: Print what's being saved
-        if "channel_values" in checkpoint and "messages" in checkpoint["channel_values"]:
-            for msg in checkpoint["channel_values"]["messages"]:
-                messages.append({"role": msg.type, "content": msg.content})
-
-        # Convert bytes to base64 string for JSON transport
-        checkpoint_b64 = base64.b64encode(serialized_checkpoint).decode('utf-8')
-        metadata_b64 = base64.b64encode(serialized_metadata).decode('utf-8')
-
-        # Create JSON structure and encode to binary_data
-        data = {
-            "checkpoint": checkpoint_b64,
-            "checkpoint_type": type_,
-            "metadata": metadata_b64,
-            "messages": messages,
-        }
-        encoded_json = json.dumps(data)
-        binary_data_b64 = base64.b64encode(encoded_json.encode('utf-8')).decode('utf-8')
+            messages = []
+            # Debug: Print what's being saved
+            if "channel_values" in checkpoint and "messages" in checkpoint["channel_values"]:
+                for msg in checkpoint["channel_values"]["messages"]:
+                    messages.append({"role": msg.type, "content": msg.content})
+
+            # Convert bytes to base64 string for JSON transport
+            checkpoint_b64 = base64.b64encode(serialized_checkpoint).decode('utf-8')
+            metadata_b64 = base64.b64encode(serialized_metadata).decode('utf-8')
+
+            # Create JSON structure and encode to binary_data
+            data = {
+                "checkpoint": checkpoint_b64,
+                "checkpoint_type": type_,
+                "metadata": metadata_b64,
+                "metadata_type": metadata_type,
+                "messages": messages,
+            }
+            encoded_json = json.dumps(data)
+            binary_data_b64 = base64.b64encode(encoded_json.encode('utf-8')).decode('utf-8')
+            span["payload_size"] = len(binary_data_b64)
 
         # Create working memory document with payload_type="data"
         # Use metadata.type="checkpoint" to distinguish from writes
@@ -642,12 +817,15 @@ class OpenSearchSaver(BaseCheckpointSaver[str]):
         try:
             response = self.session.post(url, json=memory_doc)
             response.raise_for_status()
+            self._record_write(thread_id, response, memory_doc)
         except Exception as e:
             print(f"❌ Failed to save checkpoint: {e}")
             # Print response details if available
             if hasattr(e, 'response') and e.response is not None:
                 print(f"   Response status: {e.response.status_code}")
                 print(f"   Response body: {e.response.text[:500]}")
+            # Retries are exhausted, losing the checkpoint silently would corrupt the thread
+            raise
 
         return {
             "configurable": {
@@ -657,6 +835,7 @@ class OpenSearchSaver(BaseCheckpointSaver[str]):
             }
         }
 
+    @traced("checkpoint.put_writes")
     def put_writes(
             self,
             config: RunnableConfig,
@@ -687,20 +866,22 @@ class OpenSearchSaver(BaseCheckpointSaver[str]):
         # Store each write as a separate memory document
         # Use payload_type="data" with metadata.type="write"
         for idx, (channel, value) in enumerate(writes):
-            # Serialize (same as SqliteSaver)
-            type_, serialized_value = self.serde.dumps_typed(value)
+            with instrument("write.encode", container=self.memory_container_id) as span:
+                # Serialize (same as SqliteSaver)
+                type_, serialized_value = self.serde.dumps_typed(value)
 
-            # Convert bytes to base64 string
-            value_b64 = base64.b64encode(serialized_value).decode('utf-8')
+                # Convert bytes to base64 string
+                value_b64 = base64.b64encode(serialized_value).decode('utf-8')
 
-            # Create JSON structure and encode to binary_data
-            data = {
-                "channel": channel,
-                "value": value_b64,
-                "value_type": type_,
-            }
-            encoded_json = json.dumps(data)
-            binary_data_b64 = base64.b64encode(encoded_json.encode('utf-8')).decode('utf-8')
+                # Create JSON structure and encode to binary_data
+                data = {
+                    "channel": channel,
+                    "value": value_b64,
+                    "value_type": type_,
+                }
+                encoded_json = json.dumps(data)
+                binary_data_b64 = base64.b64encode(encoded_json.encode('utf-8')).decode('utf-8')
+                span["payload_size"] = len(binary_data_b64)
 
             # Use WRITES_IDX_MAP for special write types (errors, interrupts, etc.)
             write_idx = WRITES_IDX_MAP.get(channel, idx)
@@ -729,8 +910,10 @@ class OpenSearchSaver(BaseCheckpointSaver[str]):
             try:
                 response = self.session.post(url, json=write_doc)
                 response.raise_for_status()
+                self._record_write(thread_id, response, write_doc)
             except Exception as e:
-                print(f"An unexpected error occurred: {e}")
+                print(f"❌ Failed to save write for channel '{channel}': {e}")
+                raise
 
     def delete_thread(self, thread_id: str) -> None:
         """Delete all checkpoints and writes for a thread.
@@ -738,6 +921,9 @@ class OpenSearchSaver(BaseCheckpointSaver[str]):
         Args:
             thread_id: The thread ID to delete
         """
+        if self.recent_writes is not None:
+            self.recent_writes.forget(str(thread_id))
+
         # Delete all memories for this thread using delete by query
         query = {
             "query": {
@@ -762,7 +948,7 @@ class OpenSearchSaver(BaseCheckpointSaver[str]):
                 )
                 search_response = self.session.post(
                     search_url,
-                    json={**query, "size": 10000}
+                    json={**query, "size": 10000},
                 )
                 search_response.raise_for_status()
                 search_data = search_response.json()
@@ -1,16 +1,22 @@
+import contextvars
 import json
 import logging
 import os
+import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from contextlib import contextmanager
 from enum import Enum
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional
 
-from opensearch_agentic_memory import OpenSearchAgenticMemory
+from opensearch_agentic_memory import InferenceHandle, OpenSearchAgenticMemory
 from rich.console import Console
 from rich.panel import Panel
 from rich.table import Table
 from rich.text import Text
 from strands import tool
-from strands.types.tools import AgentTool
+from strands.types.tools import AgentTool, ToolContext
 
 # Set up logging
 logger = logging.getLogger(__name__)
@@ -24,19 +30,178 @@ class MemoryAction(str, Enum):
     """Enum for memory actions."""
 
     STORE = "store"
+    STORE_BATCH = "store_batch"
     GET = "get"
+    GET_BATCH = "get_batch"
     SEARCH = "search"
     DELETE = "delete"
+    DELETE_BATCH = "delete_batch"
+    DELETE_BY_QUERY = "delete_by_query"
 
 
 # Define required parameters for each action
 REQUIRED_PARAMS = {
     MemoryAction.STORE: ["user_id", "content"],
+    MemoryAction.STORE_BATCH: ["user_id", "contents"],
     MemoryAction.SEARCH: ["user_id", "query"],
     MemoryAction.GET: ["memory_id"],
     MemoryAction.DELETE: ["memory_id"],
+    MemoryAction.GET_BATCH: ["memory_ids"],
+    MemoryAction.DELETE_BATCH: ["memory_ids"],
+    MemoryAction.DELETE_BY_QUERY: ["user_id"],
 }
 
+class RenderMode(str, Enum):
+    """How tool output is rendered to the console."""
+
+    RICH = "rich"
+    PLAIN = "plain"
+    OFF = "off"
+
+
+# Memory identity of the current call, bound with memory_identity()
+_memory_identity: contextvars.ContextVar[Dict[str, str]] = contextvars.ContextVar(
+    "opensearch_memory_identity", default={}
+)
+
+# Memory clients shared by all providers with the same connection settings,
+# least recently used first
+MAX_MEMORY_CLIENTS = int(os.getenv("OPENSEARCH_MEMORY_MAX_CLIENTS", "32"))
+_memory_clients: "OrderedDict[Any, OpenSearchAgenticMemory]" = OrderedDict()
+_memory_clients_inflight: Dict[Any, Future] = {}
+_memory_clients_lock = threading.Lock()
+
+
+@contextmanager
+def memory_identity(
+    user_id: Optional[str] = None,
+    session_id: Optional[str] = None,
+    agent_id: Optional[str] = None,
+) -> Iterator[None]:
+    """
+    Bind the memory identity used by opensearch_memory tool calls made in this context.
+
+    This lets one provider serve many users: wrap each agent invocation with the
+    caller's identity instead of constructing a provider per user. The bound identity
+    wins over IDs the model passes to the tool: a call naming different IDs is rejected,
+    and memories fetched or deleted by ID are limited to the bound user's.
+
+    The identity lives in a context variable, which a plain ThreadPoolExecutor.submit
+    does not carry into the worker thread. Submit contextvars.copy_context().run there,
+    or pass the identity in the agent's invocation state instead, which reaches the
+    tool whichever thread runs it:
+
+        agent("What do you remember about me?", memory_identity={"user_id": "bob"})
+
+    Example:
+        with memory_identity(user_id="bob", session_id="bob_session"):
+            agent("What do you remember about me?")
+    """
+    identity = {**_memory_identity.get()}
+    identity.update({
+        k: v
+        for k, v in {"user_id": user_id, "session_id": session_id, "agent_id": agent_id}.items()
+        if v is not None
+    })
+    token = _memory_identity.set(identity)
+    try:
+        yield
+    finally:
+        _memory_identity.reset(token)
+
+
+def _shared_memory_client(**kwargs: Any) -> OpenSearchAgenticMemory:
+    """Return the memory client for these connection settings, creating it once per process.
+
+    At most MAX_MEMORY_CLIENTS clients are kept; the least recently used one is dropped
+    from the pool (providers already holding it keep working).
+    """
+    memory, _ = _get_pooled(_memory_clients, _memory_clients_inflight, _memory_clients_lock, _freeze(kwargs),
+                            lambda: OpenSearchAgenticMemory(**kwargs), MAX_MEMORY_CLIENTS)
+    return memory
+
+
+def _get_pooled(pool: "OrderedDict[Any, Any]", inflight: Dict[Any, Future], lock: threading.Lock, key: Any,
+                create: Callable[[], Any], max_size: int) -> tuple[Any, list[Any]]:
+    """Return the pooled value for key and the values evicted to stay within max_size.
+
+    The lock only guards the pool itself. A missing value is created outside of it,
+    once per key: concurrent callers for the same key wait for that creation, callers
+    for other keys are not held up by it.
+    """
+    with lock:
+        value = pool.get(key)
+        if value is not None:
+            pool.move_to_end(key)
+            return value, []
+        future = inflight.get(key)
+        owner = future is None
+        if owner:
+            future = Future()
+            inflight[key] = future
+
+    if not owner:
+        return future.result(), []
+    try:
+        value = create()
+    except BaseException as e:
+        with lock:
+            inflight.pop(key, None)
+        future.set_exception(e)
+        raise
+    evicted = []
+    with lock:
+        inflight.pop(key, None)
+        pool[key] = value
+        while len(pool) > max_size:
+            evicted.append(pool.popitem(last=False)[1])
+    future.set_result(value)
+    return value, evicted
+
+
+def _current_identity(tool_context: Optional[ToolContext]) -> Dict[str, str]:
+    """Identity bound with memory_identity(), overridden by the agent's invocation state."""
+    identity = {**_memory_identity.get()}
+    if tool_context is not None:
+        identity.update({k: v for k, v in tool_context.invocation_state.get("memory_identity", {}).items() if v})
+    return identity
+
+
+# Providers shared through OpenSearchMemoryToolProvider.get_or_create, least recently used first
+MAX_POOLED_PROVIDERS = int(os.getenv("OPENSEARCH_MEMORY_MAX_PROVIDERS", "128"))
+_provider_pool: "OrderedDict[Any, OpenSearchMemoryToolProvider]" = OrderedDict()
+_provider_pool_inflight: Dict[Any, Future] = {}
+_provider_pool_lock = threading.Lock()
+
+
+def _discover_tool_names(cls: type) -> tuple[str, ...]:
+    """Names of the @tool decorated methods defined on a class or its bases."""
+    names = set()
+    for klass in cls.__mro__:
+        for attr_name, attr in vars(klass).items():
+            if isinstance(attr, AgentTool):
+                names.add(attr_name)
+    return tuple(sorted(names))
+
+
+def _freeze(value: Any) -> Any:
+    """Turn keyword arguments into a hashable pool key."""
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+# Page size for the search action when no limit is given
+DEFAULT_SEARCH_LIMIT = 10
+
+# Memory fields returned to the model by default, besides id and score
+DEFAULT_RESULT_FIELDS = ["memory"]
+
+# Rough characters-per-token ratio used to enforce the result token budget
+CHARS_PER_TOKEN = 4
+
 
 class OpenSearchMemoryToolProvider:
     """Provider for OpenSearch Agentic Memory tools."""
@@ -55,6 +220,13 @@ class OpenSearchMemoryToolProvider:
         embedding_model_id: Optional[str] = None,
         llm_id: Optional[str] = None,
         infer: bool = False,
+        render_mode: Optional[str] = None,
+        console_sink: Optional[Any] = None,
+        compact_results: bool = True,
+        result_fields: Optional[List[str]] = None,
+        max_result_tokens: Optional[int] = 1000,
+        memory: Optional[OpenSearchAgenticMemory] = None,
+        extraction_timeout: Optional[float] = None,
     ):
         """
         Initialize the OpenSearch Memory tool provider.
@@ -65,13 +237,28 @@ class OpenSearchMemoryToolProvider:
             password: OpenSearch password
             session_id: Default session ID to use for operations
             agent_id: Default agent ID to use for operations
-            user_id: Default user ID to use for operations
+            user_id: Default user ID to use for operations. Leave the IDs unset to serve many
+                     users from one provider and bind them per call with memory_identity()
             memory_container_id: Optional memory container ID
             memory_container_name: Name for the memory container
             memory_container_description: Description for the memory container
             embedding_model_id: Optional embedding model ID
             llm_id: Optional LLM model ID
             infer: Whether to enable inference
+            render_mode: How tool output is rendered, one of "rich", "plain" or "off"
+                         (defaults to OPENSEARCH_MEMORY_RENDER, or "rich")
+            console_sink: Where output is rendered; defaults to a shared rich Console in
+                          "rich" mode, stdout in "plain" mode and nothing in "off" mode
+            compact_results: Return search results to the model as compact id/score/field
+                             lines instead of raw OpenSearch hits
+            result_fields: Memory fields included in compact results (defaults to ["memory"])
+            max_result_tokens: Approximate token budget for compact results; memories past
+                               the budget are dropped, in result order
+            memory: Optional memory client to use; by default providers for the same cluster,
+                    credentials and container share one client and connection pool
+            extraction_timeout: Seconds store_batch waits for long-term memory extraction so it
+                                can return the ids of the user's memories extracted since the
+                                write; None returns right away
 
         Raises:
             ValueError: If required credentials are missing
@@ -86,54 +273,111 @@ class OpenSearchMemoryToolProvider:
         self.user_id = user_id
         self.embedding_model_id = embedding_model_id
         self.llm_id = llm_id
-
-        if not all([self.cluster_url, self.username, self.password]):
-            raise ValueError(
-                "OpenSearch credentials required. Set OPENSEARCH_CLUSTER_URL, "
-                "OPENSEARCH_USERNAME, and OPENSEARCH_PASSWORD environment variables "
-                "or provide them as parameters."
+        self.compact_results = compact_results
+        self.result_fields = result_fields or DEFAULT_RESULT_FIELDS
+        self.max_result_tokens = max_result_tokens
+        self.extraction_timeout = extraction_timeout
+        self.render_mode = RenderMode(render_mode or os.getenv("OPENSEARCH_MEMORY_RENDER", RenderMode.RICH.value))
+        if console_sink is not None:
+            self.console = console_sink
+        elif self.render_mode == RenderMode.RICH:
+            self.console = console
+        elif self.render_mode == RenderMode.PLAIN:
+            self.console = sys.stdout
+        else:
+            self.console = None
+
+        # Only a client taken from the shared pool is closed by close(), never the caller's
+        self._owns_memory = memory is None
+        if memory is None:
+            if not all([self.cluster_url, self.username, self.password]):
+                raise ValueError(
+                    "OpenSearch credentials required. Set OPENSEARCH_CLUSTER_URL, "
+                    "OPENSEARCH_USERNAME, and OPENSEARCH_PASSWORD environment variables "
+                    "or provide them as parameters."
+                )
+
+            memory = _shared_memory_client(
+                cluster_url=self.cluster_url,
+                username=self.username,
+                password=self.password,
+                memory_container_id=memory_container_id,
+                memory_container_name=memory_container_name,
+                memory_container_description=memory_container_description,
+                embedding_model_id=self.embedding_model_id,
+                llm_id=self.llm_id,
+                infer=infer,
+                long_term=True
             )
-        
-        self.memory = OpenSearchAgenticMemory(
-            cluster_url=self.cluster_url,
-            username=self.username,
-            password=self.password,
-            memory_container_id=memory_container_id,
-            memory_container_name=memory_container_name,
-            memory_container_description=memory_container_description,
-            embedding_model_id=self.embedding_model_id,
-            llm_id=self.llm_id,
-            infer=infer,
-            long_term=True
-        )
+        self.memory = memory
+        self._tools: Optional[list[AgentTool]] = None
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        cls._tool_names = _discover_tool_names(cls)
+
+    @classmethod
+    def get_or_create(cls, **kwargs: Any) -> "OpenSearchMemoryToolProvider":
+        """Return a pooled provider for these arguments, creating it on first use.
+
+        Agents built per request can share one provider (and its memory client and
+        connection pool) instead of re-resolving the memory container every time.
+        At most MAX_POOLED_PROVIDERS are kept; the least recently used one is closed.
+        """
+        provider, evicted = _get_pooled(_provider_pool, _provider_pool_inflight, _provider_pool_lock,
+                                        (cls, _freeze(kwargs)), lambda: cls(**kwargs), MAX_POOLED_PROVIDERS)
+        for old in evicted:
+            old.close()
+        return provider
+
+    @classmethod
+    def clear_pool(cls) -> None:
+        """Drop and close all pooled providers."""
+        with _provider_pool_lock:
+            providers = list(_provider_pool.values())
+            _provider_pool.clear()
+        for provider in providers:
+            provider.close()
+
+    def close(self) -> None:
+        """Close the connections of a pooled memory client no longer shared through the client pool.
+
+        A memory client passed in by the caller is left open; its owner closes it.
+        """
+        if not self._owns_memory:
+            return
+        with _memory_clients_lock:
+            shared = any(memory is self.memory for memory in _memory_clients.values())
+        if not shared:
+            self.memory.session.close()
 
     @property
     def tools(self) -> list[AgentTool]:
         """Extract all @tool decorated methods from this instance."""
-        tools = []
-
-        for attr_name in dir(self):
-            if attr_name == "tools":
-                continue
-            attr = getattr(self, attr_name)
-            if isinstance(attr, AgentTool):
-                tools.append(attr)
-
-        return tools
+        # Tool names are discovered once per class; bound tools are cached per instance
+        if self._tools is None:
+            self._tools = [getattr(self, attr_name) for attr_name in self._tool_names]
+        return list(self._tools)
 
-    @tool
+    @tool(context=True)
     def opensearch_memory(
         self,
         action: str,
         content: Optional[str] = None,
+        contents: Optional[List[str]] = None,
         query: Optional[str] = None,
         session_id: Optional[str] = None,
         agent_id: Optional[str] = None,
         user_id: Optional[str] = None,
         memory_id: Optional[str] = None,
+        memory_ids: Optional[List[str]] = None,
+        older_than_days: Optional[int] = None,
         metadata: Optional[Dict] = None,
         limit: Optional[int] = None,
         offset: Optional[int] = None,
+        cursor: Optional[str] = None,
+        fields: Optional[List[str]] = None,
+        tool_context: Optional[ToolContext] = None,
     ) -> Dict:
         """
         Work with OpenSearch memories - store, search, retrieve, and delete memory records.
@@ -153,36 +397,71 @@ class OpenSearchMemoryToolProvider:
         - store: Store a new memory (conversation or data)
           Use this when you need to save information for later recall.
 
+        - store_batch: Store several memories at once
+          Use this instead of repeated store calls when you have more than one fact to save.
+          The whole batch is written as one working memory and returns one working_memory_id;
+          memory_ids of the user's long-term memories extracted since the write are included when
+          extraction finishes in time.
+
         - get: Fetch a specific memory by memory ID
           Use this when you already know the exact message ID.
 
+        - get_batch: Fetch several memories by their memory IDs in one call
+
         - search: search memories with a query
           Use this when searching for all memories
 
         - delete: Remove a specific memory by memory ID
           Use this to delete memory that are no longer needed.
 
+        - delete_batch: Remove several memories by their memory IDs in one call
+
+        - delete_by_query: Remove all memories of a user, or only those older than older_than_days
+
         Args:
-            action: The memory operation to perform (one of: "store", "get", "search", "delete")
+            action: The memory operation to perform (one of: "store", "store_batch", "get", "get_batch",
+                    "search", "delete", "delete_batch", "delete_by_query")
             content: For store action: Simple text string to store as a memory
                      (e.g., "User prefers vegetarian pizza with extra cheese")
+            contents: For store_batch action: List of text strings, each stored as a separate memory
             query: For search action: Simple text string to search for
             session_id: Session ID (uses default from initialization if not provided)
             agent_id: Agent ID (uses default from initialization if not provided)
-            user_id: User ID (uses default from initialization if not provided)
+            user_id: User ID (uses default from initialization if not provided). An ID that
+                     differs from the one bound to this call is rejected
             memory_id: ID of a specific memory (required for get/delete action)
+            memory_ids: IDs of several memories (required for get_batch/delete_batch action)
+            older_than_days: For delete_by_query action: only delete memories older than this many days
             metadata: Optional metadata to store with the memory (for store action)
             limit: Maximum number of results to return (optional, for search action)
             offset: Offset for pagination (optional, for search action)
+            cursor: Cursor returned as "next_cursor" by a previous search, to fetch the next page
+                    (optional, for search action; takes precedence over offset)
+            fields: Memory fields to return, e.g. ["memory", "tags"] (optional, for search action)
 
         Returns:
             Dict: Response containing the requested memory information or operation status
         """
         try:
-            # Use provided values or defaults from initialization
-            session_id = session_id or self.session_id
-            agent_id = agent_id or self.agent_id
-            user_id = user_id or self.user_id
+            # The identity from the invocation state or memory_identity(), then the provider
+            # defaults, is bound by the application; IDs chosen by the model cannot override it
+            bound = {
+                **{k: v for k, v in (("session_id", self.session_id), ("agent_id", self.agent_id),
+                                     ("user_id", self.user_id)) if v},
+                **_current_identity(tool_context),
+            }
+            requested = {"session_id": session_id, "agent_id": agent_id, "user_id": user_id}
+            conflicts = [k for k, v in requested.items() if v and bound.get(k) and v != bound[k]]
+            if conflicts:
+                return {
+                    "status": "error",
+                    "content": [
+                        {"text": f"{', '.join(conflicts)} cannot differ from the identity bound to this call"}
+                    ],
+                }
+            session_id = bound.get("session_id") or session_id
+            agent_id = bound.get("agent_id") or agent_id
+            user_id = bound.get("user_id") or user_id
 
             # Try to convert string action to Enum
             try:
@@ -204,8 +483,10 @@ class OpenSearchMemoryToolProvider:
                 "agent_id": agent_id,
                 "user_id": user_id,
                 "content": content,
+                "contents": contents,
                 "query": query,
                 "memory_id": memory_id,
+                "memory_ids": memory_ids,
             }
 
             # Check which required parameters are missing
@@ -228,85 +509,262 @@ class OpenSearchMemoryToolProvider:
             strands_dev = os.environ.get("BYPASS_TOOL_CONSENT", "").lower() == "true"
 
             # For mutative operations, show confirmation dialog unless in BYPASS_TOOL_CONSENT mode
-            mutative_actions = {MemoryAction.STORE, MemoryAction.DELETE}
+            mutative_actions = {
+                MemoryAction.STORE,
+                MemoryAction.STORE_BATCH,
+                MemoryAction.DELETE,
+                MemoryAction.DELETE_BATCH,
+                MemoryAction.DELETE_BY_QUERY,
+            }
             needs_confirmation = action_enum in mutative_actions and not strands_dev
 
             if needs_confirmation:
                 if action_enum == MemoryAction.STORE:
                     # Preview what will be stored
-                    content_preview = content[:15000] + "..." if len(content) > 15000 else content
                     preview_title = f"Add long-term memory for session {session_id}, agent {agent_id}"
-                    console.print(
-                        Panel(
-                            content_preview,
+                    self._render(
+                        lambda: Panel(
+                            content[:15000] + "..." if len(content) > 15000 else content,
+                            title=f"[bold green]{preview_title}",
+                            border_style="green",
+                        ),
+                        lambda: f"{preview_title}: {content[:200]}",
+                    )
+
+                elif action_enum == MemoryAction.STORE_BATCH:
+                    preview_title = (
+                        f"Add {len(contents)} long-term memories for session {session_id}, agent {agent_id}"
+                    )
+
+                    def batch_preview() -> str:
+                        preview = "\n".join(f"- {item}" for item in contents)
+                        return preview[:15000] + "..." if len(preview) > 15000 else preview
+
+                    self._render(
+                        lambda: Panel(
+                            batch_preview(),
                             title=f"[bold green]{preview_title}",
                             border_style="green",
-                        )
+                        ),
+                        lambda: preview_title,
                     )
 
                 elif action_enum == MemoryAction.DELETE:
-                    console.print(
-                        Panel(
+                    self._render(
+                        lambda: Panel(
                             f"Long-term memory ID: {memory_id}",
                             title="[bold red]⚠️ Long term memory to be permanently deleted",
                             border_style="red",
-                        )
+                        ),
+                        lambda: f"Long term memory to be permanently deleted: {memory_id}",
+                    )
+
+                elif action_enum == MemoryAction.DELETE_BATCH:
+                    self._render(
+                        lambda: Panel(
+                            "\n".join(f"Long-term memory ID: {item}" for item in memory_ids),
+                            title=f"[bold red]⚠️ {len(memory_ids)} long term memories to be permanently deleted",
+                            border_style="red",
+                        ),
+                        lambda: f"Long term memories to be permanently deleted: {', '.join(memory_ids)}",
+                    )
+
+                elif action_enum == MemoryAction.DELETE_BY_QUERY:
+                    age = f" older than {older_than_days} days" if older_than_days else ""
+                    self._render(
+                        lambda: Panel(
+                            f"All long-term memories of user {user_id}{age}",
+                            title="[bold red]⚠️ Long term memories to be permanently deleted",
+                            border_style="red",
+                        ),
+                        lambda: f"Long term memories to be permanently deleted: user {user_id}{age}",
                     )
 
             # Execute the appropriate action
             try:
                 if action_enum == MemoryAction.STORE:
                     result = self._store_memory(session_id, agent_id, user_id, content, metadata)
-                    panel = self._format_store_response(result)
-                    console.print(panel)
+                    self._render(
+                        lambda: self._format_store_response(result),
+                        lambda: f"Memory stored: {result.get('working_memory_id', 'unknown')}",
+                    )
                     return {
                         "status": "success",
                         "content": [{"text": f"Memory stored successfully: {json.dumps(result, default=str)}"}],
                     }
 
+                elif action_enum == MemoryAction.STORE_BATCH:
+                    result = self._store_memories(session_id, agent_id, user_id, contents, metadata)
+                    result = self._with_extracted_ids(result, user_id)
+                    self._render(
+                        lambda: self._format_store_response(result),
+                        lambda: f"{len(contents)} memories stored: {result.get('working_memory_id', 'unknown')}",
+                    )
+                    return {
+                        "status": "success",
+                        "content": [
+                            {
+                                "text": f"{len(contents)} memories stored successfully as one working memory "
+                                f"(the working_memory_id covers the whole batch): {json.dumps(result, default=str)}"
+                            }
+                        ],
+                    }
+
                 elif action_enum == MemoryAction.GET:
-                    memory = self._get_memory(memory_id)
-                    panel = self._format_get_response(memory)
-                    console.print(panel)
+                    memory = self._get_memory(memory_id, user_id)
+                    if memory is None:
+                        return {"status": "error", "content": [{"text": f"Memory {memory_id} not found"}]}
+                    self._render(
+                        lambda: self._format_get_response(memory),
+                        lambda: f"Memory retrieved: {memory_id}",
+                    )
                     return {
                         "status": "success",
                         "content": [{"text": f"Message retrieved successfully: {json.dumps(memory, default=str)}"}],
                     }
 
                 elif action_enum == MemoryAction.SEARCH:
-                    memories = self._search_long_term_memories(query, user_id)
-                    panel = self._format_search_response(memories or [])
-                    console.print(panel)
+                    search_after = json.loads(cursor) if cursor else None
+                    if self.compact_results:
+                        # Only fetch the fields that will be projected into the result
+                        fields = fields or self.result_fields
+                    memories = self._search_long_term_memories(
+                        query, user_id, limit=limit, offset=offset, search_after=search_after, fields=fields
+                    )
+                    self._render(
+                        lambda: self._format_search_response(memories or []),
+                        lambda: f"{len(memories or [])} long term memories found",
+                    )
+                    text, shown = self._memories_text(memories or [], fields)
+                    content = [{"text": f"Memories searched successfully: {text}"}]
+                    # A full page may have more results behind it, and memories cut by the token
+                    # budget are fetched again by continuing after the last one returned
+                    page_size = limit or DEFAULT_SEARCH_LIMIT
+                    if memories and (len(memories) == page_size or shown < len(memories)) \
+                            and "sort" in memories[shown - 1]:
+                        content.append({"text": f"next_cursor: {json.dumps(memories[shown - 1]['sort'], default=str)}"})
                     return {
                         "status": "success",
-                        "content": [
-                            {"text": f"Memories searched successfully: {json.dumps(memories or [], default=str)}"}
-                        ],
+                        "content": content,
                     }
 
                 elif action_enum == MemoryAction.DELETE:
-                    self._delete_long_term_memory(memory_id)
-                    panel = self._format_delete_response(session_id)
-                    console.print(panel)
+                    result = self._delete_long_term_memory(memory_id, user_id)
+                    if user_id and not (result or {}).get("deleted"):
+                        return {"status": "error", "content": [{"text": f"Memory {memory_id} not found"}]}
+                    self._render(
+                        lambda: self._format_delete_response(session_id),
+                        lambda: f"Memory deleted: {memory_id}",
+                    )
                     return {
                         "status": "success",
                         "content": [{"text": f"Session {session_id} deleted successfully"}],
                     }
 
+                elif action_enum == MemoryAction.GET_BATCH:
+                    memories = self._get_memories(memory_ids, user_id)
+                    self._render(
+                        lambda: self._format_search_response(memories),
+                        lambda: f"{len(memories)} memories retrieved",
+                    )
+                    return {
+                        "status": "success",
+                        "content": [
+                            {"text": f"Memories retrieved successfully: {self._memories_text(memories, fields)[0]}"}
+                        ],
+                    }
+
+                elif action_enum in (MemoryAction.DELETE_BATCH, MemoryAction.DELETE_BY_QUERY):
+                    if action_enum == MemoryAction.DELETE_BATCH:
+                        result = self._delete_long_term_memories(memory_ids, user_id)
+                    else:
+                        older_than = f"{older_than_days}d" if older_than_days else None
+                        result = self._delete_long_term_memories_by_query(user_id, older_than)
+                    self._render(
+                        lambda: self._format_bulk_delete_response(result),
+                        lambda: f"{(result or {}).get('deleted', 0)} memories deleted",
+                    )
+                    return {
+                        "status": "success",
+                        "content": [{"text": f"{(result or {}).get('deleted', 0)} memories deleted successfully"}],
+                    }
+
             except Exception as e:
                 error_msg = f"API error: {str(e)}"
                 logger.error(error_msg)
                 return {"status": "error", "content": [{"text": error_msg}]}
 
         except Exception as e:
-            logger.error(f"Unexpected error in opensearch_memory tool: {str(e)}")
-            error_panel = Panel(
-                Text(str(e), style="red"),
-                title="❌ Memory Operation Error",
-                border_style="red",
+            # e is unbound once the except block ends, so the render callbacks capture the message
+            message = str(e)
+            logger.error(f"Unexpected error in opensearch_memory tool: {message}")
+            self._render(
+                lambda: Panel(
+                    Text(message, style="red"),
+                    title="❌ Memory Operation Error",
+                    border_style="red",
+                ),
+                lambda: f"Memory operation error: {message}",
             )
-            console.print(error_panel)
-            return {"status": "error", "content": [{"text": str(e)}]}
+            return {"status": "error", "content": [{"text": message}]}
+
+    def _memories_text(self, memories: List[Dict], fields: Optional[List[str]] = None) -> tuple[str, int]:
+        """Serialize memory hits for the model, compacted and within the token budget if enabled.
+
+        Returns the text and how many of the memories it includes, in result order.
+        """
+        if not self.compact_results:
+            return json.dumps(memories, default=str), len(memories)
+
+        fields = fields or self.result_fields
+        lines = []
+        used_tokens = 0
+        for index, hit in enumerate(memories):
+            item = {"id": hit.get("_id")}
+            if hit.get("_score") is not None:
+                item["score"] = round(hit["_score"], 4)
+            source = hit.get("_source", {})
+            item.update({field: source[field] for field in fields if field in source})
+            line = json.dumps(item, default=str, ensure_ascii=False, separators=(",", ":"))
+
+            line_tokens = -(-len(line) // CHARS_PER_TOKEN)
+            if self.max_result_tokens is not None and used_tokens + line_tokens > self.max_result_tokens:
+                if not lines:
+                    # Always return the best match, with its memory text cut down to the budget
+                    overflow = len(line) - self.max_result_tokens * CHARS_PER_TOKEN
+                    if isinstance(item.get("memory"), str):
+                        item["memory"] = item["memory"][:max(0, len(item["memory"]) - overflow - 3)] + "..."
+                        line = json.dumps(item, default=str, ensure_ascii=False, separators=(",", ":"))
+                    lines.append(line)
+                    index += 1
+                if index < len(memories):
+                    lines.append(f"... {len(memories) - index} more memories omitted (token budget)")
+                return "\n".join(lines), index
+            lines.append(line)
+            used_tokens += line_tokens
+
+        return ("\n".join(lines) if lines else "[]"), len(memories)
+
+    def _render(self, build_panel: Callable[[], Any], build_text: Callable[[], str]) -> None:
+        """Render tool output to the attached console sink.
+
+        Both builders are only called when there is a sink to write to, so with
+        RenderMode.OFF (or no sink) the tool does no formatting work at all.
+        """
+        if self.render_mode == RenderMode.OFF or self.console is None:
+            return
+        if self.render_mode == RenderMode.PLAIN:
+            self.console.write(build_text() + "\n")
+        else:
+            self.console.print(build_panel())
+
+    def attach_console(self, sink: Any) -> None:
+        """Attach a console sink: a rich Console for RICH mode, a text stream for PLAIN mode."""
+        self.console = sink
+
+    def detach_console(self) -> None:
+        """Detach the console sink, turning rendering off until one is attached again."""
+        self.console = None
 
     def _store_memory(
         self,
@@ -322,22 +780,72 @@ class OpenSearchMemoryToolProvider:
             message.update(metadata)
         return self.memory.add_message(session_id, agent_id, message, infer=True, user_id=user_id)
 
-    def _get_memory(self, memory_id: str) -> Dict:
-        """Get a specific message by ID."""
-        return self.memory.get_long_term_memory(memory_id)
+    def _store_memories(
+        self,
+        session_id: str,
+        agent_id: str,
+        user_id: str,
+        contents: List[str],
+        metadata: Optional[Dict] = None,
+    ) -> Dict:
+        """Store several memories with a single request and a single inference run."""
+        messages = [{"role": "user", "content": [{"text": content}]} for content in contents]
+        return self.memory.add_messages(session_id, agent_id, messages, infer=True, user_id=user_id, metadata=metadata)
+
+    def _with_extracted_ids(self, result: Dict, user_id: str) -> Dict:
+        """Add the ids of the long-term memories extracted from a stored batch, if extraction completes in time."""
+        if self.extraction_timeout is None or not result or "working_memory_id" not in result:
+            return result
+        handle = self.memory.track_inference(result, user_id).wait(self.extraction_timeout)
+        if handle.status != InferenceHandle.COMPLETED:
+            return result
+        return {**result, "memory_ids": handle.memory_ids}
+
+    def _get_memory(self, memory_id: str, user_id: Optional[str] = None) -> Optional[Dict]:
+        """Get a specific memory by ID, only if user_id (when known) owns it."""
+        return self.memory.get_long_term_memory(memory_id, user_id)
+
+    def _search_long_term_memories(
+        self,
+        question: str,
+        user_id: str,
+        limit: Optional[int] = None,
+        offset: Optional[int] = None,
+        search_after: Optional[List[Any]] = None,
+        fields: Optional[List[str]] = None,
+    ) -> List[Dict]:
+        """Search long-term memories for a user, one page at a time."""
+        return self.memory.search_long_term_memories(
+            question,
+            user_id=user_id,
+            k=limit or DEFAULT_SEARCH_LIMIT,
+            offset=offset or 0,
+            search_after=search_after,
+            source_fields=fields,
+        )
+
+    def _delete_long_term_memory(self, memory_id: str, user_id: Optional[str] = None) -> Dict:
+        """Delete a long-term memory by ID, only if user_id (when known) owns it."""
+        return self.memory.delete_long_term_memory(memory_id, user_id)
+
+    def _get_memories(self, memory_ids: List[str], user_id: Optional[str] = None) -> List[Dict]:
+        """Get several long-term memories by ID, only those of user_id when known."""
+        return self.memory.get_long_term_memories(memory_ids, user_id)
 
-    def _search_long_term_memories(self, question: str, user_id: str) -> List[Dict]:
-        """Search for messages in a session."""
-        return self.memory.search_long_term_memories(question, user_id=user_id)
+    def _delete_long_term_memories(self, memory_ids: List[str], user_id: Optional[str] = None) -> Dict:
+        """Delete several long-term memories by ID, only those of user_id when known."""
+        return self.memory.delete_long_term_memories(memory_ids, user_id)
 
-    def _delete_long_term_memory(self, memory_id: str) -> Dict:
-        """Delete a session and all its messages."""
-        return self.memory.delete_long_term_memory(memory_id)
+    def _delete_long_term_memories_by_query(self, user_id: str, older_than: Optional[str] = None) -> Dict:
+        """Delete a user's long-term memories, optionally only the old ones."""
+        return self.memory.delete_long_term_memories_by_query(user_id, older_than=older_than)
 
     def _format_store_response(self, result: Dict) -> Panel:
         """Format store memory response."""
         memory_id = result.get("working_memory_id", "unknown")
         content = ["✅ Memory stored successfully:", f"🔑 Memory ID: {memory_id}"]
+        if "memory_ids" in result:
+            content.append(f"🧠 Extracted memory IDs: {', '.join(result['memory_ids']) or 'none'}")
         return Panel("\n".join(content), title="[bold green]Memory Stored", border_style="green")
 
     def _format_get_response(self, message: Dict) -> Panel:
@@ -423,3 +931,12 @@ class OpenSearchMemoryToolProvider:
         """Format delete session response."""
         content = ["✅ Session deleted successfully:", f"🔑 Session ID: {session_id}"]
         return Panel("\n".join(content), title="[bold green]Session Deleted", border_style="green")
+
+    def _format_bulk_delete_response(self, result: Dict) -> Panel:
+        """Format bulk delete memories response."""
+        deleted = (result or {}).get("deleted", 0)
+        content = ["✅ Memories deleted successfully:", f"🗑️ Deleted: {deleted}"]
+        return Panel("\n".join(content), title="[bold green]Memories Deleted", border_style="green")
+
+
+OpenSearchMemoryToolProvider._tool_names = _discover_tool_names(OpenSearchMemoryToolProvider)
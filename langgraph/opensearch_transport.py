@@ -0,0 +1,636 @@
+import contextvars
+import functools
+import json
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterator, Optional, Any
+from urllib.parse import urlparse
+
+import requests
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of sending a request while the circuit breaker is open."""
+
+
+class DeadlineExceeded(requests.exceptions.Timeout):
+    """Raised when the deadline of the current turn passed before a request could be sent."""
+
+
+# Absolute time.monotonic() by which the current turn must finish, if any
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("opensearch_deadline", default=None)
+
+
+@contextmanager
+def deadline(seconds: float) -> Iterator[float]:
+    """Bound every memory request made in this context, including nested calls, to finish within seconds.
+
+    Nested deadlines can only shorten the enclosing one. Read timeouts are capped at
+    the time left and retries stop once it is used up.
+    """
+    expires_at = time.monotonic() + seconds
+    current = _deadline.get()
+    if current is not None:
+        expires_at = min(expires_at, current)
+    token = _deadline.set(expires_at)
+    try:
+        yield expires_at
+    finally:
+        _deadline.reset(token)
+
+
+def time_remaining() -> Optional[float]:
+    """Seconds left before the current deadline, or None without one."""
+    expires_at = _deadline.get()
+    return None if expires_at is None else expires_at - time.monotonic()
+
+
+class Instrumentation:
+    """Hooks around network calls and encode/decode stages; this base class does nothing.
+
+    span() yields its attributes dict, so the instrumented code can add attributes
+    only known at the end of the stage, such as the response size.
+    """
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Dict[str, Any]]:
+        yield attributes
+
+    def count(self, name: str, amount: int = 1, **attributes: Any) -> None:
+        """Record a counted event without duration, such as a retry or a cache lookup."""
+
+
+class OpenTelemetryInstrumentation(Instrumentation):
+    """Records a span and a duration histogram per stage, plus a payload size histogram.
+
+    Requires the opentelemetry-api package; providers default to the globally
+    configured ones. Histograms are tagged with the low cardinality attributes
+    only (operation, container, endpoint, method, status).
+    """
+
+    METRIC_ATTRIBUTES = ("operation", "container", "endpoint", "method", "status", "error")
+
+    def __init__(self, tracer_provider: Any = None, meter_provider: Any = None):
+        try:
+            from opentelemetry import metrics, trace
+        except ImportError:
+            raise ImportError("OpenTelemetryInstrumentation requires the opentelemetry-api package")
+        self._trace = trace
+        self.tracer = trace.get_tracer("opensearch_agentic_memory", tracer_provider=tracer_provider)
+        meter = metrics.get_meter("opensearch_agentic_memory", meter_provider=meter_provider)
+        self.duration = meter.create_histogram("opensearch.memory.duration", unit="s",
+                                               description="Duration of memory operations and stages")
+        self.payload_size = meter.create_histogram("opensearch.memory.payload_size", unit="By",
+                                                   description="Request, response and encoded payload sizes")
+        self.events = meter.create_counter("opensearch.memory.events",
+                                           description="Retries, cache lookups and other counted events")
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Dict[str, Any]]:
+        start = time.perf_counter()
+        with self.tracer.start_as_current_span(name) as span:
+            try:
+                yield attributes
+            except Exception as e:
+                attributes["error"] = type(e).__name__
+                span.record_exception(e)
+                span.set_status(self._trace.Status(self._trace.StatusCode.ERROR))
+                raise
+            finally:
+                attributes = {key: value for key, value in attributes.items() if value is not None}
+                span.set_attributes(attributes)
+                tags = {key: attributes[key] for key in self.METRIC_ATTRIBUTES if key in attributes}
+                tags["stage"] = name
+                self.duration.record(time.perf_counter() - start, tags)
+                for key in ("payload_size", "request_size", "response_size"):
+                    if key in attributes:
+                        self.payload_size.record(attributes[key], {**tags, "kind": key})
+
+    def count(self, name: str, amount: int = 1, **attributes: Any) -> None:
+        self.events.add(amount, {**{key: value for key, value in attributes.items() if value is not None},
+                                 "event": name})
+
+
+class MetricsRegistry:
+    """Thread-safe counters, gauges and histograms rendered in the Prometheus text format.
+
+    Metrics are declared once with describe() and then updated by labels, e.g.
+    registry.inc("requests_total", method="GET", endpoint="/memories/working/_search").
+    """
+
+    DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self._types: Dict[str, tuple[str, str]] = {}
+        self._values: Dict[str, Dict[tuple, Any]] = {}
+        self._lock = threading.Lock()
+
+    def describe(self, name: str, kind: str, help_text: str) -> None:
+        if kind not in ("counter", "gauge", "histogram"):
+            raise ValueError(f"Unknown metric type '{kind}'")
+        with self._lock:
+            self._types.setdefault(name, (kind, help_text))
+            self._values.setdefault(name, {})
+
+    def inc(self, name: str, amount: float = 1, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            values = self._values[name]
+            values[key] = values.get(key, 0) + amount
+
+    def set(self, name: str, value: float, **labels: Any) -> None:
+        with self._lock:
+            self._values[name][self._key(labels)] = value
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            histogram = self._values[name].get(key)
+            if histogram is None:
+                histogram = self._values[name][key] = {"buckets": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    histogram["buckets"][i] += 1
+            histogram["sum"] += value
+            histogram["count"] += 1
+
+    def get(self, name: str, **labels: Any) -> Any:
+        """Current value of one labelled series; histograms return their count."""
+        with self._lock:
+            value = self._values.get(name, {}).get(self._key(labels))
+        return value["count"] if isinstance(value, dict) else value
+
+    def render(self) -> str:
+        lines = []
+        with self._lock:
+            for name, (kind, help_text) in self._types.items():
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                for key, value in sorted(self._values[name].items()):
+                    if kind != "histogram":
+                        lines.append(f"{name}{self._labels(key)} {value}")
+                        continue
+                    for bound, bucket in zip(self.buckets, value["buckets"]):
+                        lines.append(f"{name}_bucket{self._labels(key + (('le', repr(bound)),))} {bucket}")
+                    lines.append(f"{name}_bucket{self._labels(key + (('le', '+Inf'),))} {value['count']}")
+                    lines.append(f"{name}_sum{self._labels(key)} {value['sum']}")
+                    lines.append(f"{name}_count{self._labels(key)} {value['count']}")
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port: int = 9464, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+        """Expose render() at http://host:port/metrics from a daemon thread; call shutdown() on the result to stop."""
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if urlparse(self.path).path not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                data = registry.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args) -> None:
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+    @staticmethod
+    def _key(labels: Dict[str, Any]) -> tuple:
+        return tuple(sorted((key, str(value)) for key, value in labels.items() if value is not None))
+
+    @staticmethod
+    def _labels(key: tuple) -> str:
+        if not key:
+            return ""
+        escaped = (value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in key)
+        return "{" + ",".join(f'{label}="{value}"' for (label, _), value in zip(key, escaped)) + "}"
+
+
+class PrometheusInstrumentation(Instrumentation):
+    """Request-level metrics per endpoint template, kept in a MetricsRegistry.
+
+    Counts requests by status, bytes sent and received, retries and cache lookups
+    (with a running hit ratio), and records latency histograms for HTTP requests
+    and for client operations. Endpoints are templated, e.g.
+    "/memories/working/_search", so label cardinality stays bounded.
+
+        metrics = PrometheusInstrumentation()
+        set_instrumentation(metrics)
+        metrics.registry.serve(9464)
+    """
+
+    def __init__(self, registry: Optional[MetricsRegistry] = None, prefix: str = "opensearch_memory"):
+        self.registry = registry or MetricsRegistry()
+        self.prefix = prefix
+        for name, kind, help_text in (
+            ("requests_total", "counter", "HTTP requests by method, endpoint and status"),
+            ("request_duration_seconds", "histogram", "HTTP request latency by method and endpoint"),
+            ("request_bytes_total", "counter", "Request body bytes sent by method and endpoint"),
+            ("response_bytes_total", "counter", "Response body bytes received by method and endpoint"),
+            ("retries_total", "counter", "Requests retried after a transient failure"),
+            ("short_circuited_total", "counter", "Requests rejected locally while the circuit breaker is open"),
+            ("cache_lookups_total", "counter", "Client-side cache lookups by cache, endpoint saved and result"),
+            ("cache_hit_ratio", "gauge", "Share of cache lookups served without a request"),
+            ("operation_duration_seconds", "histogram", "Client operation and encode/decode stage latency"),
+            ("events_total", "counter", "Other counted events"),
+        ):
+            self.registry.describe(f"{prefix}_{name}", kind, help_text)
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Dict[str, Any]]:
+        start = time.perf_counter()
+        try:
+            yield attributes
+        except Exception as e:
+            attributes["error"] = type(e).__name__
+            raise
+        finally:
+            duration = time.perf_counter() - start
+            if name == "opensearch.request":
+                labels = {"method": attributes.get("method"), "endpoint": attributes.get("endpoint")}
+                self.registry.inc(f"{self.prefix}_requests_total",
+                                  status=attributes.get("status") or attributes.get("error"), **labels)
+                self.registry.observe(f"{self.prefix}_request_duration_seconds", duration, **labels)
+                self.registry.inc(f"{self.prefix}_request_bytes_total", attributes.get("request_size") or 0, **labels)
+                self.registry.inc(f"{self.prefix}_response_bytes_total", attributes.get("response_size") or 0,
+                                  **labels)
+            else:
+                self.registry.observe(f"{self.prefix}_operation_duration_seconds", duration, operation=name)
+
+    def count(self, name: str, amount: int = 1, **attributes: Any) -> None:
+        if name == "opensearch.retry":
+            self.registry.inc(f"{self.prefix}_retries_total", amount, **attributes)
+        elif name == "opensearch.short_circuited":
+            self.registry.inc(f"{self.prefix}_short_circuited_total", amount, **attributes)
+        elif name == "cache.lookup":
+            lookups = f"{self.prefix}_cache_lookups_total"
+            labels = {key: value for key, value in attributes.items() if key != "result"}
+            self.registry.inc(lookups, amount, **attributes)
+            hits = self.registry.get(lookups, **labels, result="hit") or 0
+            misses = self.registry.get(lookups, **labels, result="miss") or 0
+            self.registry.set(f"{self.prefix}_cache_hit_ratio", hits / (hits + misses), **labels)
+        else:
+            self.registry.inc(f"{self.prefix}_events_total", amount, event=name, **attributes)
+
+
+_instrumentation: Instrumentation = Instrumentation()
+
+
+def set_instrumentation(instrumentation: Optional[Instrumentation]) -> None:
+    """Install the instrumentation used by every memory client and checkpoint saver in this process."""
+    global _instrumentation
+    _instrumentation = instrumentation or Instrumentation()
+
+
+def get_instrumentation() -> Instrumentation:
+    return _instrumentation
+
+
+def instrument(name: str, **attributes: Any):
+    """Open a span with the installed instrumentation, e.g. `with instrument("checkpoint.decode") as span:`."""
+    return _instrumentation.span(name, **attributes)
+
+
+def count(name: str, amount: int = 1, **attributes: Any) -> None:
+    """Record a counted event with the installed instrumentation, e.g. `count("cache.lookup", result="hit")`."""
+    _instrumentation.count(name, amount, **attributes)
+
+
+def traced(name: str) -> Callable:
+    """Method decorator running the call inside instrument(name), tagged with the instance's container."""
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            with instrument(name, operation=name, container=getattr(self, "memory_container_id", None)):
+                return func(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+_CONTAINER_IN_PATH = re.compile(r"/memory_containers/([^/?]+)")
+_ENDPOINT_WORDS = {"memory_containers", "memories", "sessions", "working", "long-term", "history", "models",
+                   "pipeline"}
+
+
+def endpoint_template(url: str) -> str:
+    """Path of a request URL with ids replaced, e.g. "/memories/working/{id}".
+
+    Working, long-term, session and history paths drop their container prefix,
+    since the container is reported separately.
+    """
+    path = re.sub(r"^/_plugins/_ml", "", urlparse(url).path.rstrip("/"))
+    segments = [segment if segment.startswith("_") or segment in _ENDPOINT_WORDS else "{id}"
+                for segment in path.split("/")[1:]]
+    template = "/" + "/".join(segments)
+    return re.sub(r"^/memory_containers/\{id\}(?=/memories)", "", template)
+
+
+class Timeouts:
+    """Connect and read timeouts in seconds per class of operation.
+
+    search covers GETs and _search requests, write covers adding and updating
+    memories, admin covers container and model management, which can take much
+    longer (model registration, index creation).
+    """
+
+    ADMIN_PATHS = ("/memory_containers/_create", "/_plugins/_ml/models", "/_search/pipeline")
+
+    def __init__(self, connect: float = 3.05, search: float = 10.0, write: float = 10.0, admin: float = 60.0):
+        self.connect = connect
+        self.search = search
+        self.write = write
+        self.admin = admin
+
+    def operation(self, method: str, url: str) -> str:
+        path = url.split("?", 1)[0]
+        if path.rstrip("/").endswith("/_predict"):
+            # Query embedding sits on the search hot path
+            return "search"
+        if any(admin_path in path for admin_path in self.ADMIN_PATHS):
+            return "admin"
+        if method.upper() in ("GET", "HEAD") or path.rstrip("/").endswith("/_search"):
+            return "search"
+        return "write"
+
+    def for_request(self, method: str, url: str) -> tuple[float, float]:
+        return self.connect, getattr(self, self.operation(method, url))
+
+
+DEFAULT_TIMEOUTS = Timeouts()
+
+
+class RetryPolicy:
+    """Bounded retries with full-jitter exponential backoff.
+
+    Idempotent requests (GET, HEAD, PUT, DELETE and searches) are retried on
+    retry_statuses and on any connection error. Other POSTs, such as adding a
+    memory, are only retried when OpenSearch rejected them outright (429) or the
+    connection could not be established, so a write is never applied twice.
+    """
+
+    IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS", "PUT", "DELETE")
+
+    def __init__(self, max_attempts: int = 4, backoff_base: float = 0.2, backoff_max: float = 10.0,
+                 retry_statuses: tuple[int, ...] = (429, 502, 503, 504)):
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retry_statuses = retry_statuses
+
+    def is_idempotent(self, method: str, url: str) -> bool:
+        path = url.split("?", 1)[0].rstrip("/")
+        return method.upper() in self.IDEMPOTENT_METHODS or path.endswith("/_search")
+
+    def should_retry(self, method: str, url: str, status: Optional[int] = None,
+                     error: Optional[Exception] = None) -> bool:
+        if self.is_idempotent(method, url):
+            if error is not None:
+                return isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout))
+            return status in self.retry_statuses
+        if error is not None:
+            return isinstance(error, requests.exceptions.ConnectTimeout) or (
+                isinstance(error, requests.exceptions.ConnectionError)
+                and not isinstance(error, requests.exceptions.ReadTimeout)
+            )
+        return status == 429
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Seconds to sleep before retry number attempt (starting at 0)."""
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+        if retry_after is not None:
+            # The server knows best how long it needs, but never wait unbounded
+            delay = max(delay, min(retry_after, self.backoff_max))
+        return delay
+
+
+class CircuitBreaker:
+    """Stops sending requests to a cluster after consecutive failures.
+
+    After failure_threshold consecutive failures the circuit opens and requests fail
+    fast with CircuitOpenError. Once reset_timeout has passed a single probe request
+    is let through (half-open); its success closes the circuit, its failure opens it
+    again for another reset_timeout.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._probing = False
+            if self.state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def release(self) -> None:
+        """Give back a half-open probe slot taken by allow() without recording an outcome."""
+        with self._lock:
+            self._probing = False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._probing = False
+
+    def record_failure(self) -> bool:
+        """Count a failure, returning True if it opened the circuit."""
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                opened = self.state != self.OPEN
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+                self._probing = False
+                return opened
+            return False
+
+
+class TransportMetrics:
+    """Counters of requests, retries and failures seen by a ResilientSession."""
+
+    def __init__(self):
+        self.requests = 0
+        self.retries = 0
+        self.failures = 0
+        self.short_circuited = 0
+        self.circuit_opened = 0
+        self.deadline_exceeded = 0
+        self.statuses: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def incr(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + amount)
+
+    def record_status(self, status: int) -> None:
+        with self._lock:
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "retries": self.retries,
+                "failures": self.failures,
+                "short_circuited": self.short_circuited,
+                "circuit_opened": self.circuit_opened,
+                "deadline_exceeded": self.deadline_exceeded,
+                "statuses": dict(self.statuses),
+            }
+
+
+def _retry_after(response: requests.Response) -> Optional[float]:
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class ResilientSession(requests.Session):
+    """requests.Session that retries transient failures behind a circuit breaker.
+
+    Responses with a non-retryable status are returned as usual, so callers keep
+    using raise_for_status(). When retries are exhausted the last response (or
+    connection error) is surfaced the same way, and counted as one failure by the
+    circuit breaker however many attempts it took.
+    """
+
+    def __init__(self, retry: Optional[RetryPolicy] = None, breaker: Optional[CircuitBreaker] = None,
+                 metrics: Optional[TransportMetrics] = None, timeouts: Optional[Timeouts] = None):
+        super().__init__()
+        self.retry = retry or RetryPolicy()
+        self.breaker = breaker or CircuitBreaker()
+        self.metrics = metrics or TransportMetrics()
+        self.timeouts = timeouts or Timeouts()
+
+    def request(self, method: str, url: str, *args, **kwargs) -> requests.Response:
+        # An explicit timeout argument wins over the per-operation defaults
+        connect_timeout, read_timeout = self._split_timeout(kwargs.pop("timeout", None), method, url)
+        # Serialize the JSON body once, so retries resend it and its size can be reported
+        body = kwargs.get("data")
+        if kwargs.get("json") is not None:
+            body = json.dumps(kwargs.pop("json"), allow_nan=False).encode("utf-8")
+            kwargs["data"] = body
+            kwargs["headers"] = {"Content-Type": "application/json", **(kwargs.get("headers") or {})}
+        if not isinstance(body, bytes):
+            body = None
+        endpoint = endpoint_template(url)
+        attempt = 0
+        while True:
+            # Checked before allow(), which may hand this request the single half-open probe
+            remaining = time_remaining()
+            if remaining is not None and remaining <= 0:
+                if attempt:
+                    self._record_failure()
+                self.metrics.incr("deadline_exceeded")
+                raise DeadlineExceeded(f"Deadline exceeded before {method} {url}")
+
+            # The breaker admits a request once, so retries keep its half-open probe slot;
+            # they only stop early if other requests opened the circuit meanwhile
+            if not (self.breaker.allow() if attempt == 0 else self.breaker.state != CircuitBreaker.OPEN):
+                self.metrics.incr("short_circuited")
+                count("opensearch.short_circuited", method=method.upper(), endpoint=endpoint)
+                raise CircuitOpenError(f"Circuit open for {method} {url}, not sending request")
+            timeout = (connect_timeout, read_timeout)
+            if remaining is not None:
+                timeout = (min(connect_timeout, remaining), min(read_timeout, remaining))
+
+            self.metrics.incr("requests")
+            try:
+                with instrument("opensearch.request", method=method.upper(),
+                                operation=self.timeouts.operation(method, url),
+                                container=self._container(url), endpoint=endpoint,
+                                request_size=len(body or b""), attempt=attempt) as span:
+                    response = super().request(method, url, *args, timeout=timeout, **kwargs)
+                    span["status"] = response.status_code
+                    span["response_size"] = len(response.content)
+            except requests.exceptions.RequestException as e:
+                response = None
+                # The breaker counts a request once, when its retries are exhausted
+                if attempt + 1 >= self.retry.max_attempts or not self.retry.should_retry(method, url, error=e):
+                    self._record_failure()
+                    raise
+                delay = self.retry.backoff(attempt)
+            except BaseException:
+                # Not a cluster failure, but a probe slot taken by this request must be given back
+                self.breaker.release()
+                raise
+            else:
+                self.metrics.record_status(response.status_code)
+                if response.status_code < 500 and response.status_code != 429:
+                    # 4xx other than 429 is the caller's problem, not the cluster's
+                    self.breaker.record_success()
+                    return response
+                if attempt + 1 >= self.retry.max_attempts or not self.retry.should_retry(
+                        method, url, status=response.status_code):
+                    self._record_failure()
+                    return response
+                delay = self.retry.backoff(attempt, _retry_after(response))
+
+            remaining = time_remaining()
+            if remaining is not None and delay >= remaining:
+                # No time left for another attempt, surface this failure as is
+                self._record_failure()
+                if response is None:
+                    raise DeadlineExceeded(f"Deadline exceeded retrying {method} {url}")
+                return response
+
+            if response is not None:
+                response.close()
+            attempt += 1
+            self.metrics.incr("retries")
+            count("opensearch.retry", method=method.upper(), endpoint=endpoint)
+            time.sleep(delay)
+
+    @staticmethod
+    def _container(url: str) -> Optional[str]:
+        match = _CONTAINER_IN_PATH.search(url)
+        return match.group(1) if match and not match.group(1).startswith("_") else None
+
+    def _split_timeout(self, timeout: Any, method: str, url: str) -> tuple[float, float]:
+        if timeout is None:
+            return self.timeouts.for_request(method, url)
+        if isinstance(timeout, tuple):
+            return timeout
+        return timeout, timeout
+
+    def _record_failure(self) -> None:
+        self.metrics.incr("failures")
+        if self.breaker.record_failure():
+            self.metrics.incr("circuit_opened")
@@ -1,6 +1,686 @@
+import hashlib
+import json
+import logging
 import requests
 import os
-from typing import Dict, Optional, Any
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from typing import Callable, Dict, Optional, Any
+from opensearch_transport import CircuitBreaker, ResilientSession, RetryPolicy, Timeouts, count, traced
+
+logger = logging.getLogger(__name__)
+
+
+# Opt-in, e.g. ~/.cache/opensearch_agentic_memory.json
+DEFAULT_BOOTSTRAP_CACHE = os.getenv("OPENSEARCH_MEMORY_CACHE") or None
+
+
+class BootstrapCache:
+    """JSON file of resolved container and model ids, keyed by cluster URL and container name."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        return self._load().get(key)
+
+    def put(self, key: str, value: Dict[str, Any]) -> None:
+        with self._lock:
+            entries = self._load()
+            entries[key] = value
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            # Write to a temp file first so concurrent readers never see a partial file
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(entries, f, indent=2)
+            os.replace(tmp_path, self.path)
+
+    def evict(self, predicate: Callable[[str, Dict[str, Any]], bool]) -> None:
+        """Drop every entry for which predicate(key, value) is true."""
+        with self._lock:
+            entries = self._load()
+            kept = {key: value for key, value in entries.items() if not predicate(key, value)}
+            if len(kept) == len(entries):
+                return
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(kept, f, indent=2)
+            os.replace(tmp_path, self.path)
+
+    def _load(self) -> Dict[str, Any]:
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+
+class MemoryContainerRegistry:
+    """Process-wide cache of memory container name to id lookups.
+
+    Concurrent lookups of the same container are coalesced into one search, and
+    resolved ids can optionally be persisted to a file shared by later processes.
+    Misses are not cached, so a container created afterwards is still found.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.cache = BootstrapCache(path) if path else None
+        self._ids: Dict[str, str] = {}
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(base_url: str, name: str) -> str:
+        return f"{base_url.rstrip('/')}|{name}"
+
+    def resolve(self, base_url: str, name: str, lookup: Callable[[], Optional[str]]) -> Optional[str]:
+        """Return the container id for name, calling lookup only if no other caller has"""
+        key = self.key(base_url, name)
+        with self._lock:
+            if key not in self._ids:
+                cached = self.cache.get(key) if self.cache else None
+                if cached and cached.get("memory_container_id"):
+                    self._ids[key] = cached["memory_container_id"]
+            if key in self._ids:
+                count("cache.lookup", cache="container_registry", endpoint="/memory_containers/_search", result="hit")
+                return self._ids[key]
+            count("cache.lookup", cache="container_registry", endpoint="/memory_containers/_search", result="miss")
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[key] = future
+
+        if not owner:
+            return future.result()
+        try:
+            container_id = lookup()
+            if container_id:
+                self.register(base_url, name, container_id)
+            future.set_result(container_id)
+            return container_id
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def register(self, base_url: str, name: str, container_id: str) -> None:
+        key = self.key(base_url, name)
+        with self._lock:
+            self._ids[key] = container_id
+        if self.cache:
+            self.cache.put(key, {**(self.cache.get(key) or {}), "memory_container_id": container_id})
+
+    def forget(self, base_url: str, name: str) -> None:
+        key = self.key(base_url, name)
+        with self._lock:
+            self._ids.pop(key, None)
+        # Otherwise the next resolve() would read the forgotten id back from the file
+        cached = self.cache.get(key) if self.cache else None
+        if cached and "memory_container_id" in cached:
+            self.cache.put(key, {k: v for k, v in cached.items() if k != "memory_container_id"})
+
+
+# Shared by OpenSearchAgenticMemory, OpenSearchSaver and the demo scripts
+container_registry = MemoryContainerRegistry(os.getenv("OPENSEARCH_CONTAINER_REGISTRY"))
+
+# Index holding one lock document per memory container name
+CONTAINER_LOCK_INDEX = os.getenv("OPENSEARCH_MEMORY_LOCK_INDEX", "agentic-memory-container-locks")
+
+
+def get_or_create_memory_container_id(session: requests.Session, base_url: str, name: str,
+                                      find: Callable[[], Optional[str]],
+                                      create: Callable[[], str],
+                                      lock_index: str = CONTAINER_LOCK_INDEX,
+                                      wait_timeout: float = 180.0,
+                                      stale_after: float = 120.0) -> str:
+    """Resolve a container name to exactly one id, creating the container at most once.
+
+    The lock document id is derived from the name and created with op_type=create, so
+    only one of many workers starting together wins the right to create the container.
+    The winner records the container id in the lock document; the others read it with
+    realtime GETs, which unlike searches do not wait for an index refresh. A lock left
+    behind by a worker that died before creating the container is taken over after
+    stale_after seconds, so wait_timeout should exceed it. The winner only records its
+    container if its lock was not taken over meanwhile; otherwise it deletes the
+    container it created and adopts the one recorded by the new lock holder. A lock
+    pointing to a container that has since been deleted is removed and the container
+    created again.
+    """
+    base_url = base_url.rstrip("/")
+    lock_id = hashlib.sha256(name.encode("utf-8")).hexdigest()
+    lock_url = f"{base_url}/{lock_index}/_doc/{lock_id}"
+    owner = uuid.uuid4().hex
+    deadline = time.monotonic() + wait_timeout
+
+    while True:
+        response = session.get(lock_url)
+        if response.status_code != 404:
+            response.raise_for_status()
+        lock = response.json() if response.status_code == 200 else None
+        if lock and lock["_source"].get("memory_container_id"):
+            container_id = lock["_source"]["memory_container_id"]
+            container = session.get(f"{base_url}/_plugins/_ml/memory_containers/{container_id}")
+            if container.status_code != 404:
+                container.raise_for_status()
+                return container_id
+            # Only delete the exact lock version we saw, so a fresh lock is never removed
+            session.delete(f"{lock_url}?if_seq_no={lock['_seq_no']}&if_primary_term={lock['_primary_term']}")
+            continue
+
+        container_id = find()
+        if container_id:
+            return container_id
+
+        if lock is None:
+            response = session.put(
+                f"{base_url}/{lock_index}/_create/{lock_id}?refresh=true",
+                json={"name": name, "owner": owner, "acquired_at": int(time.time() * 1000)}
+            )
+            acquired = response.status_code in (200, 201)
+            version = response.json() if acquired else None
+            if response.status_code == 409:
+                # A retried PUT conflicts with the lock document its own first attempt wrote
+                current = session.get(lock_url)
+                acquired = current.status_code == 200 and current.json()["_source"].get("owner") == owner
+                version = current.json() if acquired else None
+            elif not acquired:
+                response.raise_for_status()
+            if acquired:
+                try:
+                    # Another worker may have created the container before the lock was taken
+                    container_id = find()
+                    created = container_id is None
+                    if created:
+                        container_id = create()
+                except Exception:
+                    session.delete(lock_url)
+                    raise
+                # Only record the container while the lock is still ours, not taken over as stale
+                response = session.put(
+                    f"{lock_url}?if_seq_no={version['_seq_no']}&if_primary_term={version['_primary_term']}",
+                    json={
+                        "name": name,
+                        "owner": owner,
+                        "memory_container_id": container_id,
+                        "acquired_at": int(time.time() * 1000)
+                    })
+                if response.status_code != 409:
+                    response.raise_for_status()
+                    return container_id
+                current = session.get(lock_url)
+                if current.status_code == 200 and \
+                        current.json()["_source"].get("memory_container_id") == container_id:
+                    return container_id
+                if created:
+                    session.delete(f"{base_url}/_plugins/_ml/memory_containers/{container_id}")
+                continue
+        elif time.time() * 1000 - lock["_source"].get("acquired_at", 0) > stale_after * 1000:
+            session.delete(f"{lock_url}?if_seq_no={lock['_seq_no']}&if_primary_term={lock['_primary_term']}")
+            continue
+
+        if time.monotonic() > deadline:
+            raise Exception(f"Timed out waiting for memory container '{name}' to be created by another worker")
+        time.sleep(0.5)
+
+
+class IndexProfile:
+    """Shard topology and settings for one memory container index.
+
+    replicas takes precedence over auto_expand_replicas. sort_field enables index
+    sorting, which lets searches sorted on that field terminate early; the field must
+    be mapped by the index (e.g. message_id for working memory of Strands sessions,
+    checkpoint_id for LangGraph checkpoints).
+    """
+
+    def __init__(self, shards: int = 1, replicas: Optional[int] = None,
+                 auto_expand_replicas: Optional[str] = "0-all",
+                 refresh_interval: Optional[str] = None,
+                 sort_field: Optional[str] = None, sort_order: str = "desc",
+                 settings: Optional[Dict[str, Any]] = None):
+        self.shards = shards
+        self.replicas = replicas
+        self.auto_expand_replicas = auto_expand_replicas
+        self.refresh_interval = refresh_interval
+        self.sort_field = sort_field
+        self.sort_order = sort_order
+        self.settings = settings or {}
+
+    def to_settings(self) -> Dict[str, Any]:
+        index = {"number_of_shards": str(self.shards)}
+        if self.replicas is not None:
+            index["number_of_replicas"] = str(self.replicas)
+        elif self.auto_expand_replicas:
+            index["auto_expand_replicas"] = self.auto_expand_replicas
+        if self.refresh_interval:
+            index["refresh_interval"] = self.refresh_interval
+        if self.sort_field:
+            index["sort.field"] = self.sort_field
+            index["sort.order"] = self.sort_order
+        index.update(self.settings)
+        return {"index": index}
+
+
+class ContainerProfile:
+    """Index settings for every index of a memory container.
+
+    The default profile matches the single shard, 0-all replica layout the demos
+    always used. Indexes not given fall back to IndexProfile().
+
+    Documents cannot be routed by session or thread id: the memory container API
+    places them itself and rejects a routing parameter. Session and working memory
+    lookups therefore search every shard, so more shards favour write throughput
+    over lookup latency.
+    """
+
+    def __init__(self, session: Optional[IndexProfile] = None,
+                 working_memory: Optional[IndexProfile] = None,
+                 long_term_memory: Optional[IndexProfile] = None,
+                 long_term_memory_history: Optional[IndexProfile] = None):
+        self.session = session or IndexProfile()
+        self.working_memory = working_memory or IndexProfile()
+        self.long_term_memory = long_term_memory or IndexProfile()
+        self.long_term_memory_history = long_term_memory_history or IndexProfile()
+
+    def index_settings(self, long_term: bool = False) -> Dict[str, Any]:
+        """Return the index_settings block of a memory container configuration."""
+        settings = {
+            "session_index": self.session.to_settings(),
+            "working_memory_index": self.working_memory.to_settings()
+        }
+        if long_term:
+            settings["long_term_memory_index"] = self.long_term_memory.to_settings()
+            settings["long_term_memory_history_index"] = self.long_term_memory_history.to_settings()
+        return settings
+
+    @classmethod
+    def from_name(cls, name: Optional[str] = None) -> "ContainerProfile":
+        """Look up a profile in CONTAINER_PROFILES, by default the one named in OPENSEARCH_MEMORY_PROFILE."""
+        name = name or os.getenv("OPENSEARCH_MEMORY_PROFILE", "default")
+        if name not in CONTAINER_PROFILES:
+            raise ValueError(f"Unknown container profile '{name}', expected one of {sorted(CONTAINER_PROFILES)}")
+        return CONTAINER_PROFILES[name]
+
+
+# Working memory takes most of the writes, history is append-only and rarely searched
+_HIGH_WRITE_INDEXES = {
+    "session": IndexProfile(shards=2, replicas=1),
+    "working_memory": IndexProfile(shards=6, replicas=1, refresh_interval="5s"),
+    "long_term_memory": IndexProfile(shards=3, replicas=1, refresh_interval="5s"),
+    "long_term_memory_history": IndexProfile(shards=2, replicas=1, refresh_interval="30s")
+}
+
+CONTAINER_PROFILES: Dict[str, ContainerProfile] = {
+    "default": ContainerProfile(),
+    "high_write": ContainerProfile(**_HIGH_WRITE_INDEXES),
+    "checkpoints": ContainerProfile(**{
+        **_HIGH_WRITE_INDEXES,
+        "working_memory": IndexProfile(shards=6, replicas=1, refresh_interval="5s", sort_field="checkpoint_id")
+    })
+}
+
+class QueryEmbeddingCache:
+    """LRU cache of query text to embedding vector, optionally persisted to a JSON lines file.
+
+    Entries are keyed by embedding model id and the normalized query text, so
+    "User preferences " and "user preferences" share one embedding.
+    """
+
+    def __init__(self, max_entries: int = 1024, path: Optional[str] = None, normalize: bool = True):
+        self.max_entries = max_entries
+        self.path = path
+        self.normalize = normalize
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, list[float]] = OrderedDict()
+        self._lock = threading.Lock()
+        if path:
+            self._load()
+
+    def key(self, model_id: str, text: str) -> str:
+        if self.normalize:
+            text = re.sub(r"\s+", " ", text).strip().lower()
+            return f"{model_id}|normalized|{text}"
+        return f"{model_id}|raw|{text}"
+
+    def get(self, model_id: str, text: str) -> Optional[list[float]]:
+        key = self.key(model_id, text)
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return vector
+
+    def put(self, model_id: str, text: str, vector: list[float]) -> None:
+        key = self.key(model_id, text)
+        with self._lock:
+            self._set(key, vector)
+            if self.path:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                with open(self.path, "a") as f:
+                    f.write(json.dumps({"key": key, "vector": vector}) + "\n")
+
+    def _set(self, key: str, vector: list[float]) -> None:
+        self._entries[key] = vector
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _load(self) -> None:
+        lines = 0
+        try:
+            with open(self.path) as f:
+                for line in f:
+                    lines += 1
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    self._set(entry["key"], entry["vector"])
+        except OSError:
+            return
+
+        # Compact the append-only file once it holds mostly evicted or duplicate entries
+        if lines > 2 * self.max_entries:
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as f:
+                for key, vector in self._entries.items():
+                    f.write(json.dumps({"key": key, "vector": vector}) + "\n")
+            os.replace(tmp_path, self.path)
+
+
+class LongTermMemoryCache:
+    """Per-user TTL/LRU cache of long-term memory search results.
+
+    A user's entries are invalidated when their long-term memories may change: on
+    add_message(infer=True) and on deletes. Inference runs in the background after
+    add_message returns, so results are also not cached for write_grace seconds
+    after a write for that user.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 30.0, write_grace: float = 30.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.write_grace = write_grace
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._entries: OrderedDict[tuple[str, str], tuple[float, list[Dict[str, Any]]]] = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self._last_write: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def generation(self, user_id: str) -> int:
+        with self._lock:
+            return self._generations.get(user_id, 0)
+
+    def get(self, user_id: str, key: str) -> Optional[list[Dict[str, Any]]]:
+        with self._lock:
+            entry = self._entries.get((user_id, key))
+            if entry is None or entry[0] < time.monotonic():
+                self.misses += 1
+                return None
+            self._entries.move_to_end((user_id, key))
+            self.hits += 1
+            return list(entry[1])
+
+    def put(self, user_id: str, key: str, hits: list[Dict[str, Any]], generation: int) -> None:
+        with self._lock:
+            # Skip results that raced with an invalidation or may miss in-flight inference
+            if self._generations.get(user_id, 0) != generation:
+                return
+            if time.monotonic() - self._last_write.get(user_id, float("-inf")) < self.write_grace:
+                return
+            self._entries[(user_id, key)] = (time.monotonic() + self.ttl, list(hits))
+            self._entries.move_to_end((user_id, key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate_user(self, user_id: str, write: bool = True) -> None:
+        with self._lock:
+            self._invalidate(user_id)
+            if write:
+                self._last_write[user_id] = time.monotonic()
+
+    def invalidate_memories(self, memory_ids: list[str]) -> None:
+        """Invalidate every user whose cached results contain one of the memories"""
+        memory_ids = set(memory_ids)
+        with self._lock:
+            users = {
+                user_id
+                for (user_id, _), (_, hits) in self._entries.items()
+                if any(hit.get("_id") in memory_ids for hit in hits)
+            }
+            for user_id in users:
+                self._invalidate(user_id)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "invalidations": self.invalidations,
+                "entries": len(self._entries),
+            }
+
+    def _invalidate(self, user_id: str) -> None:
+        self._generations[user_id] = self._generations.get(user_id, 0) + 1
+        for key in [key for key in self._entries if key[0] == user_id]:
+            del self._entries[key]
+        self.invalidations += 1
+
+
+def _field_value(source: Dict[str, Any], field: str) -> Any:
+    """Read a dotted field from a document source, ignoring a trailing .keyword subfield."""
+    if field.endswith(".keyword"):
+        field = field[:-len(".keyword")]
+    value: Any = source
+    for part in field.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def matches_query(doc_id: str, source: Dict[str, Any], query: Dict[str, Any]) -> bool:
+    """Evaluate the bool/term/terms subset of the query DSL that RecentWrites overlays need.
+
+    Unsupported clauses never match, so callers fall back to what the index returns.
+    """
+    if not query or "match_all" in query:
+        return True
+    if "bool" in query:
+        clauses = query["bool"]
+        for occur in ("filter", "must"):
+            occurs = clauses.get(occur, [])
+            for clause in occurs if isinstance(occurs, list) else [occurs]:
+                if not matches_query(doc_id, source, clause):
+                    return False
+        must_not = clauses.get("must_not", [])
+        return not any(matches_query(doc_id, source, clause)
+                       for clause in (must_not if isinstance(must_not, list) else [must_not]))
+    if "term" in query:
+        field, expected = next(iter(query["term"].items()))
+        if isinstance(expected, dict):
+            expected = expected.get("value")
+        value = _field_value(source, field)
+        return expected in value if isinstance(value, list) else value == expected
+    if "terms" in query:
+        field, expected = next(iter(query["terms"].items()))
+        value = _field_value(source, field)
+        values = value if isinstance(value, list) else [value]
+        return any(v in expected for v in values)
+    return False
+
+
+def _sort_fields(sort: list[Any]) -> list[tuple[str, str]]:
+    fields = []
+    for spec in sort or []:
+        if isinstance(spec, str):
+            fields.append((spec, "desc" if spec == "_score" else "asc"))
+        else:
+            field, options = next(iter(spec.items()))
+            fields.append((field, options.get("order", "asc") if isinstance(options, dict) else options))
+    return fields
+
+
+def _sort_value(hit: Dict[str, Any], field: str) -> Any:
+    return hit.get("_score") if field == "_score" else _field_value(hit["_source"], field)
+
+
+def sort_hits(hits: list[Dict[str, Any]], sort: list[Any]) -> list[Dict[str, Any]]:
+    """Sort search hits by the fields of a search body's "sort", with missing values last."""
+    for field, order in reversed(_sort_fields(sort)):
+        present = [hit for hit in hits if _sort_value(hit, field) is not None]
+        missing = [hit for hit in hits if _sort_value(hit, field) is None]
+        present.sort(key=lambda hit: _sort_value(hit, field), reverse=order == "desc")
+        hits = present + missing
+    return hits
+
+
+class RecentWrites:
+    """Read-your-writes overlay for working memory searches.
+
+    Documents written by this process are kept per session or thread id and merged
+    into search results until a search returns them, i.e. until the index has been
+    refreshed. This keeps long refresh intervals without stale reads right after a
+    write. Updates of existing documents cannot be confirmed that way and are
+    overlaid until max_age, which should exceed the index refresh interval.
+
+    Every write also expires documents older than max_age and, past max_entries,
+    the oldest ones, so sessions that are never searched again are not kept.
+    """
+
+    def __init__(self, max_age: float = 60.0, max_entries: int = 10000):
+        self.max_age = max_age
+        self.max_entries = max_entries
+        self._pending: Dict[str, Dict[str, tuple[float, bool, Dict[str, Any]]]] = {}
+        # (key, doc_id) of every pending document, oldest write first
+        self._order: OrderedDict[tuple[str, str], float] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def record(self, key: str, doc_id: Optional[str], source: Dict[str, Any], update: bool = False) -> None:
+        doc_id = doc_id or f"local-{time.time_ns()}-{id(source)}"
+        now = time.monotonic()
+        with self._lock:
+            self._pending.setdefault(key, {})[doc_id] = (now, update, source)
+            self._order[(key, doc_id)] = now
+            self._order.move_to_end((key, doc_id))
+            while self._order:
+                (oldest_key, oldest_id), written_at = next(iter(self._order.items()))
+                if now - written_at <= self.max_age and len(self._order) <= self.max_entries:
+                    break
+                self._drop(oldest_key, oldest_id)
+
+    def forget(self, key: str) -> None:
+        with self._lock:
+            for doc_id in list(self._pending.get(key, ())):
+                self._drop(key, doc_id)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._order)
+
+    def overlay(self, key: str, body: Dict[str, Any], hits: list[Dict[str, Any]]) -> list[Dict[str, Any]]:
+        """Merge pending documents matching the search body into its hits."""
+        with self._lock:
+            pending = self._pending.get(key)
+            if not pending:
+                return hits
+            now = time.monotonic()
+            returned = {hit["_id"] for hit in hits}
+            for doc_id, (written_at, update, _) in list(pending.items()):
+                if now - written_at > self.max_age or (doc_id in returned and not update):
+                    self._drop(key, doc_id)
+            pending = self._pending.get(key)
+            if not pending:
+                return hits
+            overlaid = {doc_id: source for doc_id, (_, _, source) in pending.items()
+                        if matches_query(doc_id, source, body.get("query", {}))}
+
+        # Paged results past the first page cannot be merged without the pages before
+        if not overlaid or body.get("from"):
+            return hits
+        merged = [hit for hit in hits if hit["_id"] not in overlaid]
+        merged.extend({"_id": doc_id, "_source": source} for doc_id, source in overlaid.items())
+        return sort_hits(merged, body.get("sort"))[:body.get("size", 10)]
+
+    def _drop(self, key: str, doc_id: str) -> None:
+        self._order.pop((key, doc_id), None)
+        pending = self._pending.get(key)
+        if pending is not None:
+            pending.pop(doc_id, None)
+            if not pending:
+                del self._pending[key]
+
+
+class InferenceHandle:
+    """Tracks the background long-term memory extraction started by add_message(infer=True).
+
+    The handle completes once the memory history shows an event (add, update or
+    delete of a long-term memory) for the user at or after the time the working
+    memory was written. Inference that extracts nothing never produces an event,
+    so waiting ends with status "timeout" in that case.
+
+    History events do not name the working memory they were extracted from, so
+    tracking is per user and approximate: another write for the same user can
+    complete the handle, and its memories show up in memory_ids.
+    """
+
+    PENDING = "pending"
+    COMPLETED = "completed"
+    TIMEOUT = "timeout"
+
+    def __init__(self, memory: "OpenSearchAgenticMemory", working_memory_id: str, user_id: str):
+        self.memory = memory
+        self.working_memory_id = working_memory_id
+        self.user_id = user_id
+        self.status = self.PENDING
+        # Server-side created_time of the working memory, resolved on the first poll
+        self.submitted_at: Optional[Any] = None
+        self.local_submitted_at = int(time.time() * 1000)
+        self.events: list[Dict[str, Any]] = []
+
+    @property
+    def done(self) -> bool:
+        return self.status != self.PENDING
+
+    @property
+    def memory_ids(self) -> list[str]:
+        """Long-term memories of the user added or updated since the working memory was written.
+
+        This includes memories extracted from the user's other writes over the same
+        period. Extraction may merge or skip messages, so the ids need not line up
+        one to one with the messages that were written.
+        """
+        return [
+            event["memory_id"] for event in self.events
+            if event.get("action") in ("ADD", "UPDATE") and event.get("memory_id")
+        ]
+
+    def poll(self) -> bool:
+        self.memory.poll_inference([self])
+        return self.done
+
+    def wait(self, timeout: float = 30.0) -> "InferenceHandle":
+        self.memory.wait_for_inference([self], timeout=timeout)
+        return self
+
+    def __repr__(self) -> str:
+        return f"InferenceHandle(working_memory_id={self.working_memory_id!r}, user_id={self.user_id!r}, status={self.status!r})"
 
 
 class OpenSearchAgenticMemory:
@@ -11,23 +691,128 @@ class OpenSearchAgenticMemory:
                  embedding_model_id: Optional[str] = None,
                  llm_id: Optional[str] = None,
                  infer: bool = False,
-                 long_term: bool = False):
+                 long_term: bool = False,
+                 lazy: bool = False,
+                 cache_path: Optional[str] = DEFAULT_BOOTSTRAP_CACHE,
+                 pool_size: int = 10,
+                 embedding_cache: Optional[QueryEmbeddingCache] = None,
+                 result_cache: Optional[LongTermMemoryCache] = None,
+                 profile: Optional[ContainerProfile] = None,
+                 recent_writes: Optional[RecentWrites] = None,
+                 retry: Optional[RetryPolicy] = None,
+                 breaker: Optional[CircuitBreaker] = None,
+                 timeouts: Optional[Timeouts] = None):
         self.memory_container_id = memory_container_id
         self.memory_container_name = memory_container_name
+        self.memory_container_description = memory_container_description
+        # Ids not passed in are resolved by name and may be resolved again if they go missing
+        self._resolved_by_name = memory_container_id is None
+        self._explicit_model_ids = {name for name, value in (("embedding_model_id", embedding_model_id),
+                                                             ("llm_id", llm_id)) if value}
+        self._recovery_lock = threading.Lock()
         self.base_url = cluster_url
         self.auth = (username, password)
         self.headers = {"Content-Type": "application/json"}
         self.embedding_model_id = embedding_model_id
         self.llm_id = llm_id
         self.long_term = long_term
+        self.pool_size = pool_size
+        self.bootstrap_cache = BootstrapCache(cache_path) if cache_path else None
+        self._search_pipelines: set[str] = set()
+        self.embedding_cache = embedding_cache
+        self.result_cache = result_cache
+        self.profile = profile or ContainerProfile.from_name()
+        self.recent_writes = recent_writes
 
-        if memory_container_id is None:
-            default_container_id = self.get_memory_container(memory_container_name)
-            if default_container_id is None:                
-                self.create_memory_container(memory_container_name, memory_container_description, memory_container_name, embedding_model_id, llm_id, long_term)
-            else:
-                print("Find memory container with id '{}' by name '{}'".format(default_container_id, memory_container_name))
-                self.memory_container_id = default_container_id
+        # Create a session for reusing connections across requests and threads,
+        # retrying 429/5xx rejections and failing fast while the cluster is down
+        self.session = ResilientSession(retry=retry, breaker=breaker, timeouts=timeouts)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.auth = self.auth
+        self.session.headers.update(self.headers)
+        self.session.verify = False
+
+        # With lazy=True the caller is expected to call bootstrap() explicitly
+        if not lazy:
+            self.bootstrap()
+
+    def bootstrap(self, refresh: bool = False, warm_connections: int = 0) -> str:
+        """Resolve the memory container and optionally pre-warm the connection pool.
+
+        With cache_path set (or OPENSEARCH_MEMORY_CACHE), resolved container and model ids
+        are cached on disk keyed by cluster URL and container name, so later processes skip
+        the container search and model registration. Pass refresh=True to ignore the cached
+        ids; a container that has since been deleted is resolved again on its first 404.
+        """
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            warm_future = executor.submit(self.warm_up, warm_connections) if warm_connections else None
+            if self.memory_container_id is None:
+                self._resolve_memory_container(refresh)
+            if warm_future is not None:
+                warm_future.result()
+        return self.memory_container_id
+
+    def warm_up(self, connections: int = 4) -> None:
+        """Open pooled connections to the cluster ahead of the first real request"""
+        connections = min(connections, self.pool_size)
+        if connections <= 0:
+            return
+
+        def ping(_):
+            try:
+                self._make_request("GET", f"{self.base_url}/")
+            except Exception as e:
+                # Warm-up is best effort, the real request will surface any error
+                logger.warning(f"Connection warm-up failed: {str(e)}")
+
+        with ThreadPoolExecutor(max_workers=connections) as executor:
+            list(executor.map(ping, range(connections)))
+
+    def _resolve_memory_container(self, refresh: bool = False) -> None:
+        cache_key = f"{self.base_url}|{self.memory_container_name}"
+        cached = None
+        if self.bootstrap_cache and not refresh:
+            cached = self.bootstrap_cache.get(cache_key)
+            count("cache.lookup", cache="bootstrap", endpoint="/memory_containers/_search",
+                  result="hit" if cached else "miss")
+
+        if cached:
+            self.memory_container_id = cached["memory_container_id"]
+            self.embedding_model_id = self.embedding_model_id or cached.get("embedding_model_id")
+            self.llm_id = self.llm_id or cached.get("llm_id")
+            print("Use cached memory container id '{}' for name '{}'".format(self.memory_container_id, self.memory_container_name))
+            return
+
+        if refresh:
+            container_registry.forget(self.base_url, self.memory_container_name)
+
+        def create() -> str:
+            response = self.create_memory_container(self.memory_container_name, self.memory_container_description,
+                                                    self.memory_container_name, self.embedding_model_id, self.llm_id,
+                                                    self.long_term)
+            return response['memory_container_id']
+
+        default_container_id = container_registry.resolve(
+            self.base_url, self.memory_container_name,
+            lambda: get_or_create_memory_container_id(
+                self.session, self.base_url, self.memory_container_name,
+                find=lambda: self.get_memory_container(self.memory_container_name),
+                create=create
+            )
+        )
+        # create() already set memory_container_id when this process created the container
+        if self.memory_container_id != default_container_id:
+            print("Find memory container with id '{}' by name '{}'".format(default_container_id, self.memory_container_name))
+            self.memory_container_id = default_container_id
+
+        if self.bootstrap_cache:
+            self.bootstrap_cache.put(cache_key, {
+                "memory_container_id": self.memory_container_id,
+                "embedding_model_id": self.embedding_model_id,
+                "llm_id": self.llm_id,
+            })
 
 
     def get_memory_container(self, name: str) -> Dict:
@@ -68,11 +853,16 @@ class OpenSearchAgenticMemory:
 
         # Long-term memory
         if long_term:
-            # Auto-create models if not provided
-            if not embedding_model_id:
-                embedding_model_id = self._create_embedding_model()
-            if not llm_id:
-                llm_id = self._create_llm_model()
+            # Auto-create models if not provided, registering both concurrently
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                embedding_future = None if embedding_model_id else executor.submit(self._create_embedding_model)
+                llm_future = None if llm_id else executor.submit(self._create_llm_model)
+                if embedding_future is not None:
+                    embedding_model_id = embedding_future.result()
+                if llm_future is not None:
+                    llm_id = llm_future.result()
+            self.embedding_model_id = embedding_model_id
+            self.llm_id = llm_id
             body = {
                 "name": name,
                 "description": description,
@@ -91,32 +881,7 @@ class OpenSearchAgenticMemory:
                             "namespace": ["user_id"]
                         }
                     ],
-                    "index_settings": {
-                        "session_index": {
-                            "index": {
-                            "number_of_shards": "1",
-                            "auto_expand_replicas": "0-all"
-                            }
-                        },
-                        "working_memory_index": {
-                            "index": {
-                            "number_of_shards": "1",
-                            "auto_expand_replicas": "0-all"
-                            }
-                        },
-                        "long_term_memory_index": {
-                            "index": {
-                            "number_of_shards": "1",
-                            "auto_expand_replicas": "0-all"
-                            }
-                        },
-                        "long_term_memory_history_index": {
-                            "index": {
-                            "number_of_shards": "1",
-                            "auto_expand_replicas": "0-all"
-                            }
-                        }
-                    }
+                    "index_settings": self.profile.index_settings(long_term=True)
                 }
             }
         else:
@@ -128,25 +893,13 @@ class OpenSearchAgenticMemory:
                     "index_prefix": index_prefix,
                     "use_system_index": False,
                     "disable_session": False,
-                    "index_settings": {
-                        "session_index": {
-                            "index": {
-                            "number_of_shards": "1",
-                            "auto_expand_replicas": "0-all"
-                            }
-                        },
-                        "working_memory_index": {
-                            "index": {
-                            "number_of_shards": "1",
-                            "auto_expand_replicas": "0-all"
-                            }
-                        }
-                    }
+                    "index_settings": self.profile.index_settings()
                 }
             }
 
         response = self._make_request("POST", url, json=body)
         self.memory_container_id = response['memory_container_id']
+        container_registry.register(self.base_url, name, self.memory_container_id)
         print("Created memory container with id '{}'".format(self.memory_container_id))
         return response
 
@@ -181,8 +934,11 @@ class OpenSearchAgenticMemory:
     def delete_session(self, session_id: str) -> Dict:
         url = f"{self.base_url}/_plugins/_ml/memory_containers/{self.memory_container_id}/memories/sessions/{session_id}"
 
+        if self.recent_writes is not None:
+            self.recent_writes.forget(session_id)
         return self._make_request("DELETE", url)
 
+    @traced("memory.add_message")
     def add_message(self, session_id: str, agent_id: str, message: Dict[str, Any], infer: bool = False, user_id: str = None) -> Dict:
         url = f"{self.base_url}/_plugins/_ml/memory_containers/{self.memory_container_id}/memories"
         namespace = {
@@ -209,7 +965,145 @@ class OpenSearchAgenticMemory:
         if message:
             body['metadata'] = message
 
-        return self._make_request("POST", url, json=body)
+        response = self._make_request("POST", url, json=body)
+        self._record_write(session_id, response, body)
+        if infer and user_id and self.result_cache is not None:
+            self.result_cache.invalidate_user(user_id)
+        return response
+
+    @traced("memory.add_messages")
+    def add_messages(self, session_id: str, agent_id: str, messages: list[Dict[str, Any]], infer: bool = False,
+                     user_id: str = None, metadata: Optional[Dict[str, Any]] = None) -> Dict:
+        """Add several messages in one request, so inference runs once over the whole batch"""
+        url = f"{self.base_url}/_plugins/_ml/memory_containers/{self.memory_container_id}/memories"
+        namespace = {
+            "session_id": session_id,
+            "agent_id": agent_id,
+        }
+        if user_id:
+            namespace["user_id"] = user_id
+
+        body = {
+            "namespace": namespace,
+            "infer": infer,
+            "memory_type": "conversational",
+            "messages": messages,
+        }
+        metadata = {k: v for k, v in (metadata or {}).items() if v is not None}
+        if metadata:
+            body['metadata'] = metadata
+
+        response = self._make_request("POST", url, json=body)
+        self._record_write(session_id, response, body)
+        if infer and user_id and self.result_cache is not None:
+            self.result_cache.invalidate_user(user_id)
+        return response
+
+    def _record_write(self, session_id: str, response: Optional[Dict[str, Any]], body: Dict[str, Any]) -> None:
+        """Remember a new working memory so searches see it before the next index refresh"""
+        if self.recent_writes is None:
+            return
+        source = {
+            **body,
+            "memory_container_id": self.memory_container_id,
+            "namespace_size": len(body["namespace"]),
+            "created_time": int(time.time() * 1000)
+        }
+        self.recent_writes.record(session_id, (response or {}).get("working_memory_id"), source)
+
+    def track_inference(self, response: Dict[str, Any], user_id: str) -> InferenceHandle:
+        """Return a handle for the inference started by add_message/add_messages with infer=True"""
+        return InferenceHandle(self, response["working_memory_id"], user_id)
+
+    def poll_inference(self, handles: list[InferenceHandle]) -> list[InferenceHandle]:
+        """Check all pending handles with at most two requests, whatever their number"""
+        pending = [handle for handle in handles if not handle.done]
+        if not pending:
+            return handles
+
+        # Resolve the server-side write time of the working memories in one request
+        unresolved = {handle.working_memory_id: handle for handle in pending if handle.submitted_at is None}
+        if unresolved:
+            url = f"{self.base_url}/_plugins/_ml/memory_containers/{self.memory_container_id}/memories/working/_search"
+            body = {
+                "query": {
+                    "ids": {
+                        "values": list(unresolved)
+                    }
+                },
+                "size": len(unresolved),
+                "_source": ["created_time"]
+            }
+            response = self._make_request("GET", url, json=body)
+            for hit in self._get_hits(response) or []:
+                unresolved[hit["_id"]].submitted_at = hit["_source"].get("created_time")
+            for handle in unresolved.values():
+                if handle.submitted_at is None:
+                    handle.submitted_at = handle.local_submitted_at
+
+        # One history query covers every pending user since the oldest write
+        url = f"{self.base_url}/_plugins/_ml/memory_containers/{self.memory_container_id}/memories/history/_search"
+        body = {
+            "query": {
+                "bool": {
+                    "filter": [
+                        {
+                            "terms": {
+                                "namespace.user_id": sorted({handle.user_id for handle in pending})
+                            }
+                        },
+                        {
+                            "range": {
+                                "created_time": {
+                                    "gte": min(handle.submitted_at for handle in pending)
+                                }
+                            }
+                        }
+                    ]
+                }
+            },
+            "sort": [
+                {
+                    "created_time": {
+                        "order": "asc"
+                    }
+                }
+            ],
+            "size": 1000
+        }
+        response = self._make_request("GET", url, json=body)
+        events = [hit["_source"] for hit in self._get_hits(response) or []]
+        for handle in pending:
+            handle.events = [
+                event for event in events
+                if event.get("namespace", {}).get("user_id") == handle.user_id
+                and event.get("created_time") is not None
+                and event["created_time"] >= handle.submitted_at
+            ]
+            if handle.events:
+                handle.status = InferenceHandle.COMPLETED
+                if self.result_cache is not None:
+                    self.result_cache.invalidate_user(handle.user_id, write=False)
+        return handles
+
+    def wait_for_inference(self, handles: list[InferenceHandle], timeout: float = 30.0,
+                           initial_interval: float = 0.25, max_interval: float = 4.0,
+                           backoff: float = 2.0) -> list[InferenceHandle]:
+        """Poll handles with exponential backoff until all complete or the timeout expires"""
+        deadline = time.monotonic() + timeout
+        interval = initial_interval
+        while True:
+            self.poll_inference(handles)
+            remaining = deadline - time.monotonic()
+            if all(handle.done for handle in handles) or remaining <= 0:
+                break
+            time.sleep(min(interval, remaining))
+            interval = min(interval * backoff, max_interval)
+
+        for handle in handles:
+            if not handle.done:
+                handle.status = InferenceHandle.TIMEOUT
+        return handles
 
     def search_session(self, session_id: str) -> Dict:
         url = f"{self.base_url}/_plugins/_ml/memory_containers/{self.memory_container_id}/memories/sessions/_search"
@@ -244,6 +1138,7 @@ class OpenSearchAgenticMemory:
             return messages
         return None
 
+    @traced("memory.list_message")
     def list_message(self, session_id: str, agent_id: str, limit: Optional[int] = None, offset: int = 0) -> Dict:
         url = f"{self.base_url}/_plugins/_ml/memory_containers/{self.memory_container_id}/memories/working/_search"
         body = {
@@ -285,13 +1180,23 @@ class OpenSearchAgenticMemory:
         response = self._make_request("GET", url, json=body)
         messages: list[Dict[str, Any]] = []
         search_response = self._get_hits(response)
+        if self.recent_writes is not None:
+            search_response = self.recent_writes.overlay(session_id, body, search_response or [])
         if search_response:
             for doc in search_response:
                 messages.append(self._parse_message_from_source(doc['_source']))
             return messages
         return None
 
+    @traced("memory.get_message")
     def get_message(self, session_id: str, agent_id:str, message_id: int) -> Dict:
+        message_doc = self._get_message_doc(session_id, agent_id, message_id)
+        if message_doc is None:
+            return None
+        return self._parse_message_from_source(message_doc['_source'])
+
+    def _get_message_doc(self, session_id: str, agent_id: str, message_id: int) -> Optional[Dict[str, Any]]:
+        """Return the latest working memory hit for a message, with its _id and _source"""
         url = f"{self.base_url}/_plugins/_ml/memory_containers/{self.memory_container_id}/memories/working/_search"
         body = {
             "query": {
@@ -326,15 +1231,26 @@ class OpenSearchAgenticMemory:
                         "order": "desc"
                     }
                 }
-            ]
+            ],
+            "size": 1
         }
 
         response = self._make_request("GET", url, json=body)
-        result = self._parse_message_from_source(response)
-        return result
+        if self.recent_writes is not None:
+            hits = self.recent_writes.overlay(session_id, body, self._get_hits(response) or [])
+            return hits[0] if hits else None
+        return self._get_first_hit(response)
+
+    def update_message(self, session_id: str, agent_id: str, new_message: Dict[str, Any]) -> Dict:
+        """Replace a message of this session and agent, keeping its original created_at.
 
-    def update_message(self, session_id: str, message_id: int, new_message:Dict[str, Any]) -> Dict:
-        message_doc = self.get_message(session_id, message_id)
+        The message to replace is the one with new_message["message_id"], e.g. a
+        SessionMessage.to_dict(); the id is no longer a separate argument.
+        Returns None if no such message exists.
+        """
+        new_message = dict(new_message)
+        message_id = new_message.pop('message_id', None)
+        message_doc = self._get_message_doc(session_id, agent_id, message_id)
 
         if message_doc is None:
             return None
@@ -357,23 +1273,25 @@ class OpenSearchAgenticMemory:
         url = f"{self.base_url}/_plugins/_ml/memory_containers/{self.memory_container_id}/memories/working/{message_doc_id}"
 
         response = self._make_request("PUT", url, json=message_source)
+        if self.recent_writes is not None:
+            self.recent_writes.record(session_id, message_doc_id, message_source, update=True)
         return response
 
-    def _make_request(self, method: str, url: str, **kwargs) -> Dict:
+    def _make_request(self, method: str, url: str, _recovered: bool = False, **kwargs) -> Dict:
         """Make HTTP request with error handling"""
         try:
-            response = requests.request(
+            response = self.session.request(
                 method=method,
                 url=url,
-                auth=self.auth,
-                headers=self.headers,
-                verify=False,
                 **kwargs
             )
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
             if '404' in str(e):
+                recovered_url = None if _recovered else self._recover_missing_container(url)
+                if recovered_url:
+                    return self._make_request(method, recovered_url, _recovered=True, **kwargs)
                 return None
             error_details = ""
             if hasattr(e, 'response') and e.response is not None:
@@ -383,6 +1301,39 @@ class OpenSearchAgenticMemory:
                     pass
             raise Exception(f"API request failed: {str(e)}{error_details}")
 
+    def _recover_missing_container(self, url: str) -> Optional[str]:
+        """After a 404 under the container, resolve it again if the container itself is gone.
+
+        Returns the URL rewritten to the new container, or None if the container still
+        exists (the 404 was about a document) or was passed in explicitly.
+        """
+        match = re.search(r"/memory_containers/([^/?_][^/?]*)", url)
+        if not match or not self._resolved_by_name:
+            return None
+        stale_id = match.group(1)
+        with self._recovery_lock:
+            if self.memory_container_id == stale_id:
+                response = self.session.get(f"{self.base_url}/_plugins/_ml/memory_containers/{stale_id}")
+                if response.status_code != 404:
+                    return None
+                print("Memory container '{}' no longer exists, resolving '{}' again".format(
+                    stale_id, self.memory_container_name))
+                stale_models = set()
+                for name in ("embedding_model_id", "llm_id"):
+                    if name not in self._explicit_model_ids:
+                        stale_models.add(getattr(self, name))
+                        setattr(self, name, None)
+                # Forget this container, and the models it used in case they went with it
+                # (e.g. after a cluster reset); they are looked up by name again
+                if self.bootstrap_cache:
+                    container_key = f"{self.base_url}|{self.memory_container_name}"
+                    model_prefix = f"{self.base_url}|model|"
+                    self.bootstrap_cache.evict(lambda key, value: key == container_key or (
+                        key.startswith(model_prefix) and value.get("model_id") in stale_models - {None}))
+                self.memory_container_id = None
+                self._resolve_memory_container(refresh=True)
+        return url.replace(f"/memory_containers/{stale_id}", f"/memory_containers/{self.memory_container_id}")
+
     def _parse_message_from_source(self, response: Dict[str, Any]) -> Dict[str, Any]:
         result = {
             "message": response['messages'][0],
@@ -488,9 +1439,7 @@ class OpenSearchAgenticMemory:
             }
         }
 
-        response = self._make_request("POST", url, json=body)
-        self.embedding_model_id = response['model_id']
-        print("Created embedding model with id '{}'".format(self.embedding_model_id))
+        self.embedding_model_id = self._get_or_register_model(url, body, "embedding model")
         return self.embedding_model_id
         
     def _create_llm_model(self) -> str:
@@ -533,21 +1482,65 @@ class OpenSearchAgenticMemory:
             }
         }
         
-        model_response = self._make_request("POST", url, json=body)
-        self.llm_id = model_response['model_id']
-        print(f"Created LLM model with id '{self.llm_id}'")
+        self.llm_id = self._get_or_register_model(url, body, "LLM model")
         return self.llm_id
 
-    def search_long_term_memories(self, query: str, user_id: str) -> list[Dict[str, Any]]:
-        """Search long-term memories using semantic search"""
-        url = f"{self.base_url}/_plugins/_ml/memory_containers/{self.memory_container_id}/memories/long-term/_search"
+    def _get_or_register_model(self, url: str, body: Dict[str, Any], label: str) -> str:
+        """Reuse a model registered with the same connector config, registering it only if none exists"""
+        # Fingerprint the model and connector config without the credentials, so rotated
+        # keys update the existing model instead of registering a new one
+        credential = body["connector"].get("credential")
+        connector = {k: v for k, v in body["connector"].items() if k != "credential"}
+        fingerprint_source = json.dumps({**body, "connector": connector}, sort_keys=True)
+        fingerprint = hashlib.sha256(fingerprint_source.encode("utf-8")).hexdigest()[:16]
+        credential_hash = hashlib.sha256(json.dumps(credential, sort_keys=True).encode("utf-8")).hexdigest()
+        body = {**body, "name": f"{body['name']} ({fingerprint})"}
+        cache_key = f"{self.base_url}|model|{fingerprint}"
+
+        if self.bootstrap_cache:
+            cached = self.bootstrap_cache.get(cache_key)
+            count("cache.lookup", cache="bootstrap", endpoint="/models/_search", result="hit" if cached else "miss")
+            if cached and cached.get("credential_hash") == credential_hash:
+                print("Use cached {} with id '{}'".format(label, cached["model_id"]))
+                return cached["model_id"]
+
+        model_id = self._find_model(body["name"])
+        if model_id:
+            print("Find {} with id '{}' by name '{}'".format(label, model_id, body["name"]))
+            # The stored credentials cannot be read back, so refresh them whenever
+            # they are not known to match the current ones
+            self._update_model_credential(model_id, credential)
+        else:
+            response = self._make_request("POST", url, json=body)
+            model_id = response['model_id']
+            print("Created {} with id '{}'".format(label, model_id))
+
+        if self.bootstrap_cache:
+            self.bootstrap_cache.put(cache_key, {"model_id": model_id, "credential_hash": credential_hash})
+        return model_id
+
+    def _update_model_credential(self, model_id: str, credential: Optional[Dict[str, Any]]) -> None:
+        """Replace the credentials of a model's internal connector"""
+        url = f"{self.base_url}/_plugins/_ml/models/{model_id}"
+        self._make_request("PUT", url, json={"connector": {"credential": credential}})
+
+    def _find_model(self, name: str) -> Optional[str]:
+        url = f"{self.base_url}/_plugins/_ml/models/_search"
         body = {
             "query": {
                 "bool": {
                     "filter": [
                         {
                             "term": {
-                                "namespace.user_id": user_id
+                                "name.keyword": name
+                            }
+                        }
+                    ],
+                    # Skip the per-chunk documents of locally hosted models
+                    "must_not": [
+                        {
+                            "exists": {
+                                "field": "chunk_number"
                             }
                         }
                     ]
@@ -556,22 +1549,350 @@ class OpenSearchAgenticMemory:
             "sort": [
                 {
                     "created_time": {
-                        "order": "desc"
+                        "order": "asc"
                     }
                 }
             ],
-            "size": 10
+            "size": 1
         }
-        
+
+        response = self._make_request("POST", url, json=body)
+        first_hit = self._get_first_hit(response)
+        if first_hit is None:
+            return None
+        return first_hit['_id']
+
+    @traced("memory.search_long_term_memories")
+    def search_long_term_memories(self, query: str, user_id: str, k: int = 10,
+                                  filters: Optional[list[Dict[str, Any]]] = None,
+                                  min_score: Optional[float] = None,
+                                  hybrid: bool = False,
+                                  search_pipeline: Optional[str] = None,
+                                  offset: int = 0,
+                                  search_after: Optional[list[Any]] = None,
+                                  source_fields: Optional[list[str]] = None,
+                                  num_candidates: Optional[int] = None) -> list[Dict[str, Any]]:
+        """Search long-term memories using semantic search
+
+        Runs a neural (k-NN) query over the memory embeddings, restricted to the user's
+        namespace plus any extra filter clauses. With hybrid=True the neural query is
+        combined with a BM25 match on the memory text through a normalization search
+        pipeline. Without a query the newest memories are returned.
+
+        When the client has an embedding_cache, the query is embedded client-side
+        (or taken from the cache) and sent as a k-NN vector query instead.
+
+        k is the page size. Pages are selected either with offset or, for deep paging,
+        by passing the "sort" values of the previous page's last hit as search_after.
+        num_candidates is the number of nearest neighbours ranked across all pages and
+        defaults to offset + k (10 * k in search_after mode). source_fields limits the
+        returned _source fields; the embedding vector is never returned.
+
+        When the client has a result_cache, results are served from it until they
+        expire or the user's long-term memories change.
+        """
+        cache_key = None
+        if self.result_cache is not None:
+            cache_key = json.dumps([query, k, filters, min_score, hybrid, search_pipeline, offset,
+                                    search_after, source_fields, num_candidates], sort_keys=True, default=str)
+            cached = self.result_cache.get(user_id, cache_key)
+            count("cache.lookup", cache="long_term_results", endpoint="/memories/long-term/_search",
+                  result="miss" if cached is None else "hit")
+            if cached is not None:
+                return cached
+            generation = self.result_cache.generation(user_id)
+
+        url = f"{self.base_url}/_plugins/_ml/memory_containers/{self.memory_container_id}/memories/long-term/_search"
+        filter_clauses = [
+            {
+                "term": {
+                    "namespace.user_id": user_id
+                }
+            }
+        ] + (filters or [])
+
+        if not query:
+            body = {
+                "query": {
+                    "bool": {
+                        "filter": filter_clauses
+                    }
+                },
+                "sort": [
+                    {
+                        "created_time": {
+                            "order": "desc"
+                        }
+                    }
+                ]
+            }
+        else:
+            if self.embedding_cache is not None:
+                vector_query = {
+                    "vector": self.embed_query(query),
+                }
+                query_type = "knn"
+            else:
+                vector_query = {
+                    "query_text": query,
+                    "model_id": self._get_embedding_model_id(),
+                }
+                query_type = "neural"
+            semantic_query = {
+                query_type: {
+                    "memory_embedding": {
+                        **vector_query,
+                        "k": num_candidates or (10 * k if search_after else offset + k),
+                        "filter": {
+                            "bool": {
+                                "filter": filter_clauses
+                            }
+                        }
+                    }
+                }
+            }
+            if hybrid:
+                lexical_query = {
+                    "bool": {
+                        "must": [
+                            {
+                                "match": {
+                                    "memory": query
+                                }
+                            }
+                        ],
+                        "filter": filter_clauses
+                    }
+                }
+                body = {
+                    "query": {
+                        "hybrid": {
+                            "queries": [semantic_query, lexical_query]
+                        }
+                    }
+                }
+                search_pipeline = search_pipeline or self.ensure_hybrid_search_pipeline()
+                url = f"{url}?search_pipeline={search_pipeline}"
+            else:
+                body = {
+                    "query": semantic_query
+                }
+            # Explicit sort so every hit carries "sort" values usable as a search_after cursor
+            body["sort"] = [
+                {
+                    "_score": {
+                        "order": "desc"
+                    }
+                },
+                {
+                    "created_time": {
+                        "order": "desc"
+                    }
+                }
+            ]
+
+        body["size"] = k
+        if search_after:
+            body["search_after"] = search_after
+        elif offset:
+            body["from"] = offset
+        if source_fields:
+            body["_source"] = {"includes": source_fields, "excludes": ["memory_embedding"]}
+        else:
+            body["_source"] = {"excludes": ["memory_embedding"]}
+        if min_score is not None:
+            body["min_score"] = min_score
+
         response = self._make_request("GET", url, json=body)
-        return self._get_hits(response) or []
+        hits = self._get_hits(response) or []
+        if cache_key is not None:
+            self.result_cache.put(user_id, cache_key, hits, generation)
+        return hits
+
+    def ensure_hybrid_search_pipeline(self, name: Optional[str] = None,
+                                      weights: tuple[float, float] = (0.7, 0.3)) -> str:
+        """Create the score normalization pipeline used by hybrid search, once per client"""
+        name = name or f"{self.memory_container_name}_hybrid_search".replace(" ", "_").lower()
+        if name in self._search_pipelines:
+            return name
+
+        url = f"{self.base_url}/_search/pipeline/{name}"
+        body = {
+            "description": "Min-max normalized hybrid scoring for long-term memory search",
+            "phase_results_processors": [
+                {
+                    "normalization-processor": {
+                        "normalization": {
+                            "technique": "min_max"
+                        },
+                        "combination": {
+                            "technique": "arithmetic_mean",
+                            "parameters": {
+                                "weights": list(weights)
+                            }
+                        }
+                    }
+                }
+            ]
+        }
+        self._make_request("PUT", url, json=body)
+        self._search_pipelines.add(name)
+        return name
+
+    def embed_query(self, text: str) -> list[float]:
+        """Embed query text with the container's embedding model, using the embedding cache if set"""
+        model_id = self._get_embedding_model_id()
+        if self.embedding_cache is not None:
+            vector = self.embedding_cache.get(model_id, text)
+            count("cache.lookup", cache="query_embedding", endpoint="/models/{id}/_predict",
+                  result="miss" if vector is None else "hit")
+            if vector is not None:
+                return vector
+
+        url = f"{self.base_url}/_plugins/_ml/models/{model_id}/_predict"
+        body = {
+            "parameters": {
+                "inputText": text
+            }
+        }
+        response = self._make_request("POST", url, json=body)
+        try:
+            vector = response["inference_results"][0]["output"][0]["data"]
+        except (KeyError, IndexError, TypeError):
+            raise Exception(f"Unexpected embedding response from model '{model_id}': {response}")
+
+        if self.embedding_cache is not None:
+            self.embedding_cache.put(model_id, text, vector)
+        return vector
+
+    def _get_embedding_model_id(self) -> str:
+        """Embedding model of the container, read from its configuration when not known locally"""
+        if not self.embedding_model_id:
+            url = f"{self.base_url}/_plugins/_ml/memory_containers/{self.memory_container_id}"
+            response = self._make_request("GET", url) or {}
+            self.embedding_model_id = response.get("configuration", {}).get("embedding_model_id")
+            if not self.embedding_model_id:
+                raise Exception(f"Memory container '{self.memory_container_id}' has no embedding model configured")
+        return self.embedding_model_id
 
-    def get_long_term_memory(self, memory_id: str) -> Dict[str, Any]:
-        """Get a specific long-term memory by ID"""
+    def get_long_term_memory(self, memory_id: str, user_id: Optional[str] = None) -> Dict[str, Any]:
+        """Get a specific long-term memory by ID, or None if it does not exist or, given user_id, belongs to someone else"""
+        if user_id:
+            hits = self.get_long_term_memories([memory_id], user_id)
+            return hits[0]["_source"] if hits else None
         url = f"{self.base_url}/_plugins/_ml/memory_containers/{self.memory_container_id}/memories/long-term/{memory_id}"
         return self._make_request("GET", url)
 
-    def delete_long_term_memory(self, memory_id: str) -> Dict[str, Any]:
-        """Delete a specific long-term memory by ID"""
-        url = f"{self.base_url}/_plugins/_ml/memory_containers/{self.memory_container_id}/memories/long-term/{memory_id}"
-        return self._make_request("DELETE", url)
\ No newline at end of file
+    def delete_long_term_memory(self, memory_id: str, user_id: Optional[str] = None) -> Dict[str, Any]:
+        """Delete a specific long-term memory by ID.
+
+        Given user_id, the memory is only deleted if that user owns it, and no owner
+        lookup is needed to invalidate the result_cache.
+        """
+        owners = self._memory_owners([memory_id], user_id)
+        if user_id:
+            # Only delete the memory if user_id owns it
+            response = self._delete_long_term_memories_by_query(self._ids_query([memory_id], user_id))
+        else:
+            url = f"{self.base_url}/_plugins/_ml/memory_containers/{self.memory_container_id}/memories/long-term/{memory_id}"
+            response = self._make_request("DELETE", url)
+        self._invalidate_deleted([memory_id], owners)
+        return response
+
+    def get_long_term_memories(self, memory_ids: list[str], user_id: Optional[str] = None) -> list[Dict[str, Any]]:
+        """Get several long-term memories by ID with a single request, only those of user_id if given"""
+        if not memory_ids:
+            return []
+        url = f"{self.base_url}/_plugins/_ml/memory_containers/{self.memory_container_id}/memories/long-term/_search"
+        body = {
+            "query": self._ids_query(memory_ids, user_id),
+            "size": len(memory_ids),
+            "_source": {
+                "excludes": ["memory_embedding"]
+            }
+        }
+
+        response = self._make_request("GET", url, json=body)
+        return self._get_hits(response) or []
+
+    def delete_long_term_memories(self, memory_ids: list[str], user_id: Optional[str] = None) -> Dict[str, Any]:
+        """Delete several long-term memories by ID with a single request, only those of user_id if given"""
+        if not memory_ids:
+            return {"deleted": 0}
+        owners = self._memory_owners(memory_ids, user_id)
+        response = self._delete_long_term_memories_by_query(self._ids_query(memory_ids, user_id))
+        self._invalidate_deleted(memory_ids, owners)
+        return response
+
+    @staticmethod
+    def _ids_query(memory_ids: list[str], user_id: Optional[str] = None) -> Dict[str, Any]:
+        """Query matching the memories by ID, restricted to those of user_id if given"""
+        ids = {
+            "ids": {
+                "values": memory_ids
+            }
+        }
+        if not user_id:
+            return ids
+        return {
+            "bool": {
+                "filter": [
+                    ids,
+                    {
+                        "term": {
+                            "namespace.user_id": user_id
+                        }
+                    }
+                ]
+            }
+        }
+
+    def _memory_owners(self, memory_ids: list[str], user_id: Optional[str] = None) -> set[str]:
+        """Users owning the memories, looked up only when there is a result cache to invalidate"""
+        if self.result_cache is None:
+            return set()
+        if user_id:
+            return {user_id}
+        hits = self.get_long_term_memories(memory_ids)
+        return {hit["_source"]["namespace"]["user_id"] for hit in hits
+                if hit.get("_source", {}).get("namespace", {}).get("user_id")}
+
+    def _invalidate_deleted(self, memory_ids: list[str], owners: set[str]) -> None:
+        if self.result_cache is None:
+            return
+        # Bumping the owner's generation also drops searches still in flight
+        for owner in owners:
+            self.result_cache.invalidate_user(owner, write=False)
+        self.result_cache.invalidate_memories(memory_ids)
+
+    def delete_long_term_memories_by_query(self, user_id: str, older_than: Optional[str] = None,
+                                           filters: Optional[list[Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """Delete a user's long-term memories, optionally only those created before now minus older_than (e.g. "30d")"""
+        filter_clauses = [
+            {
+                "term": {
+                    "namespace.user_id": user_id
+                }
+            }
+        ] + (filters or [])
+        if older_than:
+            filter_clauses.append({
+                "range": {
+                    "created_time": {
+                        "lt": f"now-{older_than}"
+                    }
+                }
+            })
+        query = {
+            "bool": {
+                "filter": filter_clauses
+            }
+        }
+        response = self._delete_long_term_memories_by_query(query)
+        if self.result_cache is not None:
+            self.result_cache.invalidate_user(user_id, write=False)
+        return response
+
+    def _delete_long_term_memories_by_query(self, query: Dict[str, Any]) -> Dict[str, Any]:
+        url = f"{self.base_url}/_plugins/_ml/memory_containers/{self.memory_container_id}/memories/long-term/_delete_by_query"
+        return self._make_request("POST", url, json={"query": query})
\ No newline at end of file
@@ -13,8 +13,10 @@ class OpenSearchSessionRepository(SessionRepository):
                  password: str,
                  memory_container_id: str = None,
                  memory_container_name: str = "default",
-                 memory_container_description: str = "Strands agent memory container"):
-        self.osam = OpenSearchAgenticMemory(cluster_url, username, password, memory_container_id, memory_container_name, memory_container_description)
+                 memory_container_description: str = "Strands agent memory container",
+                 memory: Optional[OpenSearchAgenticMemory] = None):
+        # A memory client passed in, e.g. one pooled client shared by many repositories, is used as is
+        self.osam = memory or OpenSearchAgenticMemory(cluster_url, username, password, memory_container_id, memory_container_name, memory_container_description)
 
     def create_session(self, session: Session, **kwargs: Any) -> Session:
         self.osam.create_session(session.session_id, session.to_dict(),)
@@ -0,0 +1,674 @@
+"""In-process stand-in for the OpenSearch Agentic Memory API.
+
+Serves the memory container, session, working memory, long-term memory, history,
+model and search pipeline endpoints used by OpenSearchAgenticMemory and
+OpenSearchSaver from in-memory indexes, with optional injected latency and
+refresh delay, so both clients can be tested and benchmarked without a cluster
+or a model provider.
+
+Searches support the bool/term/terms/range/ids/exists/match query subset, sort,
+size/from, search_after, min_score and _source filtering, plus neural, knn and
+hybrid queries over a deterministic bag-of-words embedding. Writes with infer=True
+to a container with memory strategies synchronously add one long-term memory per
+message and an ADD event to the history. inject_failures() makes the next requests
+fail with a given status, for retry and circuit breaker tests.
+
+    with FakeAgenticMemoryServer(latency=0.005) as server:
+        saver = OpenSearchSaver(server.url, container_id)
+"""
+
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+from urllib.parse import parse_qs, urlparse
+
+from opensearch_agentic_memory import sort_hits
+
+MEMORY_TYPES = ("sessions", "working", "long-term", "history")
+DEFAULT_DIMENSION = 1024
+
+_CONTAINER = r"/_plugins/_ml/memory_containers/(?P<cid>[^/_][^/]*)"
+_MEMORIES = _CONTAINER + r"/memories/(?P<kind>sessions|working|long-term|history)"
+
+
+class FakeAgenticMemoryServer:
+    """Threaded HTTP server holding memory containers, models and plain indexes in memory.
+
+    Every response is delayed by latency seconds plus a uniform random jitter, to
+    mimic the round trip to a real cluster. Request and response bytes are counted
+    so callers can report bytes on the wire. Session and working memory writes
+    reach searches refresh_delay seconds later, like an index refresh; until then
+    searches see the previous version of a document, if any. Writes are visible
+    immediately by default, as if every request used refresh=true. Gets by id
+    are always real time.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0, jitter: float = 0.0,
+                 refresh_delay: float = 0.0):
+        self.latency = latency
+        self.jitter = jitter
+        self.refresh_delay = refresh_delay
+        self.containers: Dict[str, Dict[str, Any]] = {}
+        # memories[container_id][memory type][doc id] -> source
+        self.memories: Dict[str, Dict[str, Dict[str, Dict[str, Any]]]] = {}
+        self.models: Dict[str, Dict[str, Any]] = {}
+        self.pipelines: Dict[str, Dict[str, Any]] = {}
+        # indexes[index][doc id] -> {"_source", "_seq_no"}, for the container lock index
+        self.indexes: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        # (container id, memory type, doc id) -> (refreshed at, version searches still see)
+        self.unrefreshed: Dict[tuple[str, str, str], tuple[float, Optional[Dict[str, Any]]]] = {}
+        self.faults: list[Dict[str, Any]] = []
+        self.requests = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self._seq_no = 0
+        self._lock = threading.RLock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeAgenticMemoryServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "FakeAgenticMemoryServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def inject_failures(self, count: int = 1, status: int = 503, retry_after: Optional[str] = None,
+                        path: Optional[str] = None) -> None:
+        """Answer the next count requests (whose path contains path, if given) with status instead."""
+        with self._lock:
+            self.faults.extend({"status": status, "retry_after": retry_after, "path": path} for _ in range(count))
+
+    def _take_fault(self, path: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            for i, fault in enumerate(self.faults):
+                if fault["path"] is None or fault["path"] in path:
+                    return self.faults.pop(i)
+        return None
+
+    def traffic(self) -> Dict[str, int]:
+        with self._lock:
+            return {"requests": self.requests, "bytes_in": self.bytes_in, "bytes_out": self.bytes_out}
+
+    # Routes: (methods, path pattern, handler name), matched in order
+    ROUTES = [
+        (("GET",), r"", "info"),
+        (("POST",), r"/_plugins/_ml/memory_containers/_create", "create_container"),
+        (("POST",), r"/_plugins/_ml/memory_containers/_search", "search_containers"),
+        (("GET", "DELETE"), _CONTAINER, "container"),
+        (("POST",), _CONTAINER + r"/memories/sessions", "create_session"),
+        (("POST",), _MEMORIES + r"/_search", "search_memories"),
+        (("POST",), _MEMORIES + r"/_delete_by_query", "delete_memories_by_query"),
+        (("POST",), _CONTAINER + r"/memories/_delete_by_query", "delete_memories_by_query"),
+        (("GET", "PUT", "DELETE"), _MEMORIES + r"/(?P<doc_id>[^/]+)", "memory"),
+        (("POST",), _CONTAINER + r"/memories", "add_memories"),
+        (("GET", "DELETE"), _CONTAINER + r"/memories/(?P<doc_id>[^/]+)", "memory"),
+        (("POST",), r"/_plugins/_ml/models/_register", "register_model"),
+        (("POST",), r"/_plugins/_ml/models/_search", "search_models"),
+        (("POST",), r"/_plugins/_ml/models/(?P<model_id>[^/]+)/_predict", "predict"),
+        (("PUT",), r"/_plugins/_ml/models/(?P<model_id>[^/]+)", "update_model"),
+        (("PUT",), r"/_search/pipeline/(?P<name>[^/]+)", "put_pipeline"),
+        (("PUT",), r"/(?P<index>[^_/][^/]*)/_create/(?P<doc_id>[^/]+)", "create_doc"),
+        (("GET", "PUT", "DELETE"), r"/(?P<index>[^_/][^/]*)/_doc/(?P<doc_id>[^/]+)", "doc"),
+    ]
+
+    # Query parameters each handler accepts; like OpenSearch, any other one is a 400
+    PARAMS = {
+        "search_memories": {"search_pipeline"},
+        "create_doc": {"refresh"},
+        "doc": {"if_seq_no", "if_primary_term", "refresh"},
+    }
+
+    def dispatch(self, method: str, path: str, params: Dict[str, str], body: Any) -> tuple[int, Any]:
+        # GET with a body is how OpenSearchAgenticMemory sends searches
+        if method == "GET" and path.endswith("/_search"):
+            method = "POST"
+        for methods, pattern, name in self.ROUTES:
+            match = re.fullmatch(pattern, path)
+            if match is None or method not in methods:
+                continue
+            unknown = sorted(set(params) - self.PARAMS.get(name, set()))
+            if unknown:
+                return 400, _error(f"request [{path}] contains unrecognized parameters: {unknown}", 400)
+            args = match.groupdict()
+            if "cid" in args and args["cid"] not in self.containers:
+                return 404, _error(f"memory container {args['cid']} not found", 404)
+            return getattr(self, name)(method=method, body=body or {}, params=params, **args)
+        return 400, _error(f"no handler found for uri [{path}] and method [{method}]", 400)
+
+    def info(self, **_) -> tuple[int, Any]:
+        return 200, {"name": "fake-agentic-memory", "version": {"distribution": "opensearch", "number": "3.3.0"}}
+
+    # Memory containers
+
+    def create_container(self, body: Dict[str, Any], **_) -> tuple[int, Any]:
+        cid = _new_id()
+        with self._lock:
+            self.containers[cid] = {**body, "created_time": _now()}
+            self.memories[cid] = {kind: {} for kind in MEMORY_TYPES}
+        return 200, {"memory_container_id": cid, "status": "created"}
+
+    def search_containers(self, body: Dict[str, Any], **_) -> tuple[int, Any]:
+        with self._lock:
+            docs = dict(self.containers)
+        return 200, self.search(docs, body)
+
+    def container(self, method: str, cid: str, **_) -> tuple[int, Any]:
+        with self._lock:
+            if method == "DELETE":
+                del self.containers[cid]
+                del self.memories[cid]
+                return 200, {"_id": cid, "result": "deleted"}
+            return 200, self.containers[cid]
+
+    # Memories
+
+    def create_session(self, cid: str, body: Dict[str, Any], **_) -> tuple[int, Any]:
+        sid = body.get("session_id") or _new_id()
+        with self._lock:
+            self._written(cid, "sessions", sid)
+            self.memories[cid]["sessions"][sid] = {
+                **body,
+                "namespace": {"session_id": sid},
+                "memory_container_id": cid,
+                "created_time": _now(),
+                "last_updated_time": _now(),
+            }
+        return 200, {"session_id": sid, "status": "created"}
+
+    def add_memories(self, cid: str, body: Dict[str, Any], **_) -> tuple[int, Any]:
+        doc_id = _new_id()
+        namespace = body.get("namespace") or {}
+        with self._lock:
+            self._written(cid, "working", doc_id)
+            self.memories[cid]["working"][doc_id] = {
+                **body,
+                "memory_container_id": cid,
+                "namespace_size": len(namespace),
+                "created_time": _now(),
+                "last_updated_time": _now(),
+            }
+            if body.get("infer"):
+                self._infer(cid, body)
+        return 200, {"working_memory_id": doc_id, "session_id": namespace.get("session_id")}
+
+    def _infer(self, cid: str, body: Dict[str, Any]) -> None:
+        """Store each message's text as a long-term memory, for every strategy whose namespace is present."""
+        configuration = self.containers[cid].get("configuration", {})
+        namespace = body.get("namespace") or {}
+        for strategy in configuration.get("strategies", []):
+            keys = strategy.get("namespace", [])
+            if not strategy.get("enabled", True) or not all(key in namespace for key in keys):
+                continue
+            strategy_namespace = {key: namespace[key] for key in keys}
+            for message in body.get("messages", []):
+                text = _message_text(message)
+                if not text:
+                    continue
+                memory_id = _new_id()
+                memory = {
+                    "memory": text,
+                    "strategy_type": strategy.get("type", "SEMANTIC"),
+                    "namespace": strategy_namespace,
+                    "namespace_size": len(strategy_namespace),
+                    "memory_embedding": embed(text, configuration.get("embedding_dimension", DEFAULT_DIMENSION)),
+                    "memory_container_id": cid,
+                    "created_time": _now(),
+                    "last_updated_time": _now(),
+                }
+                self.memories[cid]["long-term"][memory_id] = memory
+                self.memories[cid]["history"][_new_id()] = {
+                    "memory_id": memory_id,
+                    "action": "ADD",
+                    "after": {"memory": text},
+                    "namespace": strategy_namespace,
+                    "memory_container_id": cid,
+                    "created_time": _now(),
+                }
+
+    def memory(self, method: str, cid: str, doc_id: str, body: Dict[str, Any], kind: str = "working",
+               **_) -> tuple[int, Any]:
+        with self._lock:
+            docs = self.memories[cid][kind]
+            if doc_id not in docs:
+                return 404, _error(f"{kind} memory {doc_id} not found", 404)
+            if method == "GET":
+                return 200, docs[doc_id]
+            if method == "DELETE":
+                del docs[doc_id]
+                return 200, {"_id": doc_id, "result": "deleted"}
+            self._written(cid, kind, doc_id)
+            docs[doc_id] = {**docs[doc_id], **body, "last_updated_time": _now()}
+            return 200, {"_id": doc_id, "result": "updated"}
+
+    def search_memories(self, cid: str, kind: str, body: Dict[str, Any], params: Dict[str, str],
+                        **_) -> tuple[int, Any]:
+        with self._lock:
+            docs = self._searchable(cid, kind)
+        return 200, self.search(docs, body, params.get("search_pipeline"))
+
+    def _written(self, cid: str, kind: str, doc_id: str) -> None:
+        """Hide a write from searches for refresh_delay seconds. Call before changing the document."""
+        if not self.refresh_delay:
+            return
+        key = (cid, kind, doc_id)
+        # Searches keep seeing the last refreshed version until the latest write is refreshed
+        _, searchable = self.unrefreshed.get(key, (None, self.memories[cid][kind].get(doc_id)))
+        self.unrefreshed[key] = (time.monotonic() + self.refresh_delay, searchable)
+
+    def _searchable(self, cid: str, kind: str) -> Dict[str, Dict[str, Any]]:
+        """The documents of a memory index as of its last refresh."""
+        docs = dict(self.memories[cid][kind])
+        now = time.monotonic()
+        for key, (refreshed_at, searchable) in list(self.unrefreshed.items()):
+            if refreshed_at <= now:
+                del self.unrefreshed[key]
+            elif key[:2] == (cid, kind):
+                if searchable is None:
+                    docs.pop(key[2], None)
+                else:
+                    docs[key[2]] = searchable
+        return docs
+
+    def delete_memories_by_query(self, cid: str, body: Dict[str, Any], kind: str = "working",
+                                 **_) -> tuple[int, Any]:
+        query = body.get("query", {})
+        with self._lock:
+            docs = self.memories[cid][kind]
+            deleted = [doc_id for doc_id, source in docs.items() if matches_query(doc_id, source, query)]
+            for doc_id in deleted:
+                del docs[doc_id]
+        return 200, {"took": 0, "timed_out": False, "total": len(deleted), "deleted": len(deleted), "failures": []}
+
+    # Models and search pipelines
+
+    def register_model(self, body: Dict[str, Any], **_) -> tuple[int, Any]:
+        model_id = _new_id()
+        with self._lock:
+            self.models[model_id] = {**body, "model_state": "DEPLOYED", "created_time": _now()}
+        return 200, {"model_id": model_id, "task_id": _new_id(), "status": "CREATED"}
+
+    def search_models(self, body: Dict[str, Any], **_) -> tuple[int, Any]:
+        with self._lock:
+            docs = dict(self.models)
+        return 200, self.search(docs, body)
+
+    def update_model(self, model_id: str, body: Dict[str, Any], **_) -> tuple[int, Any]:
+        with self._lock:
+            model = self.models.get(model_id)
+            if model is None:
+                return 404, _error(f"model {model_id} not found", 404)
+            if "connector" in body:
+                model["connector"] = {**model.get("connector", {}), **body["connector"]}
+            model.update({key: value for key, value in body.items() if key != "connector"})
+        return 200, {"_id": model_id, "result": "updated"}
+
+    def predict(self, model_id: str, body: Dict[str, Any], **_) -> tuple[int, Any]:
+        if model_id not in self.models:
+            return 404, _error(f"model {model_id} not found", 404)
+        vector = self._embed_with(model_id, body.get("parameters", {}).get("inputText", ""))
+        return 200, {"inference_results": [{
+            "output": [{"name": "sentence_embedding", "data_type": "FLOAT32", "shape": [len(vector)], "data": vector}],
+            "status_code": 200,
+        }]}
+
+    def _embed_with(self, model_id: str, text: str) -> list[float]:
+        parameters = self.models.get(model_id, {}).get("connector", {}).get("parameters", {})
+        return embed(text, parameters.get("dimensions", DEFAULT_DIMENSION))
+
+    def put_pipeline(self, name: str, body: Dict[str, Any], **_) -> tuple[int, Any]:
+        with self._lock:
+            self.pipelines[name] = body
+        return 200, {"acknowledged": True}
+
+    # Plain documents, as used by the container creation lock
+
+    def create_doc(self, index: str, doc_id: str, body: Dict[str, Any], **_) -> tuple[int, Any]:
+        with self._lock:
+            docs = self.indexes.setdefault(index, {})
+            if doc_id in docs:
+                return 409, _error(f"[{doc_id}]: version conflict, document already exists", 409)
+            return 201, self._write_doc(index, doc_id, body, "created")
+
+    def doc(self, method: str, index: str, doc_id: str, body: Dict[str, Any], params: Dict[str, str],
+            **_) -> tuple[int, Any]:
+        with self._lock:
+            docs = self.indexes.setdefault(index, {})
+            if method == "GET":
+                if doc_id not in docs:
+                    return 404, {"_index": index, "_id": doc_id, "found": False}
+                return 200, {"_index": index, "_id": doc_id, "found": True, "_primary_term": 1, **docs[doc_id]}
+            # Conditional writes conflict with a changed and with a missing document
+            if "if_seq_no" in params and int(params["if_seq_no"]) != docs.get(doc_id, {}).get("_seq_no"):
+                return 409, _error(f"[{doc_id}]: version conflict, required seqNo [{params['if_seq_no']}]", 409)
+            if method == "PUT":
+                result = "updated" if doc_id in docs else "created"
+                return (200 if doc_id in docs else 201), self._write_doc(index, doc_id, body, result)
+            if doc_id not in docs:
+                return 404, {"_index": index, "_id": doc_id, "found": False}
+            del docs[doc_id]
+            return 200, {"_index": index, "_id": doc_id, "result": "deleted"}
+
+    def _write_doc(self, index: str, doc_id: str, source: Dict[str, Any], result: str) -> Dict[str, Any]:
+        self._seq_no += 1
+        self.indexes[index][doc_id] = {"_source": source, "_seq_no": self._seq_no}
+        return {"_index": index, "_id": doc_id, "result": result, "_seq_no": self._seq_no, "_primary_term": 1}
+
+    # Search
+
+    def search(self, docs: Dict[str, Dict[str, Any]], body: Dict[str, Any],
+               pipeline: Optional[str] = None) -> Dict[str, Any]:
+        """Run a search body over docs keyed by id, returning an OpenSearch style response."""
+        scores = self._score(docs, body.get("query") or {"match_all": {}}, pipeline)
+        hits = [{"_id": doc_id, "_score": score, "_source": docs[doc_id]} for doc_id, score in scores.items()]
+        if body.get("min_score") is not None:
+            hits = [hit for hit in hits if hit["_score"] >= body["min_score"]]
+
+        sort = body.get("sort") or [{"_score": {"order": "desc"}}]
+        hits = sort_hits(hits, sort)
+        for hit in hits:
+            hit["sort"] = sort_values(hit, sort)
+        if body.get("search_after") is not None:
+            hits = [hit for hit in hits if _after(hit["sort"], body["search_after"], sort)]
+        total = len(hits)
+        max_score = max((hit["_score"] for hit in hits), default=None)
+
+        start = 0 if body.get("search_after") is not None else body.get("from", 0)
+        page = hits[start:start + body.get("size", 10)]
+        for hit in page:
+            hit["_source"] = _filter_source(hit["_source"], body.get("_source", True))
+            if not body.get("sort"):
+                del hit["sort"]
+        return {
+            "took": 0,
+            "timed_out": False,
+            "hits": {"total": {"value": total, "relation": "eq"}, "max_score": max_score, "hits": page},
+        }
+
+    def _score(self, docs: Dict[str, Dict[str, Any]], query: Dict[str, Any],
+               pipeline: Optional[str]) -> Dict[str, float]:
+        """Matching doc ids with their scores, in index order for unscored queries."""
+        if "neural" in query or "knn" in query:
+            field, options = next(iter((query.get("neural") or query["knn"]).items()))
+            vector = options.get("vector") or self._embed_with(options.get("model_id"), options.get("query_text", ""))
+            candidates = {doc_id: source for doc_id, source in docs.items()
+                          if source.get(field) and matches_query(doc_id, source, options.get("filter", {"match_all": {}}))}
+            # Cosine similarity in the 0..1 range of the cosinesimil space type
+            scored = {doc_id: (1 + _cosine(vector, source[field])) / 2 for doc_id, source in candidates.items()}
+            top = sorted(scored, key=scored.get, reverse=True)[:options.get("k", 10)]
+            return {doc_id: scored[doc_id] for doc_id in top}
+
+        if "hybrid" in query:
+            results = [self._score(docs, subquery, pipeline) for subquery in query["hybrid"]["queries"]]
+            weights = self._pipeline_weights(pipeline, len(results))
+            combined: Dict[str, float] = {}
+            for result, weight in zip(results, weights):
+                low, high = min(result.values(), default=0.0), max(result.values(), default=0.0)
+                for doc_id, score in result.items():
+                    normalized = (score - low) / (high - low) if high > low else 1.0
+                    combined[doc_id] = combined.get(doc_id, 0.0) + weight * normalized
+            return {doc_id: score / sum(weights) for doc_id, score in combined.items()}
+
+        return {doc_id: _lexical_score(source, query) for doc_id, source in docs.items()
+                if matches_query(doc_id, source, query)}
+
+    def _pipeline_weights(self, pipeline: Optional[str], count: int) -> list[float]:
+        for processor in self.pipelines.get(pipeline, {}).get("phase_results_processors", []):
+            combination = processor.get("normalization-processor", {}).get("combination", {})
+            weights = combination.get("parameters", {}).get("weights")
+            if weights and len(weights) == count:
+                return weights
+        return [1.0] * count
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body go out in separate writes, avoid delayed-ACK stalls
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args) -> None:
+                pass
+
+            def _handle(self) -> None:
+                length = int(self.headers.get("Content-Length") or 0)
+                raw = self.rfile.read(length) if length else b""
+                parsed = urlparse(self.path)
+                params = {key: values[-1] for key, values in parse_qs(parsed.query).items()}
+                fault = server._take_fault(parsed.path)
+                try:
+                    body = json.loads(raw) if raw else None
+                    if fault:
+                        status, payload = fault["status"], _error("injected failure", fault["status"])
+                    else:
+                        status, payload = server.dispatch(self.command, parsed.path.rstrip("/"), params, body)
+                except Exception as e:
+                    status, payload = 500, _error(f"{type(e).__name__}: {e}", 500)
+
+                delay = server.latency + (random.uniform(0, server.jitter) if server.jitter else 0.0)
+                if delay:
+                    time.sleep(delay)
+
+                data = json.dumps(payload).encode("utf-8")
+                with server._lock:
+                    server.requests += 1
+                    server.bytes_in += len(raw) + len(self.requestline) + len(str(self.headers))
+                    server.bytes_out += len(data)
+                self.send_response(status)
+                if fault and fault["retry_after"] is not None:
+                    self.send_header("Retry-After", fault["retry_after"])
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_GET = do_POST = do_PUT = do_DELETE = _handle
+
+        return Handler
+
+
+def embed(text: str, dimension: int = DEFAULT_DIMENSION) -> list[float]:
+    """Deterministic unit-length bag-of-words embedding, so texts sharing words score as similar."""
+    vector = [0.0] * dimension
+    for token in _tokens(text):
+        vector[int(hashlib.md5(token.encode("utf-8")).hexdigest(), 16) % dimension] += 1.0
+    norm = math.sqrt(sum(value * value for value in vector))
+    return [value / norm for value in vector] if norm else vector
+
+
+def _tokens(text: str) -> list[str]:
+    return re.findall(r"\w+", str(text).lower())
+
+
+def _cosine(a: list[float], b: list[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+def _lexical_score(source: Dict[str, Any], query: Dict[str, Any]) -> float:
+    """Share of query terms found by each match clause, summed; 1.0 for queries without one."""
+    matches = []
+
+    def collect(clause: Dict[str, Any]) -> None:
+        if "match" in clause:
+            matches.append(clause["match"])
+        for occur in ("must", "should"):
+            for sub in clause.get("bool", {}).get(occur, []):
+                collect(sub)
+
+    collect(query)
+    if not matches:
+        return 1.0
+    score = 0.0
+    for match in matches:
+        field, text = next(iter(match.items()))
+        terms = set(_tokens(text.get("query", "") if isinstance(text, dict) else text))
+        value = source
+        for part in field.split("."):
+            value = value.get(part) if isinstance(value, dict) else None
+        if terms and value:
+            score += len(terms & set(_tokens(value))) / len(terms)
+    return score
+
+
+def _field_value(source: Dict[str, Any], field: str) -> Any:
+    """Read a dotted field from a document source, ignoring a trailing .keyword subfield."""
+    if field.endswith(".keyword"):
+        field = field[:-len(".keyword")]
+    value: Any = source
+    for part in field.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+_DATE_MATH = re.compile(r"^now(?:([+-])(\d+)([smhdw]))?$")
+_DATE_MATH_UNITS = {"s": 1000, "m": 60 * 1000, "h": 3600 * 1000, "d": 86400 * 1000, "w": 7 * 86400 * 1000}
+
+
+def _range_bound(value: Any) -> Any:
+    """Resolve "now" and "now-30d" style date math to epoch milliseconds."""
+    match = _DATE_MATH.match(value) if isinstance(value, str) else None
+    if not match:
+        return value
+    now = int(time.time() * 1000)
+    if not match.group(1):
+        return now
+    offset = int(match.group(2)) * _DATE_MATH_UNITS[match.group(3)]
+    return now - offset if match.group(1) == "-" else now + offset
+
+
+def matches_query(doc_id: str, source: Dict[str, Any], query: Dict[str, Any]) -> bool:
+    """Evaluate the bool/term/terms/range/ids/exists/match subset of the query DSL used by the clients.
+
+    Unsupported clauses never match.
+    """
+    if not query or "match_all" in query:
+        return True
+    if "bool" in query:
+        clauses = query["bool"]
+        for occur in ("filter", "must"):
+            occurs = clauses.get(occur, [])
+            for clause in occurs if isinstance(occurs, list) else [occurs]:
+                if not matches_query(doc_id, source, clause):
+                    return False
+        must_not = clauses.get("must_not", [])
+        return not any(matches_query(doc_id, source, clause)
+                       for clause in (must_not if isinstance(must_not, list) else [must_not]))
+    if "term" in query:
+        field, expected = next(iter(query["term"].items()))
+        if isinstance(expected, dict):
+            expected = expected.get("value")
+        value = _field_value(source, field)
+        return expected in value if isinstance(value, list) else value == expected
+    if "terms" in query:
+        field, expected = next(iter(query["terms"].items()))
+        value = _field_value(source, field)
+        values = value if isinstance(value, list) else [value]
+        return any(v in expected for v in values)
+    if "range" in query:
+        field, bounds = next(iter(query["range"].items()))
+        value = _field_value(source, field)
+        if value is None:
+            return False
+        bounds = {op: _range_bound(bound) for op, bound in bounds.items()}
+        try:
+            return all([
+                "gt" not in bounds or value > bounds["gt"],
+                "gte" not in bounds or value >= bounds["gte"],
+                "lt" not in bounds or value < bounds["lt"],
+                "lte" not in bounds or value <= bounds["lte"],
+            ])
+        except TypeError:
+            return False
+    if "ids" in query:
+        return doc_id in query["ids"].get("values", [])
+    if "exists" in query:
+        return _field_value(source, query["exists"]["field"]) is not None
+    if "match" in query:
+        field, text = next(iter(query["match"].items()))
+        if isinstance(text, dict):
+            text = text.get("query", "")
+        value = _field_value(source, field)
+        # Any shared lowercase token matches, like the default OR operator
+        return bool(value) and bool(set(str(text).lower().split()) & set(str(value).lower().split()))
+    return False
+
+
+def sort_values(hit: Dict[str, Any], sort: list[Any]) -> list[Any]:
+    """The "sort" values OpenSearch returns with a hit, usable as a search_after cursor."""
+    fields = [spec if isinstance(spec, str) else next(iter(spec)) for spec in sort]
+    return [hit.get("_score") if field == "_score" else _field_value(hit["_source"], field) for field in fields]
+
+
+def _after(values: list[Any], cursor: list[Any], sort: list[Any]) -> bool:
+    """Whether a hit with these sort values comes after the search_after cursor."""
+    orders = []
+    for spec in sort:
+        if isinstance(spec, str):
+            orders.append("desc" if spec == "_score" else "asc")
+        else:
+            options = next(iter(spec.values()))
+            orders.append(options.get("order", "asc") if isinstance(options, dict) else options)
+    for value, bound, order in zip(values, cursor, orders):
+        if value == bound:
+            continue
+        if value is None or bound is None:
+            return value is None
+        return value > bound if order == "asc" else value < bound
+    return False
+
+
+def _filter_source(source: Dict[str, Any], spec: Any) -> Any:
+    if spec is True or spec is None:
+        return source
+    if spec is False:
+        return {}
+    if isinstance(spec, (str, list)):
+        spec = {"includes": [spec] if isinstance(spec, str) else spec}
+    includes, excludes = spec.get("includes"), spec.get("excludes", [])
+    return {key: value for key, value in source.items()
+            if (not includes or key in includes) and key not in excludes}
+
+
+def _message_text(message: Any) -> str:
+    content = message.get("content", "") if isinstance(message, dict) else message
+    if isinstance(content, list):
+        return " ".join(item.get("text", "") for item in content if isinstance(item, dict)).strip()
+    return str(content).strip()
+
+
+def _new_id() -> str:
+    return uuid.uuid4().hex[:20]
+
+
+def _now() -> int:
+    return int(time.time() * 1000)
+
+
+def _error(reason: str, status: int) -> Dict[str, Any]:
+    return {"error": {"type": "status_exception", "reason": reason}, "status": status}
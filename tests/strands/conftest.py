@@ -0,0 +1,18 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path[:0] = [os.path.join(ROOT, "strands"), os.path.join(ROOT, "tests")]
+
+from fake_agentic_memory_server import FakeAgenticMemoryServer  # noqa: E402
+
+# The live-cluster script needs Bedrock and a cluster at localhost:9200
+collect_ignore = ["opensearch_session_manager_strands_test.py"]
+
+
+@pytest.fixture
+def server():
+    with FakeAgenticMemoryServer() as server:
+        yield server
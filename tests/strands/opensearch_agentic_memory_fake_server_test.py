@@ -0,0 +1,100 @@
+import time
+
+import requests
+
+from fake_agentic_memory_server import FakeAgenticMemoryServer
+from opensearch_agentic_memory import OpenSearchAgenticMemory
+
+
+def make_memory(server, name="fake_server_test", long_term=False):
+    return OpenSearchAgenticMemory(server.url, "admin", "admin", memory_container_name=name,
+                                   long_term=long_term, cache_path=None)
+
+
+def message(message_id, text, role="user"):
+    return {"message": {"role": role, "content": [{"text": text}]}, "message_id": message_id,
+            "created_at": "2026-01-01T00:00:00Z", "updated_at": "2026-01-01T00:00:00Z"}
+
+
+def test_container_is_created_once_per_name(server):
+    first = make_memory(server)
+    second = make_memory(server)
+    assert first.memory_container_id == second.memory_container_id
+    assert len(server.containers) == 1
+
+
+def test_session_and_working_memory_round_trip(server):
+    memory = make_memory(server)
+    memory.create_session("s1", {"session_type": "AGENT"}, {"agent": {"agent_id": "agent"}})
+    assert memory.get_session("s1")["agents"] == {"agent": {"agent_id": "agent"}}
+    assert memory.get_session("missing") is None
+
+    for i in range(5):
+        memory.add_message("s1", "agent", message(i, f"message {i}"))
+    memory.add_message("s2", "agent", message(0, "other session"))
+
+    listed = memory.list_message("s1", "agent")
+    assert [m["message_id"] for m in listed] == [0, 1, 2, 3, 4]
+    page = memory.list_message("s1", "agent", limit=2, offset=2)
+    assert [m["message_id"] for m in page] == [2, 3]
+
+    memory.update_message("s1", "agent", message(3, "edited"))
+    assert memory.get_message("s1", "agent", 3)["message"]["content"][0]["text"] == "edited"
+
+
+def test_long_term_inference_search_and_delete(server):
+    memory = make_memory(server, name="fake_server_long_term", long_term=True)
+    for text in ("I like swimming in the sea", "My favourite food is ramen"):
+        memory.add_messages("s1", "agent", [{"role": "user", "content": [{"text": text}]}], infer=True, user_id="bob")
+        # Distinct created_time values, the only sort key of queryless searches
+        time.sleep(0.005)
+    memory.add_message("s2", "agent", message(0, "I like hiking"), infer=True, user_id="alice")
+
+    hits = memory.search_long_term_memories("which sport does bob like swimming", "bob", k=1)
+    assert [hit["_source"]["memory"] for hit in hits] == ["I like swimming in the sea"]
+    assert "memory_embedding" not in hits[0]["_source"]
+
+    hybrid = memory.search_long_term_memories("ramen", "bob", k=2, hybrid=True)
+    assert hybrid[0]["_source"]["memory"] == "My favourite food is ramen"
+
+    first = memory.search_long_term_memories(None, "bob", k=1)
+    rest = memory.search_long_term_memories(None, "bob", k=1, search_after=first[-1]["sort"])
+    assert len(first) == len(rest) == 1 and first[0]["_id"] != rest[0]["_id"]
+
+    response = memory.delete_long_term_memories_by_query("bob")
+    assert response["deleted"] == 2
+    assert memory.search_long_term_memories(None, "bob") == []
+    assert len(memory.search_long_term_memories(None, "alice")) == 1
+
+
+def test_unknown_query_parameters_are_rejected(server):
+    from opensearch_agentic_memory import ContainerProfile
+    memory = OpenSearchAgenticMemory(server.url, "admin", "admin", memory_container_name="high_write",
+                                     profile=ContainerProfile.from_name("high_write"))
+    memory.create_session("s1", {"session_type": "AGENT"})
+    memory.add_message("s1", "agent", message(0, "hello"))
+    assert memory.get_message("s1", "agent", 0)["message"]["content"][0]["text"] == "hello"
+
+    url = f"{server.url}/_plugins/_ml/memory_containers/{memory.memory_container_id}/memories/working/_search"
+    response = requests.post(url, json={"query": {"match_all": {}}}, params={"routing": "s1"})
+    assert response.status_code == 400
+
+
+def test_recent_writes_cover_the_refresh_interval():
+    from opensearch_agentic_memory import RecentWrites
+    with FakeAgenticMemoryServer(refresh_delay=0.3) as server:
+        plain = make_memory(server, name="refresh_lag")
+        overlaid = OpenSearchAgenticMemory(server.url, "admin", "admin", memory_container_name="refresh_lag",
+                                           cache_path=None, recent_writes=RecentWrites(max_age=5))
+
+        overlaid.add_message("s1", "agent", message(0, "hello"))
+        assert plain.get_message("s1", "agent", 0) is None
+        assert overlaid.get_message("s1", "agent", 0)["message"]["content"][0]["text"] == "hello"
+
+        time.sleep(0.35)
+        overlaid.update_message("s1", "agent", message(0, "edited"))
+        assert plain.get_message("s1", "agent", 0)["message"]["content"][0]["text"] == "hello"
+        assert [m["message"]["content"][0]["text"] for m in overlaid.list_message("s1", "agent")] == ["edited"]
+
+        time.sleep(0.35)
+        assert plain.get_message("s1", "agent", 0)["message"]["content"][0]["text"] == "edited"
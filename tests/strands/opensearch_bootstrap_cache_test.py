@@ -0,0 +1,60 @@
+from opensearch_agentic_memory import BootstrapCache, MemoryContainerRegistry, OpenSearchAgenticMemory, \
+    container_registry
+
+
+def message(message_id, text):
+    return {"message": {"role": "user", "content": [{"text": text}]}, "message_id": message_id,
+            "created_at": "2026-01-01T00:00:00Z", "updated_at": "2026-01-01T00:00:00Z"}
+
+
+def test_cache_is_opt_in(server):
+    memory = OpenSearchAgenticMemory(server.url, "admin", "admin", memory_container_name="no_cache")
+    assert memory.bootstrap_cache is None
+
+
+def test_deleted_container_is_evicted_and_resolved_again(server, tmp_path):
+    cache_path = str(tmp_path / "bootstrap.json")
+    first = OpenSearchAgenticMemory(server.url, "admin", "admin", memory_container_name="reset",
+                                    cache_path=cache_path)
+    stale_id = first.memory_container_id
+    BootstrapCache(cache_path).put(f"{server.url}|other", {"memory_container_id": "other-id"})
+
+    # The cluster is reset behind the cache's back
+    server.containers.clear()
+    container_registry.forget(server.url, "reset")
+
+    memory = OpenSearchAgenticMemory(server.url, "admin", "admin", memory_container_name="reset",
+                                     cache_path=cache_path)
+    assert memory.memory_container_id == stale_id
+    memory.add_message("s1", "agent", message(0, "after reset"))
+
+    assert memory.memory_container_id != stale_id
+    assert list(server.containers) == [memory.memory_container_id]
+    assert memory.get_message("s1", "agent", 0)["message"]["content"][0]["text"] == "after reset"
+    cached = BootstrapCache(cache_path).get(f"{server.url}|reset")
+    assert cached["memory_container_id"] == memory.memory_container_id
+    # Other containers of the cluster keep their cached ids
+    assert BootstrapCache(cache_path).get(f"{server.url}|other") == {"memory_container_id": "other-id"}
+
+
+def test_missing_document_does_not_resolve_again(server):
+    memory = OpenSearchAgenticMemory(server.url, "admin", "admin", memory_container_name="kept")
+    container_id = memory.memory_container_id
+    assert memory.get_message("s1", "agent", 42) is None
+    assert memory.memory_container_id == container_id
+
+
+def test_explicit_container_id_is_not_replaced(server):
+    memory = OpenSearchAgenticMemory(server.url, "admin", "admin", memory_container_id="gone")
+    assert memory.get_message("s1", "agent", 0) is None
+    assert memory.memory_container_id == "gone"
+    assert server.containers == {}
+
+
+def test_forgotten_container_is_not_read_back_from_the_registry_file(tmp_path):
+    path = str(tmp_path / "registry.json")
+    registry = MemoryContainerRegistry(path)
+    registry.register("http://cluster", "name", "stale")
+    registry.forget("http://cluster", "name")
+    assert registry.resolve("http://cluster", "name", lambda: "fresh") == "fresh"
+    assert MemoryContainerRegistry(path).resolve("http://cluster", "name", lambda: None) == "fresh"
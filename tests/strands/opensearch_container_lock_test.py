@@ -0,0 +1,75 @@
+import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from opensearch_agentic_memory import get_or_create_memory_container_id
+
+
+def create_container(server, name):
+    return requests.post(f"{server.url}/_plugins/_ml/memory_containers/_create",
+                         json={"name": name}).json()["memory_container_id"]
+
+
+def resolve(server, session=None, name="locked", create=None):
+    session = session or requests.Session()
+
+    def find():
+        response = session.post(f"{server.url}/_plugins/_ml/memory_containers/_search",
+                                json={"query": {"term": {"name.keyword": name}}, "size": 1})
+        hits = response.json()["hits"]["hits"]
+        return hits[0]["_id"] if hits else None
+
+    return get_or_create_memory_container_id(session, server.url, name, find=find,
+                                             create=create or (lambda: create_container(server, name)),
+                                             lock_index="locks", wait_timeout=10)
+
+
+def test_concurrent_workers_create_one_container(server):
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        ids = set(executor.map(lambda _: resolve(server), range(32)))
+    assert len(ids) == 1
+    assert len(server.containers) == 1
+
+
+def test_lock_pointing_to_deleted_container_is_replaced(server):
+    first = resolve(server)
+    requests.delete(f"{server.url}/_plugins/_ml/memory_containers/{first}")
+
+    second = resolve(server)
+    assert second != first
+    assert list(server.containers) == [second]
+    assert resolve(server) == second
+
+
+class DuplicatingSession(requests.Session):
+    """Sends every lock creation twice, like a transport retry after a lost response."""
+
+    def put(self, url, *args, **kwargs):
+        if "/_create/" in url:
+            super().put(url, *args, **kwargs)
+        return super().put(url, *args, **kwargs)
+
+
+def test_retried_lock_creation_is_treated_as_acquired(server):
+    container_id = resolve(server, session=DuplicatingSession())
+    assert list(server.containers) == [container_id]
+
+
+def test_lock_taken_over_during_creation_keeps_one_container(server):
+    lock_url = f"{server.url}/locks/_doc/{hashlib.sha256(b'locked').hexdigest()}"
+    taken_over = []
+
+    def slow_create():
+        created = create_container(server, "locked")
+        # Meanwhile another worker took the lock over as stale and recorded its own container
+        requests.delete(lock_url)
+        taken_over.append(create_container(server, "locked"))
+        requests.put(lock_url, json={"name": "locked", "owner": "other", "memory_container_id": taken_over[0],
+                                     "acquired_at": int(time.time() * 1000)})
+        return created
+
+    assert resolve(server, create=slow_create) == taken_over[0]
+    assert list(server.containers) == taken_over
+    assert requests.get(lock_url).json()["_source"]["memory_container_id"] == taken_over[0]
@@ -0,0 +1,40 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from opensearch_agentic_memory import MemoryContainerRegistry
+
+
+def test_registry_coalesces_concurrent_lookups():
+    registry = MemoryContainerRegistry()
+    calls = []
+    started = threading.Event()
+
+    def lookup():
+        calls.append(1)
+        started.set()
+        time.sleep(0.1)
+        return "container"
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        first = executor.submit(registry.resolve, "http://cluster", "name", lookup)
+        started.wait()
+        others = [executor.submit(registry.resolve, "http://cluster", "name", lookup) for _ in range(7)]
+        ids = [first.result()] + [future.result() for future in others]
+
+    assert ids == ["container"] * 8
+    assert len(calls) == 1
+
+
+def test_registry_does_not_cache_misses_or_errors():
+    registry = MemoryContainerRegistry()
+    assert registry.resolve("http://cluster", "name", lambda: None) is None
+
+    def failing():
+        raise RuntimeError("cluster down")
+
+    with pytest.raises(RuntimeError):
+        registry.resolve("http://cluster", "name", failing)
+    assert registry.resolve("http://cluster", "name", lambda: "created") == "created"
@@ -0,0 +1,30 @@
+from opensearch_agentic_memory import OpenSearchAgenticMemory, QueryEmbeddingCache
+
+
+def test_embedding_cache_normalizes_evicts_and_persists(tmp_path):
+    path = str(tmp_path / "embeddings.jsonl")
+    cache = QueryEmbeddingCache(max_entries=2, path=path)
+    cache.put("model", "User  preferences ", [1.0])
+    assert cache.get("model", "user preferences") == [1.0]
+    assert cache.get("other-model", "user preferences") is None
+
+    cache.put("model", "second", [2.0])
+    cache.put("model", "third", [3.0])
+    assert cache.get("model", "user preferences") is None
+    assert (cache.hits, cache.misses) == (1, 2)
+
+    reloaded = QueryEmbeddingCache(max_entries=2, path=path)
+    assert reloaded.get("model", "second") == [2.0] and reloaded.get("model", "third") == [3.0]
+
+
+def test_embedding_cache_embeds_each_query_once(server):
+    cache = QueryEmbeddingCache()
+    memory = OpenSearchAgenticMemory(server.url, "admin", "admin", memory_container_name="embedding_cache",
+                                     long_term=True, embedding_cache=cache)
+    memory.add_message("s1", "agent", {"message": {"role": "user", "content": [{"text": "I like swimming"}]}},
+                       infer=True, user_id="bob")
+
+    first = memory.search_long_term_memories("Swimming", "bob")
+    second = memory.search_long_term_memories(" swimming ", "bob")
+    assert [hit["_id"] for hit in first] == [hit["_id"] for hit in second] != []
+    assert (cache.hits, cache.misses) == (1, 1)
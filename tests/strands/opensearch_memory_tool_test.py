@@ -0,0 +1,193 @@
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import opensearch_memory_tool
+from opensearch_agentic_memory import OpenSearchAgenticMemory
+from opensearch_memory_tool import OpenSearchMemoryToolProvider, memory_identity
+
+
+def provider_for(server):
+    memory = OpenSearchAgenticMemory(server.url, "admin", "admin", memory_container_name="tool_test", long_term=True)
+    return OpenSearchMemoryToolProvider(session_id="s1", agent_id="agent", render_mode="off", memory=memory)
+
+
+def run_tool(provider, invocation_state, **tool_input):
+    """Run the tool the way an agent's tool executor does, on a fresh event loop."""
+    tool_use = {"toolUseId": "t1", "name": "opensearch_memory", "input": tool_input}
+
+    async def stream():
+        events = [event async for event in provider.opensearch_memory.stream(tool_use, invocation_state)]
+        return events[-1].tool_result
+
+    return asyncio.run(stream())
+
+
+def test_invocation_state_identity_reaches_executor_threads(server, monkeypatch):
+    monkeypatch.setenv("BYPASS_TOOL_CONSENT", "true")
+    provider = provider_for(server)
+    state = {"agent": None, "memory_identity": {"user_id": "bob"}}
+
+    # Executor threads start with an empty context, so only the invocation state identifies bob
+    with memory_identity(user_id="alice"), ThreadPoolExecutor(max_workers=1) as executor:
+        stored = executor.submit(run_tool, provider, state, action="store", content="I like swimming").result()
+        missing = executor.submit(run_tool, provider, {"agent": None}, action="search", query="swimming").result()
+        found = executor.submit(run_tool, provider, state, action="search", query="swimming").result()
+
+    assert stored["status"] == "success"
+    assert missing["status"] == "error" and "user_id" in missing["content"][0]["text"]
+    assert "I like swimming" in found["content"][0]["text"]
+
+
+def test_memory_clients_are_bounded(server, monkeypatch):
+    monkeypatch.setattr(opensearch_memory_tool, "MAX_MEMORY_CLIENTS", 2)
+    monkeypatch.setattr(opensearch_memory_tool, "_memory_clients", opensearch_memory_tool.OrderedDict())
+    first = opensearch_memory_tool._shared_memory_client(cluster_url=server.url, username="admin", password="admin",
+                                                         memory_container_name="one")
+    for name in ("two", "one", "three"):
+        opensearch_memory_tool._shared_memory_client(cluster_url=server.url, username="admin", password="admin",
+                                                     memory_container_name=name)
+    assert len(opensearch_memory_tool._memory_clients) == 2
+    assert opensearch_memory_tool._shared_memory_client(cluster_url=server.url, username="admin", password="admin",
+                                                        memory_container_name="one") is first
+
+
+def test_memory_clients_are_created_outside_the_pool_lock(monkeypatch):
+    monkeypatch.setattr(opensearch_memory_tool, "_memory_clients", opensearch_memory_tool.OrderedDict())
+    release = threading.Event()
+    created = []
+
+    def slow_client(memory_container_name, **_):
+        created.append(memory_container_name)
+        if memory_container_name == "slow":
+            release.wait(5)
+        return object()
+
+    monkeypatch.setattr(opensearch_memory_tool, "OpenSearchAgenticMemory", slow_client)
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        slow = [executor.submit(opensearch_memory_tool._shared_memory_client, memory_container_name="slow")
+                for _ in range(3)]
+        # Another key is served while the slow client is still being created
+        assert opensearch_memory_tool._shared_memory_client(memory_container_name="fast") is not None
+        release.set()
+        assert len({id(future.result()) for future in slow}) == 1
+    assert sorted(created) == ["fast", "slow"]
+
+
+def test_provider_pool_is_bounded_and_leaves_caller_clients_open(server, monkeypatch):
+    monkeypatch.setattr(opensearch_memory_tool, "MAX_POOLED_PROVIDERS", 2)
+    monkeypatch.setattr(opensearch_memory_tool, "_provider_pool", opensearch_memory_tool.OrderedDict())
+    memories = {user: OpenSearchAgenticMemory(server.url, "admin", "admin", memory_container_name="pooled")
+                for user in ("alice", "bob", "carol")}
+    closed = []
+    for user, memory in memories.items():
+        monkeypatch.setattr(memory.session, "close", lambda user=user: closed.append(user))
+
+    alice = OpenSearchMemoryToolProvider.get_or_create(user_id="alice", render_mode="off", memory=memories["alice"])
+    OpenSearchMemoryToolProvider.get_or_create(user_id="bob", render_mode="off", memory=memories["bob"])
+    assert OpenSearchMemoryToolProvider.get_or_create(user_id="alice", render_mode="off",
+                                                      memory=memories["alice"]) is alice
+    OpenSearchMemoryToolProvider.get_or_create(user_id="carol", render_mode="off", memory=memories["carol"])
+
+    assert len(opensearch_memory_tool._provider_pool) == 2
+    OpenSearchMemoryToolProvider.clear_pool()
+    assert closed == []
+
+
+def test_close_only_closes_pool_clients_no_longer_shared(server, monkeypatch):
+    monkeypatch.setattr(opensearch_memory_tool, "MAX_MEMORY_CLIENTS", 1)
+    monkeypatch.setattr(opensearch_memory_tool, "_memory_clients", opensearch_memory_tool.OrderedDict())
+    providers = {name: OpenSearchMemoryToolProvider(cluster_url=server.url, username="admin", password="admin",
+                                                    memory_container_name=name, render_mode="off")
+                 for name in ("first", "second")}
+    closed = []
+    for name, provider in providers.items():
+        monkeypatch.setattr(provider.memory.session, "close", lambda name=name: closed.append(name))
+
+    for provider in providers.values():
+        provider.close()
+    # The second client is still pooled for other providers
+    assert closed == ["first"]
+
+
+def test_store_batch_returns_extracted_memory_ids(server, monkeypatch):
+    monkeypatch.setenv("BYPASS_TOOL_CONSENT", "true")
+    memory = OpenSearchAgenticMemory(server.url, "admin", "admin", memory_container_name="tool_test", long_term=True)
+    provider = OpenSearchMemoryToolProvider(session_id="s1", agent_id="agent", user_id="bob", render_mode="off",
+                                            memory=memory, extraction_timeout=5)
+
+    result = provider.opensearch_memory(action="store_batch", contents=["I like swimming", "I live in Oslo"])
+
+    text = result["content"][0]["text"]
+    assert result["status"] == "success" and "covers the whole batch" in text
+    stored = server.memories[memory.memory_container_id]["long-term"]
+    assert all(memory_id in text for memory_id in stored) and len(stored) == 2
+
+
+def test_memories_cut_by_the_token_budget_are_reachable_through_next_cursor(server):
+    memory = OpenSearchAgenticMemory(server.url, "admin", "admin", memory_container_name="tool_test", long_term=True)
+    facts = [f"I like sport number {i} " + "x" * 40 for i in range(4)]
+    for fact in facts:
+        memory.add_message("s1", "agent", {"message": {"role": "user", "content": [{"text": fact}]}},
+                           infer=True, user_id="bob")
+        # Distinct created_time values, the tie-breaker of the cursor
+        time.sleep(0.005)
+    provider = OpenSearchMemoryToolProvider(user_id="bob", render_mode="off", memory=memory, max_result_tokens=40)
+
+    seen = []
+    cursor = None
+    for _ in range(len(facts)):
+        result = provider.opensearch_memory(action="search", query="sport", limit=len(facts), cursor=cursor)
+        text = result["content"][0]["text"]
+        seen.extend(fact for fact in facts if fact in text)
+        if len(result["content"]) == 1:
+            break
+        cursor = result["content"][1]["text"].removeprefix("next_cursor: ")
+        assert "omitted (token budget)" in text
+
+    assert sorted(seen) == sorted(facts)
+
+
+def test_best_match_over_the_token_budget_stays_valid_json(server):
+    memory = OpenSearchAgenticMemory(server.url, "admin", "admin", memory_container_name="tool_test")
+    provider = OpenSearchMemoryToolProvider(user_id="bob", render_mode="off", memory=memory, max_result_tokens=10)
+    hits = [{"_id": f"m{i}", "_score": 1.0, "_source": {"memory": "y" * 200}} for i in range(2)]
+
+    text, included = provider._memories_text(hits)
+    first, omitted = text.split("\n")
+    item = json.loads(first)
+    assert item["id"] == "m0" and item["memory"].endswith("...") and len(first) <= 10 * 4
+    assert included == 1 and "1 more memories omitted" in omitted
+
+
+def test_bound_identity_cannot_be_overridden_by_the_model(server, monkeypatch):
+    monkeypatch.setenv("BYPASS_TOOL_CONSENT", "true")
+    provider = provider_for(server)
+    for user, text in (("alice", "Alice's secret"), ("bob", "Bob likes tea")):
+        provider.memory.add_message("s1", "agent", {"message": {"role": "user", "content": [{"text": text}]}},
+                                    infer=True, user_id=user)
+    long_term = server.memories[provider.memory.memory_container_id]["long-term"]
+    alice_id = next(i for i, doc in long_term.items() if doc["namespace"]["user_id"] == "alice")
+
+    with memory_identity(user_id="bob"):
+        search = provider.opensearch_memory(action="search", query="secret", user_id="alice")
+        get = provider.opensearch_memory(action="get", memory_id=alice_id)
+        get_batch = provider.opensearch_memory(action="get_batch", memory_ids=[alice_id])
+        delete = provider.opensearch_memory(action="delete", memory_id=alice_id)
+        delete_batch = provider.opensearch_memory(action="delete_batch", memory_ids=[alice_id])
+
+    assert search["status"] == "error" and "user_id" in search["content"][0]["text"]
+    assert get["status"] == "error" and delete["status"] == "error"
+    assert "secret" not in get_batch["content"][0]["text"]
+    assert delete_batch["content"][0]["text"].startswith("0 memories deleted")
+    assert alice_id in long_term
+
+
+def test_render_mode_defaults_to_the_environment_at_construction(server, monkeypatch):
+    memory = OpenSearchAgenticMemory(server.url, "admin", "admin", memory_container_name="tool_test")
+    monkeypatch.setenv("OPENSEARCH_MEMORY_RENDER", "off")
+    assert OpenSearchMemoryToolProvider(memory=memory).console is None
+    monkeypatch.setenv("OPENSEARCH_MEMORY_RENDER", "plain")
+    assert OpenSearchMemoryToolProvider(memory=memory).render_mode.value == "plain"
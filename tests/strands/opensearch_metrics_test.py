@@ -0,0 +1,46 @@
+import pytest
+import requests
+
+from opensearch_transport import MetricsRegistry, PrometheusInstrumentation, ResilientSession, RetryPolicy, \
+    set_instrumentation
+
+
+def test_metrics_registry_exposition():
+    registry = MetricsRegistry(buckets=(0.1, 1.0))
+    registry.describe("requests_total", "counter", "Requests")
+    registry.describe("latency_seconds", "histogram", "Latency")
+    registry.inc("requests_total", endpoint="/memories/working/_search", status=200)
+    registry.inc("requests_total", 2, endpoint='quote"d', status=200)
+    registry.observe("latency_seconds", 0.5, method="GET")
+
+    lines = registry.render().splitlines()
+    assert lines[:2] == ["# HELP requests_total Requests", "# TYPE requests_total counter"]
+    assert 'requests_total{endpoint="/memories/working/_search",status="200"} 1' in lines
+    assert 'requests_total{endpoint="quote\\"d",status="200"} 2' in lines
+    assert 'latency_seconds_bucket{method="GET",le="0.1"} 0' in lines
+    assert 'latency_seconds_bucket{method="GET",le="1.0"} 1' in lines
+    assert 'latency_seconds_bucket{method="GET",le="+Inf"} 1' in lines
+    assert 'latency_seconds_count{method="GET"} 1' in lines
+    with pytest.raises(ValueError):
+        registry.describe("summary", "summary", "Unsupported")
+
+
+def test_prometheus_instrumentation_counts_requests(server):
+    metrics = PrometheusInstrumentation()
+    set_instrumentation(metrics)
+    try:
+        session = ResilientSession(retry=RetryPolicy(max_attempts=2, backoff_base=0))
+        server.inject_failures(1, status=503)
+        session.get(f"{server.url}/_plugins/_ml/memory_containers/abc")
+    finally:
+        set_instrumentation(None)
+
+    http = metrics.registry.serve(port=0)
+    try:
+        text = requests.get(f"http://127.0.0.1:{http.server_address[1]}/metrics").text
+    finally:
+        http.shutdown()
+    labels = 'endpoint="/memory_containers/{id}",method="GET"'
+    assert f'opensearch_memory_requests_total{{{labels},status="503"}} 1' in text
+    assert f'opensearch_memory_requests_total{{{labels},status="404"}} 1' in text
+    assert f'opensearch_memory_retries_total{{{labels}}} 1' in text
@@ -0,0 +1,19 @@
+from opensearch_agentic_memory import OpenSearchAgenticMemory
+
+
+def test_rotated_credentials_update_the_existing_model(server, monkeypatch, tmp_path):
+    memory = OpenSearchAgenticMemory(server.url, "admin", "admin", memory_container_id="unused",
+                                     cache_path=str(tmp_path / "bootstrap.json"))
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "first")
+    first = memory._create_embedding_model()
+    assert memory._create_embedding_model() == first
+
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "rotated")
+    assert memory._create_embedding_model() == first
+    assert server.models[first]["connector"]["credential"]["access_key"] == "rotated"
+    assert len(server.models) == 1
+
+    # Once the cache holds the new credentials, the model id is served without a request
+    requests = server.traffic()["requests"]
+    assert memory._create_embedding_model() == first
+    assert server.traffic()["requests"] == requests
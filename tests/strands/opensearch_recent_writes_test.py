@@ -0,0 +1,51 @@
+import time
+
+from opensearch_agentic_memory import RecentWrites
+
+
+def written(session_id="s1", text="hello"):
+    return {"namespace": {"session_id": session_id}, "messages": [{"content": [{"text": text}]}],
+            "created_time": int(time.time() * 1000)}
+
+
+SESSION_QUERY = {"query": {"term": {"namespace.session_id": "s1"}}, "sort": [{"created_time": {"order": "asc"}}]}
+
+
+def test_recent_writes_overlay_until_the_search_returns_them():
+    recent = RecentWrites()
+    recent.record("s1", "w1", written())
+    recent.record("s1", "w2", written(session_id="s2"))
+
+    # Only documents matching the query are merged in, and paged searches are left alone
+    assert [hit["_id"] for hit in recent.overlay("s1", SESSION_QUERY, [])] == ["w1"]
+    assert recent.overlay("s1", {**SESSION_QUERY, "from": 10}, []) == []
+
+    # Once the index returns the document, the local copy is dropped
+    indexed = [{"_id": "w1", "_source": written(text="indexed")}]
+    assert recent.overlay("s1", SESSION_QUERY, indexed) == indexed
+    recent.forget("s1")
+    assert recent.overlay("s1", SESSION_QUERY, []) == []
+
+
+def test_recent_writes_overlay_updates_until_max_age():
+    recent = RecentWrites(max_age=0.05)
+    stale = [{"_id": "w1", "_source": written(text="before")}]
+    recent.record("s1", "w1", written(text="after"), update=True)
+
+    hits = recent.overlay("s1", SESSION_QUERY, stale)
+    assert [hit["_source"]["messages"][0]["content"][0]["text"] for hit in hits] == ["after"]
+    time.sleep(0.06)
+    assert recent.overlay("s1", SESSION_QUERY, stale) == stale
+
+
+def test_recent_writes_expire_on_record_across_sessions():
+    recent = RecentWrites(max_age=0.05, max_entries=3)
+    for index in range(5):
+        recent.record(f"s{index}", "w1", written(session_id=f"s{index}"))
+    # Sessions that are never searched again are capped, oldest first
+    assert len(recent) == 3
+    assert recent.overlay("s0", {"query": {"term": {"namespace.session_id": "s0"}}}, []) == []
+
+    time.sleep(0.06)
+    recent.record("s5", "w1", written(session_id="s5"))
+    assert len(recent) == 1
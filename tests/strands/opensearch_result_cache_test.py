@@ -0,0 +1,37 @@
+from opensearch_agentic_memory import LongTermMemoryCache, OpenSearchAgenticMemory
+
+
+def message(text):
+    return {"message": {"role": "user", "content": [{"text": text}]}}
+
+
+def test_delete_invalidates_the_owner_of_the_memory(server):
+    cache = LongTermMemoryCache(write_grace=0)
+    memory = OpenSearchAgenticMemory(server.url, "admin", "admin", memory_container_name="result_cache",
+                                     long_term=True, result_cache=cache)
+    memory.add_message("s1", "agent", message("I like swimming"), infer=True, user_id="bob")
+    [memory_id] = server.memories[memory.memory_container_id]["long-term"]
+
+    # A search that started before the delete holds the old generation and no cached entry names the memory
+    in_flight = cache.generation("bob")
+    memory.delete_long_term_memory(memory_id)
+    cache.put("bob", "query", [{"_id": memory_id}], in_flight)
+
+    assert cache.get("bob", "query") is None
+    assert cache.generation("bob") != in_flight
+
+
+def test_results_are_cached_until_the_user_writes(server):
+    cache = LongTermMemoryCache(write_grace=0)
+    memory = OpenSearchAgenticMemory(server.url, "admin", "admin", memory_container_name="result_cache",
+                                     long_term=True, result_cache=cache)
+    memory.add_message("s1", "agent", message("I like swimming"), infer=True, user_id="bob")
+
+    first = memory.search_long_term_memories(None, "bob")
+    requests_before = server.traffic()["requests"]
+    assert memory.search_long_term_memories(None, "bob") == first
+    assert server.traffic()["requests"] == requests_before
+
+    memory.add_message("s1", "agent", message("I like hiking"), infer=True, user_id="bob")
+    assert len(memory.search_long_term_memories(None, "bob")) == 2
+    assert cache.stats()["hits"] == 1
@@ -0,0 +1,125 @@
+import time
+
+import pytest
+
+from opensearch_transport import CircuitBreaker, CircuitOpenError, DeadlineExceeded, ResilientSession, RetryPolicy, \
+    deadline, endpoint_template, time_remaining
+
+
+def test_expired_deadline_does_not_take_the_half_open_probe(server):
+    session = ResilientSession(retry=RetryPolicy(max_attempts=1),
+                               breaker=CircuitBreaker(failure_threshold=1, reset_timeout=0.05))
+    server.inject_failures(1, status=503)
+    assert session.get(f"{server.url}/").status_code == 503
+    assert session.breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        session.get(f"{server.url}/")
+
+    time.sleep(0.06)
+    with deadline(0.0), pytest.raises(DeadlineExceeded):
+        session.get(f"{server.url}/")
+
+    # The probe slot is still free, so the next request closes the circuit again
+    assert session.get(f"{server.url}/").status_code == 200
+    assert session.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_idempotent_requests_retry_and_honour_retry_after(server):
+    session = ResilientSession(retry=RetryPolicy(max_attempts=3, backoff_base=0, backoff_max=1.0))
+    server.inject_failures(2, status=503, retry_after="0.2")
+    start = time.monotonic()
+    assert session.get(f"{server.url}/").status_code == 200
+    assert time.monotonic() - start >= 0.4
+    assert session.metrics.stats()["retries"] == 2
+
+    # Retry-After is capped at backoff_max, and the last failure is returned once attempts run out
+    server.inject_failures(3, status=429, retry_after="30")
+    start = time.monotonic()
+    assert session.get(f"{server.url}/").status_code == 429
+    assert time.monotonic() - start < 5
+
+
+def test_writes_are_only_retried_when_rejected_outright(server):
+    session = ResilientSession(retry=RetryPolicy(max_attempts=3, backoff_base=0))
+    url = f"{server.url}/_plugins/_ml/memory_containers/_create"
+    server.inject_failures(1, status=503)
+    assert session.post(url, json={"name": "once"}).status_code == 503
+    assert session.metrics.stats()["retries"] == 0
+
+    server.inject_failures(1, status=429)
+    assert session.post(url, json={"name": "after_rejection"}).status_code == 200
+    assert session.metrics.stats()["retries"] == 1
+    assert len(server.containers) == 1
+
+
+def test_breaker_counts_one_failure_per_request(server):
+    session = ResilientSession(retry=RetryPolicy(max_attempts=3, backoff_base=0),
+                               breaker=CircuitBreaker(failure_threshold=2, reset_timeout=30))
+    server.inject_failures(2, status=503)
+    assert session.get(f"{server.url}/").status_code == 200
+    assert session.breaker.failures == 0
+
+    server.inject_failures(3, status=503)
+    assert session.get(f"{server.url}/").status_code == 503
+    assert (session.breaker.failures, session.breaker.state) == (1, CircuitBreaker.CLOSED)
+
+
+def test_half_open_probe_keeps_its_slot_while_retrying(server):
+    session = ResilientSession(retry=RetryPolicy(max_attempts=3, backoff_base=0),
+                               breaker=CircuitBreaker(failure_threshold=1, reset_timeout=0.05))
+    server.inject_failures(3, status=503)
+    assert session.get(f"{server.url}/").status_code == 503
+    assert session.breaker.state == CircuitBreaker.OPEN
+
+    time.sleep(0.06)
+    server.inject_failures(1, status=503)
+    assert session.get(f"{server.url}/").status_code == 200
+    assert session.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_circuit_breaker_transitions():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+    assert breaker.allow() and not breaker.record_failure()
+    breaker.record_success()
+    assert not breaker.record_failure() and breaker.state == CircuitBreaker.CLOSED
+    assert breaker.record_failure() and breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+    time.sleep(0.06)
+    assert breaker.allow() and breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow(), "only one probe at a time"
+    assert breaker.record_failure() and breaker.state == CircuitBreaker.OPEN
+
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED and breaker.allow()
+
+
+def test_nested_deadlines_only_shorten():
+    with deadline(10):
+        outer = time_remaining()
+        with deadline(60):
+            assert time_remaining() <= outer
+    assert time_remaining() is None
+
+
+def test_deadline_returns_the_failure_instead_of_sleeping_past_it(server):
+    session = ResilientSession(retry=RetryPolicy(max_attempts=5, backoff_base=0))
+    server.inject_failures(5, status=503, retry_after="2")
+    start = time.monotonic()
+    with deadline(0.5):
+        assert session.get(f"{server.url}/").status_code == 503
+    assert time.monotonic() - start < 0.5
+    assert session.metrics.stats()["retries"] == 0
+
+
+def test_endpoint_template():
+    base = "https://cluster:9200/_plugins/_ml"
+    assert endpoint_template(f"{base}/memory_containers/abc/memories/working/_search?search_pipeline=hybrid") == \
+        "/memories/working/_search"
+    assert endpoint_template(f"{base}/memory_containers/abc/memories/long-term/m1") == "/memories/long-term/{id}"
+    assert endpoint_template(f"{base}/memory_containers/_create") == "/memory_containers/_create"
+    assert endpoint_template(f"{base}/memory_containers/abc") == "/memory_containers/{id}"
+    assert endpoint_template(f"{base}/models/m1/_predict") == "/models/{id}/_predict"
+    assert endpoint_template("https://cluster:9200/agentic-memory-container-locks/_doc/name") == "/{id}/_doc/{id}"